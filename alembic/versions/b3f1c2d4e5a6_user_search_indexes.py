@@ -0,0 +1,30 @@
+"""User search indexes
+
+Revision ID: b3f1c2d4e5a6
+Revises: 4a4b4bd09916
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from proj_name.core.db.postgres.migrations import (
+    create_search_indexes,
+    drop_search_indexes,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "b3f1c2d4e5a6"
+down_revision: Union[str, None] = "4a4b4bd09916"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCHABLE_COLUMNS = ["username"]
+
+
+def upgrade() -> None:
+    create_search_indexes("auth_user", SEARCHABLE_COLUMNS)
+
+
+def downgrade() -> None:
+    drop_search_indexes("auth_user", SEARCHABLE_COLUMNS)
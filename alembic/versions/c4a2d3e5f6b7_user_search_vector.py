@@ -0,0 +1,28 @@
+"""User search vector
+
+Revision ID: c4a2d3e5f6b7
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from proj_name.core.db.postgres.migrations import (
+    add_search_vector,
+    drop_search_vector,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a2d3e5f6b7"
+down_revision: Union[str, None] = "b3f1c2d4e5a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_search_vector("auth_user", {"username": "A"})
+
+
+def downgrade() -> None:
+    drop_search_vector("auth_user")
@@ -0,0 +1,66 @@
+"""Revoked tokens
+
+Revision ID: d5b3e4f6a7c8
+Revises: c4a2d3e5f6b7
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d5b3e4f6a7c8"
+down_revision: Union[str, None] = "c4a2d3e5f6b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "auth_revoked_token",
+        sa.Column("base_id", sa.Uuid(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "log_time",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_auth_revoked_token_base_id"),
+        "auth_revoked_token",
+        ["base_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_auth_revoked_token_expires_at"),
+        "auth_revoked_token",
+        ["expires_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_auth_revoked_token_log_time"),
+        "auth_revoked_token",
+        ["log_time"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix_auth_revoked_token_log_time"), table_name="auth_revoked_token"
+    )
+    op.drop_index(
+        op.f("ix_auth_revoked_token_expires_at"),
+        table_name="auth_revoked_token",
+    )
+    op.drop_index(
+        op.f("ix_auth_revoked_token_base_id"), table_name="auth_revoked_token"
+    )
+    op.drop_table("auth_revoked_token")
@@ -24,14 +24,72 @@ class PostgresSettings(AppBaseSettings):
 class DbSettings(AppBaseSettings):
     host: str = "localhost"
     port: str = "5432"
-    pool_size: int = 1  # just for async_session context
+    pool_size: int = Field(5, ge=1)
+    max_overflow: int = Field(10, ge=0)
+    pool_timeout: float = Field(30, gt=0, description="in seconds")
+    pool_recycle: int = Field(
+        1800, ge=-1, description="in seconds; -1 - disabled"
+    )
+    pool_pre_ping: bool = False
+    # asyncpg prepared statements LRU (per connection); 0 - disabled (e.g.
+    # for pgbouncer in the transaction mode)
+    prepared_statement_cache_size: int = Field(100, ge=0)
+    statement_timeout: int = Field(0, ge=0, description="in ms; 0 - off")
+    jit: bool = False
+    application_name: str = "proj_name"
+    # read-only replicas (`host:port`), e.g. DB_REPLICA_HOSTS='["db2:5432"]'
+    replica_hosts: list[str] = Field(default_factory=list)
+    replica_max_lag: float = Field(5, ge=0, description="in seconds")
+    replica_check_interval: float = Field(5, ge=0, description="in seconds")
+    replica_check_timeout: float = Field(1, gt=0, description="in seconds")
+    request_queries_warn: int = Field(
+        20, ge=0, description="queries per request to log a warning; 0 - off"
+    )
 
     driver_schema: str = "postgresql+asyncpg"
 
+    @property
+    def server_settings(self) -> dict[str, str]:
+        ret = {
+            "jit": "on" if self.jit else "off",
+            "application_name": self.application_name,
+        }
+        if self.statement_timeout:
+            ret["statement_timeout"] = str(self.statement_timeout)
+        return ret
+
 
 class AuthSettings(AppBaseSettings):
     jwt_access_dt: int = Field(30, ge=0, description="in minutes")
     jwt_refresh_dt: int = Field(60 * 24, ge=0, description="in minutes")
+    jwt_algorithm: Literal["HS256", "RS256", "ES256", "EdDSA"] = "HS256"
+    jwt_keys_dir: str | None = Field(
+        None, description="`<kid>.pem` / `<kid>.pub.pem` asymmetric keys"
+    )
+    jwt_kid: str = Field("default", description="kid of the signing key")
+    pwd_executor: Literal["thread", "process"] = "thread"
+    pwd_workers: int = Field(4, ge=1, description="bcrypt workers")
+    pwd_max_queue: int = Field(256, ge=0)
+    pwd_bulk_workers: int = Field(
+        0, ge=0, description="bulk import processes; 0 - cpu count"
+    )
+    bulk_chunk_size: int = Field(
+        1000, ge=1, description="users per hashing chunk and insert"
+    )
+    token_cache_size: int = Field(10_000, ge=0)
+    token_cache_ttl: float = Field(
+        30, ge=0, description="in seconds; 0 - disabled"
+    )
+    jwt_decoded_cache_size: int = Field(
+        10_000, ge=0, description="decoded tokens LRU; 0 - disabled"
+    )
+    stateless: bool = Field(
+        False, description="trust signed access tokens (revocation list)"
+    )
+    revocation_poll_interval: float = Field(5, gt=0, description="in seconds")
+    revocation_max_staleness: float = Field(
+        30, gt=0, description="in seconds; db lookup after it"
+    )
 
 
 class AppSettings(AppBaseSettings):
@@ -88,6 +146,33 @@ class Settings(AppBaseSettings):
             f"/{self.postgres.db}"
         )
 
+    @property
+    def replica_urls(self) -> list[str]:
+        return [
+            f"{self.db.driver_schema}://"
+            f"{self.postgres.user}:{self.postgres.password}@"
+            f"{hi}/{self.postgres.db}"
+            for hi in self.db.replica_hosts
+        ]
+
+    @property
+    def engine_kwargs(self) -> dict:
+        """`create_async_engine` kwargs (except url)"""
+        return {
+            "echo": self.log.level == "TRACE",
+            "pool_size": self.db.pool_size,
+            "max_overflow": self.db.max_overflow,
+            "pool_timeout": self.db.pool_timeout,
+            "pool_recycle": self.db.pool_recycle,
+            "pool_pre_ping": self.db.pool_pre_ping,
+            "connect_args": {
+                "prepared_statement_cache_size": (
+                    self.db.prepared_statement_cache_size
+                ),
+                "server_settings": self.db.server_settings,
+            },
+        }
+
     @property
     def uvicorn_kwargs(self) -> dict:
         result = self.app.model_dump(include={"host", "port", "workers"})
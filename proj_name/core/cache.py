@@ -0,0 +1,96 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[KeyT, ValueT]):
+    """Bounded LRU cache with expiration of the entries.
+
+    NOTE: It isn't thread-safe. Use it from the event loop only.
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        """
+        Args:
+            maxsize: max number of entries (LRU entries are evicted first)
+            ttl: default time to live of the entry in seconds (`None` -
+                entries expire only by LRU)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[KeyT, tuple[float, ValueT]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: KeyT) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(
+        self, key: KeyT, default: Any = None, count: bool = True
+    ) -> ValueT | Any:
+        item = self._data.get(key)
+        if item is not None:
+            if item[0] > time.monotonic():
+                self._data.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return item[1]
+            del self._data[key]
+        if count:
+            self.misses += 1
+        return default
+
+    def set(self, key: KeyT, value: ValueT, ttl: float | None = None):
+        """
+        Args:
+            ttl: overrides the default ttl of the cache
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return
+        if self.maxsize <= 0:
+            return
+        expires = float("inf") if ttl is None else time.monotonic() + ttl
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: KeyT, default: Any = None) -> ValueT | Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def pop_if(self, predicate: Callable[[KeyT, ValueT], bool]) -> int:
+        """Removes all entries matched by the predicate
+
+        Returns:
+            int - count of removed entries
+        """
+        keys = [k for k, (_, v) in self._data.items() if predicate(k, v)]
+        for ki in keys:
+            del self._data[ki]
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
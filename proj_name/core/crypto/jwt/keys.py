@@ -0,0 +1,159 @@
+import json
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping, NamedTuple
+
+from jwt.algorithms import get_default_algorithms, has_crypto
+
+from proj_name.core.exceptions import JwtKeyError
+
+__doc__ = """
+Parsed JWT keys. PyJWT accepts prepared key objects, so PEMs are parsed once
+(on the key set creation) instead of on each `encode` / `decode`.
+
+Asymmetric algorithms (`RS256`, `ES256`, `EdDSA`) need the optional
+`cryptography` package (`uv sync --group crypto`); their public keys are
+published as JWKS, so other services can verify tokens without the secret.
+
+Key rotation (`from_dir`): `<kid>.pem` - private keys (signing and
+verification), `<kid>.pub.pem` - public keys of the retired ones
+(verification only, until their tokens expire).
+"""
+
+SYMMETRIC_ALGORITHMS = frozenset({"HS256", "HS384", "HS512"})
+ASYMMETRIC_ALGORITHMS = frozenset({"RS256", "ES256", "EdDSA"})
+PUBLIC_KEY_SUFFIX = ".pub.pem"
+PRIVATE_KEY_SUFFIX = ".pem"
+
+
+class JwtKey(NamedTuple):
+    kid: str
+    algorithm: str
+    # `None` - verification only key
+    signing_key: Any
+    verifying_key: Any
+
+    @property
+    def symmetric(self) -> bool:
+        return self.algorithm in SYMMETRIC_ALGORITHMS
+
+    @classmethod
+    def _algorithm(cls, kid: str, algorithm: str):
+        if algorithm not in SYMMETRIC_ALGORITHMS | ASYMMETRIC_ALGORITHMS:
+            raise JwtKeyError(kid=kid, reason=f"unsupported {algorithm}")
+        if algorithm in ASYMMETRIC_ALGORITHMS and not has_crypto:
+            raise JwtKeyError(
+                kid=kid, reason=f"{algorithm} requires `cryptography`"
+            )
+        return get_default_algorithms()[algorithm]
+
+    @classmethod
+    def from_secret(cls, kid: str, secret: str, algorithm: str = "HS256"):
+        if algorithm not in SYMMETRIC_ALGORITHMS:
+            raise JwtKeyError(kid=kid, reason=f"{algorithm} isn't symmetric")
+        key = cls._algorithm(kid, algorithm).prepare_key(secret)
+        return cls(kid, algorithm, key, key)
+
+    @classmethod
+    def from_private_pem(cls, kid: str, pem: str | bytes, algorithm: str):
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise JwtKeyError(kid=kid, reason=f"{algorithm} is symmetric")
+        try:
+            key = cls._algorithm(kid, algorithm).prepare_key(pem)
+            return cls(kid, algorithm, key, key.public_key())
+        except (ValueError, TypeError, AttributeError) as e:
+            raise JwtKeyError(kid=kid, reason=str(e)) from e
+
+    @classmethod
+    def from_public_pem(cls, kid: str, pem: str | bytes, algorithm: str):
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise JwtKeyError(kid=kid, reason=f"{algorithm} is symmetric")
+        try:
+            key = cls._algorithm(kid, algorithm).prepare_key(pem)
+        except (ValueError, TypeError) as e:
+            raise JwtKeyError(kid=kid, reason=str(e)) from e
+        if hasattr(key, "public_key"):
+            raise JwtKeyError(kid=kid, reason="got a private key")
+        return cls(kid, algorithm, None, key)
+
+    def jwk(self) -> dict[str, Any]:
+        """Public JWK (symmetric keys aren't published)"""
+        if self.symmetric:
+            raise JwtKeyError(kid=self.kid, reason="symmetric key")
+        ret = get_default_algorithms()[self.algorithm].to_jwk(
+            self.verifying_key
+        )
+        ret = json.loads(ret) if isinstance(ret, str) else ret
+        ret.update(kid=self.kid, alg=self.algorithm, use="sig")
+        return ret
+
+
+class JwtKeySet:
+    """Keys by `kid`; the current key signs new tokens, all of them verify"""
+
+    def __init__(self, keys: list[JwtKey], current_kid: str):
+        self.keys: Mapping[str, JwtKey] = MappingProxyType(
+            {ki.kid: ki for ki in keys}
+        )
+        current = self.keys.get(current_kid)
+        if current is None or current.signing_key is None:
+            raise JwtKeyError(kid=current_kid, reason="no signing key")
+        self.current = current
+        self._jwks = {"keys": [ki.jwk() for ki in keys if not ki.symmetric]}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def get(self, kid: str | None) -> JwtKey | None:
+        """Key of the token header (`None` kid - the only key of the set)"""
+        if kid is None:
+            return self.current if len(self.keys) == 1 else None
+        return self.keys.get(kid)
+
+    def jwks(self) -> dict[str, list[dict[str, Any]]]:
+        return self._jwks
+
+    @classmethod
+    def from_secret(
+        cls, secret: str, algorithm: str = "HS256", kid: str = "default"
+    ) -> "JwtKeySet":
+        return cls([JwtKey.from_secret(kid, secret, algorithm)], kid)
+
+    @classmethod
+    def from_dir(
+        cls, path: str | Path, algorithm: str, current_kid: str
+    ) -> "JwtKeySet":
+        keys = []
+        for fi in sorted(Path(path).iterdir()):
+            if fi.name.endswith(PUBLIC_KEY_SUFFIX):
+                kid = fi.name.removesuffix(PUBLIC_KEY_SUFFIX)
+                keys.append(
+                    JwtKey.from_public_pem(kid, fi.read_bytes(), algorithm)
+                )
+            elif fi.name.endswith(PRIVATE_KEY_SUFFIX):
+                kid = fi.name.removesuffix(PRIVATE_KEY_SUFFIX)
+                keys.append(
+                    JwtKey.from_private_pem(kid, fi.read_bytes(), algorithm)
+                )
+        return cls(keys, current_kid)
+
+
+def generate_private_pem(algorithm: str) -> bytes:
+    """New private key (PKCS8 PEM) of the asymmetric algorithm"""
+    JwtKey._algorithm("new", algorithm)
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    if algorithm == "RS256":
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif algorithm == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise JwtKeyError(kid="new", reason=f"{algorithm} is symmetric")
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
@@ -1,6 +1,142 @@
+import asyncio
+import os
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import cache
+from typing import Any, Callable, Iterable
+
 from passlib.context import CryptContext
 
+from proj_name.config import get_settings
+from proj_name.core.exceptions import PasswordServiceBusyError
+from proj_name.core.metrics import MetricsManager
+from proj_name.core.utils import chunked
+
 # check algo section:
 # https://passlib.readthedocs.io/en/stable/lib/passlib.hash.bcrypt.html?highlight=bcrypt#format-algorithm  # noqa # type: ignore
 
 PwdContext = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# module level funcs - they must be picklable for the process pool
+def _hash(secret: str) -> str:
+    return PwdContext.hash(secret)
+
+
+def _verify(secret: str, hash: str) -> bool:
+    return PwdContext.verify(secret, hash)
+
+
+def _hash_list(secrets: list[str]) -> list[str]:
+    return [PwdContext.hash(si) for si in secrets]
+
+
+class AsyncPwdContext:
+    """Async wrapper of `PwdContext`.
+
+    bcrypt is CPU-bound, so the calls are sent to the executor with bounded
+    concurrency. Calls over `max_concurrency + max_queue` are rejected with
+    `PasswordServiceBusyError` instead of growing the queue infinitely.
+    """
+
+    def __init__(
+        self, executor: Executor, max_concurrency: int, max_queue: int
+    ):
+        self._executor = executor
+        self._max_concurrency = max_concurrency
+        self._limit = max_concurrency + max_queue
+        self._semaphore: asyncio.Semaphore | None = None
+        self._pending = 0
+        self._calls = 0
+        self._rejected = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphore
+
+    async def _in_executor(self, func: Callable, *args: Any) -> Any:
+        async with self.semaphore:
+            self._calls += 1
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, *args
+            )
+
+    async def _run(self, func: Callable, *args: Any) -> Any:
+        if self._pending >= self._limit:
+            self._rejected += 1
+            raise PasswordServiceBusyError()
+        self._pending += 1
+        try:
+            return await self._in_executor(func, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, secret: str) -> str:
+        return await self._run(_hash, secret)
+
+    async def verify(self, secret: str, hash: str) -> bool:
+        return await self._run(_verify, secret, hash)
+
+    async def hash_many(self, secrets: Iterable[str]) -> list[str]:
+        """Parallel hashing. The whole batch takes one place in the queue.
+
+        Secrets are split into `max_concurrency` slices, so a process pool
+        gets one message per worker instead of one per secret.
+        """
+        secrets = list(secrets)
+        if not secrets:
+            return []
+        if self._pending >= self._limit:
+            self._rejected += 1
+            raise PasswordServiceBusyError()
+        self._pending += 1
+        try:
+            step = -(-len(secrets) // self._max_concurrency)
+            parts = await asyncio.gather(
+                *(
+                    self._in_executor(_hash_list, ci)
+                    for ci in chunked(secrets, step)
+                )
+            )
+            return [hi for pi in parts for hi in pi]
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending": self._pending,
+            "limit": self._limit,
+            "calls": self._calls,
+            "rejected": self._rejected,
+        }
+
+
+@cache
+def get_pwd_context() -> AsyncPwdContext:
+    settings = get_settings().auth
+    if settings.pwd_executor == "process":
+        executor = ProcessPoolExecutor(settings.pwd_workers)
+    else:
+        executor = ThreadPoolExecutor(
+            settings.pwd_workers, thread_name_prefix="pwd"
+        )
+    ret = AsyncPwdContext(
+        executor, settings.pwd_workers, settings.pwd_max_queue
+    )
+    MetricsManager.register("passwords")(ret.stats)
+    return ret
+
+
+@cache
+def get_bulk_pwd_context() -> AsyncPwdContext:
+    """Separate process pool for bulk imports, so they don't starve
+    logins"""
+    workers = get_settings().auth.pwd_bulk_workers or os.cpu_count() or 1
+    ret = AsyncPwdContext(ProcessPoolExecutor(workers), workers, 1)
+    MetricsManager.register("passwords_bulk")(ret.stats)
+    return ret
@@ -1,23 +1,134 @@
+from contextvars import ContextVar
 from typing import AsyncGenerator
 
+from fastapi import Depends, Request
 from pydantic import BaseModel
-from sqlalchemy import JSON, TypeDecorator
+from sqlalchemy import JSON, TypeDecorator, event
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.asyncio.session import async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session
 
 from proj_name.config import get_settings
+from proj_name.core.db.postgres.pool import HoldTimeStats, MeteredAsyncPool
+from proj_name.core.db.postgres.replicas import (
+    HAS_WRITES_KEY,
+    PIN_KEY,
+    ReplicaRouter,
+)
+from proj_name.core.db.postgres.statements import CompiledCacheStats
+from proj_name.core.db.postgres.tracing import QueryTracer
+from proj_name.core.metrics import MetricsManager
 
 DbEngine = create_async_engine(
-    get_settings().db_url, echo=get_settings().log.level == "TRACE"
+    get_settings().db_url,
+    poolclass=MeteredAsyncPool,
+    **get_settings().engine_kwargs,
 )
 
 SessionMaker = async_sessionmaker(DbEngine, expire_on_commit=False)
 
+DbCompiledCacheStats = CompiledCacheStats()
+DbCompiledCacheStats.install(DbEngine)
+MetricsManager.register("sql_compiled_cache")(DbCompiledCacheStats.stats)
+# `DbEngine.pool` is replaced on `dispose()`
+MetricsManager.register("db_pool")(lambda: DbEngine.pool.stats())
+DbHoldTimeStats = HoldTimeStats()
+DbHoldTimeStats.install(DbEngine)
+MetricsManager.register("db_hold_time")(DbHoldTimeStats.stats)
+QueryTracer.install(DbEngine)
+
+
+ReplicaEngines = [
+    create_async_engine(
+        url, poolclass=MeteredAsyncPool, **get_settings().engine_kwargs
+    )
+    for url in get_settings().replica_urls
+]
+ReadRouter = ReplicaRouter(
+    [async_sessionmaker(ei, expire_on_commit=False) for ei in ReplicaEngines],
+    max_lag=get_settings().db.replica_max_lag,
+    check_interval=get_settings().db.replica_check_interval,
+    check_timeout=get_settings().db.replica_check_timeout,
+)
+MetricsManager.register("db_replicas")(ReadRouter.stats)
+for ei in ReplicaEngines:
+    QueryTracer.install(ei)
+
+# sessions of the current request, released right after the endpoint (see
+# `core.fastapi.routes.db.DbReleaseRoute`)
+request_sessions: ContextVar[list[AsyncSession] | None] = ContextVar(
+    "request_sessions", default=None
+)
+
 
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
+def track_request_session(session: AsyncSession):
+    sessions = request_sessions.get()
+    if sessions is not None:
+        sessions.append(session)
+
+
+def pin_writes(session: AsyncSession):
+    """Pins the client of the session to the primary if it has written"""
+    if session.info.pop(HAS_WRITES_KEY, False) and PIN_KEY in session.info:
+        ReadRouter.pin(session.info[PIN_KEY])
+
+
+async def release_request_sessions():
+    """Closes the sessions of the current request: the connections are
+    returned to the pool, not committed transactions are rolled back.
+
+    The client of a written session is pinned to the primary here, before
+    the response is sent, so its next request doesn't go to a lagging
+    replica.
+    """
+    for si in request_sessions.get() or ():
+        pin_writes(si)
+        await si.close()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_writes(state: ORMExecuteState):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[HAS_WRITES_KEY] = True
+
+
+def request_key(request: Request) -> str:
+    """Read-after-write key of the client"""
+    auth = request.headers.get("Authorization")
+    if auth:
+        return auth
+    return request.client.host if request.client else ""
+
+
+async def db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Primary session of the request.
+
+    It's lazy: a pool connection is checked out only by the first query of
+    the session (so requests failed before any query don't take it).
+    """
     async with SessionMaker() as session:
+        session.info[PIN_KEY] = request_key(request)
+        track_request_session(session)
+        yield session
+        # routes without `DbReleaseRoute` (after the response is sent)
+        pin_writes(session)
+
+
+async def db_read_session(
+    request: Request, session: AsyncSession = Depends(db_session)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Read-only session of a replica (see `ReplicaRouter`), falls back to
+    the primary `db_session` without replicas, on the lag or after the
+    writes of the same client
+    """
+    maker = await ReadRouter.pick(request_key(request))
+    if maker is None:
         yield session
+        return
+    async with maker() as read_session:
+        track_request_session(read_session)
+        yield read_session
 
 
 class BasePydanticType(TypeDecorator):
@@ -0,0 +1,204 @@
+import json
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import Select, Table, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from proj_name.core.cache import TTLCache
+from proj_name.core.db.postgres.explain import explain
+
+if TYPE_CHECKING:
+    from proj_name.core.db.postgres.crud import CrudBase
+    from proj_name.core.fastapi.filter.base import BaseFilterSchema
+
+__doc__ = """
+Strategies of the total count calculation for list routes.
+
+ExactCount - `SELECT count(*) FROM (stmt)`
+EstimateCount - planner estimate (`pg_class.reltuples` for a not filtered
+    table, `EXPLAIN` rows for a filtered one)
+CappedCount - `SELECT count(*) FROM (stmt LIMIT cap + 1)`
+CachedCount - TTL cache over any other strategy keyed by the filter and the
+    counted statement
+"""
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_EXACT_HEADER = "X-Total-Count-Exact"
+
+
+class CountResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    total: int
+    exact: bool = True
+
+    @property
+    def headers(self) -> dict[str, str]:
+        ret = {TOTAL_COUNT_HEADER: str(self.total)}
+        if not self.exact:
+            ret[TOTAL_COUNT_EXACT_HEADER] = "false"
+        return ret
+
+
+def count_statement(stmt: Select) -> Select:
+    """`SELECT count(*) FROM (stmt)` without the ordering of `stmt` (e.g.
+    the search rank of the filter), which doesn't change the count
+    """
+    sq = stmt.order_by(None).subquery("count_sq")
+    return select(func.count()).select_from(sq)
+
+
+async def get_count(session: AsyncSession, stmt: Select) -> int:
+    return (await session.execute(count_statement(stmt))).scalar_one()
+
+
+class BaseCountStrategy:
+    # Can be replaced with `count(*) OVER ()` in the fused page query
+    fusable: bool = False
+
+    async def count(
+        self,
+        session: AsyncSession,
+        stmt: Select,
+        crud: "CrudBase",
+        filter_schema: "BaseFilterSchema",
+    ) -> CountResult:
+        raise NotImplementedError()
+
+
+class ExactCount(BaseCountStrategy):
+    fusable: bool = True
+
+    async def count(
+        self,
+        session: AsyncSession,
+        stmt: Select,
+        crud: "CrudBase",
+        filter_schema: "BaseFilterSchema",
+    ) -> CountResult:
+        return CountResult(total=await get_count(session, stmt))
+
+
+class EstimateCount(BaseCountStrategy):
+    def __init__(self, exact_below: int = 1000):
+        """
+        Args:
+            exact_below: estimates lower than this value are recounted
+                exactly (it's cheap and small estimates are the most
+                noticeable)
+        """
+        self.exact_below = exact_below
+
+    @staticmethod
+    def _single_table(stmt: Select) -> Table | None:
+        froms = stmt.get_final_froms()
+        if stmt.whereclause is None and len(froms) == 1:
+            if isinstance(froms[0], Table):
+                return froms[0]
+        return None
+
+    async def estimate(self, session: AsyncSession, stmt: Select) -> int:
+        table = self._single_table(stmt)
+        if table is not None:
+            res = await session.execute(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class"
+                    " WHERE oid = CAST(:name AS regclass)"
+                ),
+                {"name": table.fullname},
+            )
+            reltuples = res.scalar_one_or_none()
+            # -1 - table has never been vacuumed or analyzed
+            if reltuples is not None and reltuples >= 0:
+                return reltuples
+        plan = await explain(session, stmt.order_by(None))
+        return int(plan["Plan"]["Plan Rows"])
+
+    async def count(
+        self,
+        session: AsyncSession,
+        stmt: Select,
+        crud: "CrudBase",
+        filter_schema: "BaseFilterSchema",
+    ) -> CountResult:
+        total = await self.estimate(session, stmt)
+        if total < self.exact_below:
+            return CountResult(total=await get_count(session, stmt))
+        return CountResult(total=total, exact=False)
+
+
+class CappedCount(BaseCountStrategy):
+    def __init__(self, cap: int = 10_000):
+        self.cap = cap
+
+    async def count(
+        self,
+        session: AsyncSession,
+        stmt: Select,
+        crud: "CrudBase",
+        filter_schema: "BaseFilterSchema",
+    ) -> CountResult:
+        total = await get_count(session, stmt.limit(self.cap + 1))
+        return CountResult(total=total, exact=total <= self.cap)
+
+
+def _json_default(v: Any):
+    if isinstance(v, (set, frozenset)):
+        return sorted(v, key=str)
+    return str(v)
+
+
+def normalize_filter(filter_schema: "BaseFilterSchema") -> str:
+    return json.dumps(
+        filter_schema.to_filter(), sort_keys=True, default=_json_default
+    )
+
+
+def statement_key(stmt: Select) -> tuple[Any, str]:
+    """Structure key of the statement (its SQL compilation cache key) and
+    the values of its bind params, e.g. the same filter over different
+    `select_stmt`s of a route get different keys
+    """
+    cache_key = stmt._generate_cache_key()
+    if cache_key is None:  # not cacheable construct
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        return str(compiled), json.dumps(
+            compiled.params, sort_keys=True, default=_json_default
+        )
+    values = [bi.effective_value for bi in cache_key.bindparams]
+    return cache_key.key, json.dumps(values, default=_json_default)
+
+
+class CachedCount(BaseCountStrategy):
+    def __init__(
+        self, strategy: BaseCountStrategy, ttl: float = 30, maxsize: int = 1024
+    ):
+        self.strategy = strategy
+        self.cache: TTLCache[tuple[str, str, Any], CountResult] = TTLCache(
+            maxsize, ttl
+        )
+
+    async def count(
+        self,
+        session: AsyncSession,
+        stmt: Select,
+        crud: "CrudBase",
+        filter_schema: "BaseFilterSchema",
+    ) -> CountResult:
+        key = (
+            crud.model.__name__,
+            normalize_filter(filter_schema),
+            statement_key(stmt),
+        )
+        res = self.cache.get(key)
+        if res is None:
+            res = await self.strategy.count(session, stmt, crud, filter_schema)
+            self.cache.set(key, res)
+        return res
+
+
+@cache
+def exact_count() -> ExactCount:
+    return ExactCount()
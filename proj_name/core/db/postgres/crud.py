@@ -1,23 +1,41 @@
 from functools import cache
-from typing import TYPE_CHECKING, Any, Generic, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Generic,
+    Iterable,
+    Iterator,
+    Literal,
+    TypeVar,
+)
 
+from asyncpg import PostgresError
 from loguru import logger
 from sqlalchemy import (
     Column,
     ColumnExpressionArgument,
     CursorResult,
     Delete,
+    Dialect,
+    MetaData,
     Select,
+    Table,
     Update,
     bindparam,
+    column,
     delete,
     func,
     select,
+    text,
     update,
+    values,
 )
 from sqlalchemy.dialects.postgresql import Insert, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateTable
+from proj_name.core.db.postgres.replicas import HAS_WRITES_KEY
 from proj_name.core.exceptions import (
     AppException,
     BadCreateDataException,
@@ -25,6 +43,7 @@ from proj_name.core.exceptions import (
     BadSchemaException,
     DbException,
 )
+from proj_name.core.utils import chunked
 from proj_name.models.base import BaseDbModel
 from proj_name.schemas.base import OrmModel
 
@@ -52,6 +71,14 @@ def filters_to_wheres(model: type[ModelT], filters: Any):
 
 
 class BulkCrudMixin:
+    # max rows per one bulk statement
+    bulk_chunk_size: int = 1000
+    # asyncpg limit of the bind params per one statement
+    bulk_max_params: int = 32767
+    # rows per one fetch of `stream_multi`
+    stream_yield_per: int = 1000
+    # `bulk_update` switches from executemany to `UPDATE ... FROM VALUES`
+    bulk_update_values_threshold: int = 100
 
     @property
     def _delete_stmt(
@@ -83,12 +110,26 @@ class BulkCrudMixin:
         ]
 
     def stmt_bulk_upsert(
-        self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]", stmt: Insert
+        self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
+        stmt: Insert,
+        columns: Iterable[str] | None = None,
     ) -> Insert:
+        """`ON CONFLICT (pks) DO UPDATE` of the non pk `columns` with the
+        inserted values.
+
+        Args:
+            columns: inserted columns (keys of the rows); `None` - all the
+                not generated columns of the table (the rows must have all of
+                them, missed ones are updated with their defaults)
+        """
         pks = self.get_pks_fields()
+        if columns is None:
+            table: Table = self._model.__table__
+            columns = [ci.key for ci in table.c if ci.computed is None]
+        keys = [k for k in columns if k not in pks] or pks
         return stmt.on_conflict_do_update(
             index_elements=[getattr(self._model, pi) for pi in pks],
-            set_={k: getattr(stmt.excluded, k) for k in pks},
+            set_={k: getattr(stmt.excluded, k) for k in keys},
         )
 
     @classmethod
@@ -143,54 +184,388 @@ class BulkCrudMixin:
         except SQLAlchemyError as e:
             raise DbException() from e
 
+    def _bulk_chunks(
+        self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
+        datas: Iterable[dict[str, Any] | ModelCreateT],
+        chunk_size: int | None = None,
+    ) -> Iterator[list[dict]]:
+        """Converted `datas` split into chunks limited by the row count
+        (`bulk_chunk_size`) and by the estimated count of bind params of a
+        multi-values statement (`bulk_max_params`): the passed keys and the
+        columns with python defaults are bound per row
+        """
+        table: Table = self._model.__table__
+        chunk_size = chunk_size or self.bulk_chunk_size
+        for chunk in chunked(datas, chunk_size):
+            insert_data = self.sync_create_schema_converter(chunk)
+            n_params = len(self._insert_columns(table, insert_data)) or 1
+            rows = max(1, min(chunk_size, self.bulk_max_params // n_params))
+            yield from chunked(insert_data, rows)
+
+    @staticmethod
+    def _rowcount(res: CursorResult, chunk: list[dict]) -> int:
+        # executemany may not report the rowcount
+        return res.rowcount if res.rowcount >= 0 else len(chunk)
+
+    async def stream_multi(
+        self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
+        session: AsyncSession,
+        /,
+        wheres: list[SQLWhereType],
+        order_by: list[SQLOrderByType] | None = None,
+        yield_per: int | None = None,
+        select_stmt: Select | None = None,
+        **filters: Any,
+    ) -> AsyncIterator[ModelT]:
+        """`get_multi` as an async generator over a server-side cursor.
+        Rows are fetched by `yield_per` (`stream_yield_per` by default)
+        batches, so the memory doesn't depend on the size of the result.
+
+        NOTE: the cursor lives in the session transaction, the session
+        must not be used for other queries until the generator is exhausted
+        or closed.
+
+        Example:
+        ```
+        async for user in crud.stream_multi(session, [], yield_per=500):
+            ...
+        ```
+        """
+        expressions = list(wheres)
+        if filters:
+            expressions.extend(filters_to_wheres(self._model, filters))
+        stmt = select_stmt if select_stmt is not None else self._select_model
+        stmt = stmt.where(*expressions)
+        if order_by:
+            stmt = stmt.order_by(*order_by)
+        try:
+            res = await session.stream_scalars(
+                stmt,
+                execution_options={
+                    "yield_per": yield_per or self.stream_yield_per
+                },
+            )
+            try:
+                async for obj in res:
+                    yield obj
+            finally:
+                await res.close()
+        except AppException:
+            raise
+        except SQLAlchemyError as e:
+            raise DbException() from e
+
     async def bulk_create_with_return(
         self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
         session: AsyncSession,
         /,
-        datas: list[dict[str, Any] | ModelCreateT],
+        datas: Iterable[dict[str, Any] | ModelCreateT],
+        chunk_size: int | None = None,
+        pipelined: bool = False,
     ) -> list[ModelT]:
-        """More requests..."""
-        insert_data = self.sync_create_schema_converter(datas)
-        stmt = insert(self._model).values(insert_data).returning(self._model)
-        return (await session.execute(stmt)).scalars().all()
+        """More requests...
+
+        Args:
+            chunk_size: max rows per statement (`bulk_chunk_size` by default)
+            pipelined: execute chunks as executemany of the ORM bulk insert
+                (`insertmanyvalues` batches) instead of one multi-values
+                statement per chunk
+        """
+        ret = []
+        for chunk in self._bulk_chunks(datas, chunk_size):
+            if pipelined:
+                stmt = insert(self._model).returning(self._model)
+                res = await session.execute(stmt, chunk)
+            else:
+                stmt = insert(self._model).values(chunk).returning(self._model)
+                res = await session.execute(stmt)
+            ret.extend(res.scalars().all())
+        return ret
 
     async def bulk_create(
         self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
         session: AsyncSession,
         /,
-        datas: list[dict[str, Any] | ModelCreateT],
+        datas: Iterable[dict[str, Any] | ModelCreateT],
+        chunk_size: int | None = None,
+        pipelined: bool = False,
     ) -> int:
-        insert_data = self.sync_create_schema_converter(datas)
-        stmt = insert(self._model).values(insert_data)
-        res = await session.execute(stmt)
-        return res.rowcount
+        ret = 0
+        for chunk in self._bulk_chunks(datas, chunk_size):
+            if pipelined:
+                res = await session.execute(insert(self._model), chunk)
+            else:
+                res = await session.execute(insert(self._model).values(chunk))
+            ret += self._rowcount(res, chunk)
+        return ret
+
+    @staticmethod
+    def _insert_columns(table: Table, insert_data: list[dict]) -> list[Column]:
+        """Columns of the passed data and columns with python defaults"""
+        keys = set().union(*insert_data)
+        return [
+            ci
+            for ci in table.columns
+            if ci.key in keys
+            or (
+                ci.default is not None
+                and (ci.default.is_scalar or ci.default.is_callable)
+            )
+        ]
 
-    async def bulk_update(
+    @staticmethod
+    def _copy_records(
+        columns: list[Column], insert_data: list[dict], dialect: Dialect
+    ) -> list[tuple]:
+        getters = []
+        for ci in columns:
+            processor = ci.type.dialect_impl(dialect).bind_processor(dialect)
+            default = ci.default
+            getters.append((ci.key, processor, default))
+        records = []
+        for di in insert_data:
+            record = []
+            for key, processor, default in getters:
+                if key in di:
+                    v = di[key]
+                elif default is not None and default.is_callable:
+                    v = default.arg(None)
+                elif default is not None and default.is_scalar:
+                    v = default.arg
+                else:
+                    v = None
+                record.append(v if processor is None else processor(v))
+            records.append(tuple(record))
+        return records
+
+    async def _copy_upsert(
+        self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
+        session: AsyncSession,
+        driver_conn: Any,
+        columns: list[Column],
+        records: list[tuple],
+        on_conflict: Literal["nothing", "update"],
+        keys: set[str],
+    ) -> int:
+        """
+        Args:
+            keys: passed keys of the rows (updated by `update`, unlike the
+                other python default columns)
+        """
+        table: Table = self._model.__table__
+        preparer = (await session.connection()).dialect.identifier_preparer
+        # only the copied columns, without the constraints of the table (not
+        # null generated or server default columns aren't in the COPY)
+        tmp_table = Table(
+            f"tmp_copy_{table.name}",
+            MetaData(),
+            *(Column(ci.name, ci.type) for ci in columns),
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DROP",
+        )
+        # columns of the chunks can differ in one transaction
+        await session.execute(
+            text(f"DROP TABLE IF EXISTS {preparer.format_table(tmp_table)}")
+        )
+        await session.execute(CreateTable(tmp_table))
+        await driver_conn.copy_records_to_table(
+            tmp_table.name,
+            records=records,
+            columns=[ci.name for ci in columns],
+        )
+        stmt = insert(self._model).from_select(
+            [ci.name for ci in columns], select(*tmp_table.c)
+        )
+        if on_conflict == "update":
+            stmt = self.stmt_bulk_upsert(
+                stmt, [ci.key for ci in columns if ci.key in keys]
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(
+                index_elements=[
+                    getattr(self._model, pi) for pi in self.get_pks_fields()
+                ]
+            )
+        return (await session.execute(stmt)).rowcount
+
+    async def bulk_copy(
         self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
         session: AsyncSession,
         /,
-        datas: list[dict[str, Any] | ModelCreateT],
+        datas: Iterable[dict[str, Any] | ModelCreateT],
+        chunk_size: int = 10_000,
+        on_conflict: Literal["nothing", "update"] | None = None,
     ) -> int:
-        insert_data = self.sync_create_schema_converter(datas)
-        stmt = (
-            update(self._model)
-            .where(*self.get_pks_where())
-            .values(insert_data)
+        """Bulk insert via `COPY ... FROM STDIN` (asyncpg
+        `copy_records_to_table`) in the session transaction.
+
+        Columns are inferred from the model: the passed keys plus columns
+        with python-side defaults (server defaults of the missed columns are
+        applied by postgres).
+
+        Args:
+            on_conflict: `None` - plain COPY into the table; `nothing` /
+                `update` - COPY into a temp staging table, then
+                `INSERT ... SELECT ... ON CONFLICT` (`update` sets the
+                passed keys, see `stmt_bulk_upsert`)
+        Returns:
+            int - count of inserted (upserted) rows
+        """
+        try:
+            table: Table = self._model.__table__
+            conn = await session.connection()
+            driver_conn = (await conn.get_raw_connection()).driver_connection
+            # COPY isn't an ORM execution (see `_mark_writes`)
+            session.info[HAS_WRITES_KEY] = True
+            ret = 0
+            for chunk in chunked(datas, chunk_size):
+                insert_data = self.sync_create_schema_converter(chunk)
+                columns = self._insert_columns(table, insert_data)
+                records = self._copy_records(
+                    columns, insert_data, conn.dialect
+                )
+                if on_conflict is None:
+                    await driver_conn.copy_records_to_table(
+                        table.name,
+                        records=records,
+                        columns=[ci.name for ci in columns],
+                        schema_name=table.schema,
+                    )
+                    ret += len(records)
+                else:
+                    ret += await self._copy_upsert(
+                        session,
+                        driver_conn,
+                        columns,
+                        records,
+                        on_conflict,
+                        set().union(*insert_data),
+                    )
+            return ret
+        except AppException:
+            raise
+        except (SQLAlchemyError, PostgresError) as e:
+            raise DbException() from e
+
+    def _update_groups(
+        self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
+        chunk: list[dict],
+    ) -> Iterator[tuple[tuple[str, ...], list[dict]]]:
+        """Rows of the chunk grouped by the set of their keys"""
+        pks = self.get_pks_fields()
+        groups: dict[tuple[str, ...], list[dict]] = {}
+        for di in chunk:
+            if any(pi not in di for pi in pks):
+                raise BadCreateDataException(data=chunk, bad_data=di)
+            groups.setdefault(tuple(sorted(di)), []).append(di)
+        return iter(groups.items())
+
+    def stmt_bulk_update_values(
+        self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
+        keys: tuple[str, ...],
+        rows: list[dict],
+    ) -> Update:
+        """`UPDATE <table> SET ... FROM (VALUES ...) AS v WHERE <pks join>`"""
+        table: Table = self._model.__table__
+        pks = self.get_pks_fields()
+        vals = values(
+            *(column(ki, table.c[ki].type) for ki in keys), name="v"
+        ).data([tuple(di[ki] for ki in keys) for di in rows])
+        return (
+            update(table)
+            .where(*(table.c[pi] == vals.c[pi] for pi in pks))
+            .values({ki: vals.c[ki] for ki in keys if ki not in pks})
         )
-        res = await session.execute(stmt)
-        return res.rowcount
+
+    def stmt_bulk_update_pks(
+        self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
+        keys: tuple[str, ...],
+    ) -> Update:
+        """Core `UPDATE <table> SET ... WHERE <pks> = :b_<pk>` for
+        executemany (rows of `bulk_update_params`)
+        """
+        table: Table = self._model.__table__
+        pks = self.get_pks_fields()
+        return (
+            update(table)
+            .where(*(table.c[pi] == bindparam(f"b_{pi}") for pi in pks))
+            .values({ki: bindparam(ki) for ki in keys if ki not in pks})
+        )
+
+    def bulk_update_params(
+        self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
+        rows: list[dict],
+    ) -> list[dict]:
+        pks = self.get_pks_fields()
+        return [
+            {(f"b_{k}" if k in pks else k): v for k, v in di.items()}
+            for di in rows
+        ]
+
+    async def bulk_update(
+        self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
+        session: AsyncSession,
+        /,
+        datas: Iterable[dict[str, Any] | ModelCreateT],
+        chunk_size: int | None = None,
+        values_threshold: int | None = None,
+    ) -> int:
+        """Updates rows by their primary keys (every row should contain all
+        of the `get_pks_fields`)
+
+        Small groups of rows are executed as the UPDATE by primary key
+        (executemany of `stmt_bulk_update_pks`), groups of `values_threshold`
+        rows and more as a single `UPDATE ... FROM (VALUES ...)` statement.
+
+        Args:
+            values_threshold: `bulk_update_values_threshold` by default
+        Returns:
+            int - count of updated rows
+        """
+        if values_threshold is None:
+            values_threshold = self.bulk_update_values_threshold
+        try:
+            ret = 0
+            for chunk in self._bulk_chunks(datas, chunk_size):
+                for keys, rows in self._update_groups(chunk):
+                    if len(keys) == len(self.get_pks_fields()):
+                        continue
+                    if len(rows) >= values_threshold:
+                        stmt = self.stmt_bulk_update_values(keys, rows)
+                        res = await session.execute(stmt)
+                    else:
+                        res = await session.execute(
+                            self.stmt_bulk_update_pks(keys),
+                            self.bulk_update_params(rows),
+                        )
+                    ret += self._rowcount(res, rows)
+            return ret
+        except AppException:
+            raise
+        except SQLAlchemyError as e:
+            raise DbException() from e
 
     async def bulk_upsert(
         self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
         session: AsyncSession,
         /,
-        datas: list[dict[str, Any] | ModelCreateT],
+        datas: Iterable[dict[str, Any] | ModelCreateT],
+        chunk_size: int | None = None,
+        pipelined: bool = False,
     ) -> int:
-        insert_data = self.sync_create_schema_converter(datas)
-        stmt = insert(self._model).values(insert_data)
-        stmt = self.stmt_bulk_upsert(stmt)
-        res = await session.execute(stmt)
-        return res.rowcount
+        ret = 0
+        for chunk in self._bulk_chunks(datas, chunk_size):
+            keys = list(dict.fromkeys(k for di in chunk for k in di))
+            if pipelined:
+                stmt = self.stmt_bulk_upsert(insert(self._model), keys)
+                res = await session.execute(stmt, chunk)
+            else:
+                stmt = self.stmt_bulk_upsert(
+                    insert(self._model).values(chunk), keys
+                )
+                res = await session.execute(stmt)
+            ret += self._rowcount(res, chunk)
+        return ret
 
     async def delete(
         self: "BulkCrudMixin | CrudBase[ModelT, ModelCreateT]",
@@ -0,0 +1,43 @@
+import json
+from typing import Any
+
+from sqlalchemy import ClauseElement, Executable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (...) <stmt>` construct. Bind params of the statement are
+    kept, so it can be executed with the same values as the statement.
+
+    Example:
+    ```
+    plan = await explain(session, select(User).where(User.id == uid))
+    plan["Plan"]["Plan Rows"]
+    ```
+    """
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Executable, analyze: bool = False):
+        self.statement = stmt
+        self.analyze = analyze
+
+
+@compiles(Explain, "postgresql")
+def _pg_explain(element: Explain, compiler, **kw) -> str:
+    opts = "ANALYZE, FORMAT JSON" if element.analyze else "FORMAT JSON"
+    return f"EXPLAIN ({opts}) " + compiler.process(element.statement, **kw)
+
+
+async def explain(
+    session: AsyncSession, stmt: Executable, analyze: bool = False
+) -> dict[str, Any]:
+    """
+    Returns:
+        dict - top plan node of `EXPLAIN (FORMAT JSON)`
+    """
+    res = (await session.execute(Explain(stmt, analyze))).scalar_one()
+    if isinstance(res, (str, bytes)):
+        res = json.loads(res)
+    return res[0]
@@ -0,0 +1,206 @@
+from typing import Mapping, Sequence
+
+from alembic import op
+from sqlalchemy import Column, Computed, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from proj_name.core.db.postgres.search import (
+    DEFAULT_TS_CONFIG,
+    SEARCH_VECTOR_COLUMN,
+    tsvector_expression,
+    tsvector_index_name,
+)
+
+__doc__ = """
+Helpers of the alembic migrations for the indexes of the filters.
+
+Example:
+```
+def upgrade():
+    create_jsonb_gin_index("lm_crash_zip")
+    create_jsonb_expression_index("lm_crash_zip", "device_id")
+
+
+def downgrade():
+    drop_index("lm_crash_zip", jsonb_expression_index_name(...))
+    drop_index("lm_crash_zip", jsonb_gin_index_name("lm_crash_zip"))
+```
+
+Search indexes of the string columns (`icontains` - trigram GIN index,
+`startswith` / `istartswith` - btree `text_pattern_ops` index):
+```
+def upgrade():
+    create_search_indexes("auth_user", ["username"])
+
+
+def downgrade():
+    drop_search_indexes("auth_user", ["username"])
+```
+
+Full text search column of `TsVectorMixin` (pass the values of the model
+declaration, not the model itself - the migration must not change with it):
+```
+def upgrade():
+    add_search_vector("lm_post", {"title": "A", "body": "B"})
+
+
+def downgrade():
+    drop_search_vector("lm_post")
+```
+"""
+
+
+def jsonb_gin_index_name(table: str, column: str = "data") -> str:
+    return f"ix_{table}_{column}_gin"
+
+
+def jsonb_expression_index_name(
+    table: str, key: str, column: str = "data"
+) -> str:
+    return f"ix_{table}_{column}_{key}"
+
+
+def jsonb_gin_index(
+    table: str, column: str = "data", path_ops: bool = True
+) -> Index:
+    """GIN index of the JSONB column for `@>` (`jsonb_path_ops` - smaller
+    and faster, but supports only `@>`, `@?`, `@@`)
+    """
+    kwargs = {}
+    if path_ops:
+        kwargs["postgresql_ops"] = {column: "jsonb_path_ops"}
+    return Index(
+        jsonb_gin_index_name(table, column),
+        column,
+        postgresql_using="gin",
+        **kwargs,
+    )
+
+
+def create_jsonb_gin_index(
+    table: str, column: str = "data", path_ops: bool = True
+):
+    idx = jsonb_gin_index(table, column, path_ops)
+    op.create_index(
+        idx.name,
+        table,
+        [column],
+        postgresql_using="gin",
+        postgresql_ops=idx.dialect_options["postgresql"]["ops"],
+    )
+
+
+def create_jsonb_expression_index(
+    table: str, key: str, column: str = "data", using: str = "btree"
+):
+    """Index of `(<column> ->> '<key>')` (`->>` filters: eq, like with a
+    prefix for btree, etc)
+    """
+    quoted = key.replace("'", "''")
+    op.create_index(
+        jsonb_expression_index_name(table, key, column),
+        table,
+        [text(f"({column} ->> '{quoted}')")],
+        postgresql_using=using,
+    )
+
+
+def drop_index(table: str, name: str):
+    op.drop_index(name, table_name=table)
+
+
+def create_trgm_extension():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+def trgm_index_name(table: str, column: str) -> str:
+    return f"ix_{table}_{column}_trgm"
+
+
+def prefix_index_name(table: str, column: str, lower: bool = True) -> str:
+    return f"ix_{table}_{column}_{'lower_' if lower else ''}prefix"
+
+
+def create_trgm_index(table: str, column: str):
+    """GIN `gin_trgm_ops` index of the column (`ILIKE '%v%'`, `LIKE`,
+    `~*`). Requires the `pg_trgm` extension (`create_trgm_extension`)
+    """
+    op.create_index(
+        trgm_index_name(table, column),
+        table,
+        [column],
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    )
+
+
+def create_prefix_index(table: str, column: str, lower: bool = True):
+    """Btree `text_pattern_ops` index for prefix matching (`LIKE 'v%'`),
+    it works with any collation unlike the plain btree index
+
+    Args:
+        lower: index `lower(column)` (`istartswith` filter) instead of the
+            column (`startswith` filter)
+    """
+    expr = f"lower({column})" if lower else column
+    op.create_index(
+        prefix_index_name(table, column, lower),
+        table,
+        [text(f"({expr}) text_pattern_ops")],
+    )
+
+
+def create_search_indexes(
+    table: str, columns: Sequence[str], trgm: bool = True, prefix: bool = True
+):
+    """Indexes of the searchable string columns"""
+    if trgm:
+        create_trgm_extension()
+    for ci in columns:
+        if trgm:
+            create_trgm_index(table, ci)
+        if prefix:
+            create_prefix_index(table, ci)
+
+
+def drop_search_indexes(
+    table: str, columns: Sequence[str], trgm: bool = True, prefix: bool = True
+):
+    for ci in columns:
+        if prefix:
+            drop_index(table, prefix_index_name(table, ci))
+        if trgm:
+            drop_index(table, trgm_index_name(table, ci))
+
+
+def add_search_vector(
+    table: str,
+    columns: Mapping[str, str],
+    config: str = DEFAULT_TS_CONFIG,
+    column: str = SEARCH_VECTOR_COLUMN,
+):
+    """Generated `tsvector` column (`TsVectorMixin`) and its GIN index.
+
+    NOTE: Adding a stored generated column rewrites the table under the
+    `ACCESS EXCLUSIVE` lock.
+    """
+    op.add_column(
+        table,
+        Column(
+            column,
+            TSVECTOR(),
+            Computed(tsvector_expression(columns, config), persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        tsvector_index_name(table, column),
+        table,
+        [column],
+        postgresql_using="gin",
+    )
+
+
+def drop_search_vector(table: str, column: str = SEARCH_VECTOR_COLUMN):
+    drop_index(table, tsvector_index_name(table, column))
+    op.drop_column(table, column)
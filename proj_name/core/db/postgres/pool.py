@@ -0,0 +1,102 @@
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# label of the current request route (for the connection hold metrics)
+current_route: ContextVar[str] = ContextVar("current_route", default="-")
+# service db work (e.g. replica lag checks) which isn't counted in the pool
+# and request metrics
+service_db_work: ContextVar[bool] = ContextVar(
+    "service_db_work", default=False
+)
+
+
+class MeteredAsyncPool(AsyncAdaptedQueuePool):
+    """`AsyncAdaptedQueuePool` with checkout wait metrics
+
+    Example:
+    ```
+    create_async_engine(url, poolclass=MeteredAsyncPool)
+    ```
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        if service_db_work.get():
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            dt = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_time += dt
+            self.max_wait = max(self.max_wait, dt)
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_time": self.wait_time,
+            "avg_wait": (
+                self.wait_time / self.checkouts if self.checkouts else 0.0
+            ),
+            "max_wait": self.max_wait,
+        }
+
+
+class HoldTimeStats:
+    """Time between checkout and checkin of the pool connections grouped by
+    the route (`current_route` at the checkout)
+    """
+
+    def __init__(self):
+        self.routes: dict[str, dict[str, int | float]] = {}
+
+    def _on_checkout(self, dbapi_conn, record, proxy):
+        if service_db_work.get():
+            return
+        record.info["hold_started"] = (
+            time.perf_counter(),
+            current_route.get(),
+        )
+
+    def _on_checkin(self, dbapi_conn, record):
+        started = record.info.pop("hold_started", None)
+        if started is None:
+            return
+        dt = time.perf_counter() - started[0]
+        stats = self.routes.setdefault(
+            started[1], {"count": 0, "total": 0.0, "max": 0.0}
+        )
+        stats["count"] += 1
+        stats["total"] += dt
+        stats["max"] = max(stats["max"], dt)
+
+    def install(self, engine: Engine | AsyncEngine):
+        if isinstance(engine, AsyncEngine):
+            engine = engine.sync_engine
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def stats(self) -> dict[str, dict[str, int | float]]:
+        return {
+            route: {**si, "avg": si["total"] / si["count"]}
+            for route, si in self.routes.items()
+        }
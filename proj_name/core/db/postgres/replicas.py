@@ -0,0 +1,124 @@
+import asyncio
+import itertools
+import time
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from proj_name.core.cache import TTLCache
+from proj_name.core.db.postgres.pool import service_db_work
+
+# `session.info` flag of the executed INSERT / UPDATE / DELETE (COPY), the
+# client of the session is pinned to the primary (see `ReplicaRouter.pin`)
+HAS_WRITES_KEY = "has_writes"
+# `session.info` read-after-write key of the client of the session
+PIN_KEY = "pin_key"
+
+# 0 if all received WAL is replayed (an idle primary doesn't move the replay
+# timestamp), otherwise seconds since the last replayed transaction
+LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery()"
+    " OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE("
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+class ReplicaRouter:
+    """Round-robin routing of the read-only sessions to the replicas.
+
+    Replicas with the lag greater than `max_lag` (or unavailable) are
+    skipped, the primary is used if there are no suitable replicas. The lag
+    of a replica is rechecked by `check_interval` on its pick; a check
+    longer than `check_timeout` marks the replica as lagging (until the
+    next check), so a hung replica doesn't stall the requests.
+
+    Read-after-write: a key (e.g. the client) is pinned to the primary for
+    `max_lag` seconds after its writes (see `pin`).
+    """
+
+    def __init__(
+        self,
+        replicas: list[async_sessionmaker[AsyncSession]],
+        max_lag: float = 5,
+        check_interval: float = 5,
+        check_timeout: float = 1,
+        max_pinned: int = 10_000,
+    ):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self._lags = [0.0] * len(replicas)
+        self._checked_at = [float("-inf")] * len(replicas)
+        self._order = itertools.cycle(range(len(replicas)))
+        self._pinned: TTLCache[str, bool] = TTLCache(max_pinned, max_lag)
+        self.replica_picks = 0
+        self.primary_picks = 0
+
+    def pin(self, key: str):
+        self._pinned.set(key, True)
+
+    async def _query_lag(self, i: int) -> float:
+        async with self.replicas[i]() as session:
+            return float((await session.execute(LAG_SQL)).scalar_one())
+
+    async def check_lag(self, i: int) -> float:
+        # marked before the check, so concurrent picks don't repeat it
+        self._checked_at[i] = time.monotonic()
+        token = service_db_work.set(True)
+        try:
+            lag = await asyncio.wait_for(
+                self._query_lag(i), self.check_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "[ReplicaRouter] Replica {} lag check timed out ({}s)",
+                i,
+                self.check_timeout,
+            )
+            lag = float("inf")
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning(
+                "[ReplicaRouter] Replica {} is unavailable: {}", i, e
+            )
+            lag = float("inf")
+        finally:
+            service_db_work.reset(token)
+        self._lags[i] = lag
+        return lag
+
+    async def pick(
+        self, key: str | None = None
+    ) -> async_sessionmaker[AsyncSession] | None:
+        """
+        Returns:
+            async_sessionmaker - of the replica; `None` - use the primary
+        """
+        if self.replicas and (key is None or key not in self._pinned):
+            for _ in range(len(self.replicas)):
+                i = next(self._order)
+                lag = self._lags[i]
+                if (
+                    time.monotonic() - self._checked_at[i]
+                    > self.check_interval
+                ):
+                    lag = await self.check_lag(i)
+                if lag <= self.max_lag:
+                    self.replica_picks += 1
+                    return self.replicas[i]
+        self.primary_picks += 1
+        return None
+
+    def stats(self) -> dict[str, int | float | list[float]]:
+        return {
+            "replicas": len(self.replicas),
+            "lags": list(self._lags),
+            "pinned": len(self._pinned),
+            "replica_picks": self.replica_picks,
+            "primary_picks": self.primary_picks,
+        }
@@ -0,0 +1,60 @@
+from typing import Any, Mapping
+
+from sqlalchemy import ColumnElement, func, literal_column
+
+__doc__ = """
+Full text search over a generated `tsvector` column (see
+`proj_name.models.base.TsVectorMixin`).
+
+Queries are parsed by `websearch_to_tsquery` (`"quoted phrase"`, `or`,
+`-excluded` words), it never fails on the user input unlike `to_tsquery`.
+The text search config of the query is taken from the `info` of the
+column (`TS_CONFIG_INFO`), it must be the same as the config of the vector.
+"""
+
+TS_CONFIG_INFO = "ts_config"
+DEFAULT_TS_CONFIG = "simple"
+SEARCH_VECTOR_COLUMN = "search_vector"
+
+
+def tsvector_expression(
+    columns: Mapping[str, str], config: str = DEFAULT_TS_CONFIG
+) -> str:
+    """SQL expression of the generated column
+
+    Args:
+        columns: text column -> weight (`A`, `B`, `C` or `D`)
+    """
+    quoted = config.replace("'", "''")
+    return " || ".join(
+        f"setweight(to_tsvector('{quoted}'::regconfig,"
+        f" coalesce({ci}, '')), '{wi}')"
+        for ci, wi in columns.items()
+    )
+
+
+def tsvector_index_name(table: str, column: str = SEARCH_VECTOR_COLUMN) -> str:
+    return f"ix_{table}_{column}_gin"
+
+
+def ts_config(col: Any) -> str:
+    return getattr(col, "info", {}).get(TS_CONFIG_INFO, DEFAULT_TS_CONFIG)
+
+
+def regconfig(config: str) -> ColumnElement:
+    """Constant config (not a bind param, the index matches it)"""
+    quoted = config.replace("'", "''")
+    return literal_column(f"'{quoted}'::regconfig")
+
+
+def ts_query(col: Any, v: Any) -> ColumnElement:
+    return func.websearch_to_tsquery(regconfig(ts_config(col)), v)
+
+
+def ts_match(col: Any, v: Any) -> ColumnElement[bool]:
+    """`col @@ websearch_to_tsquery(config, v)` (GIN index of the column)"""
+    return col.op("@@", is_comparison=True)(ts_query(col, v))
+
+
+def ts_rank(col: Any, v: Any) -> ColumnElement[float]:
+    return func.ts_rank(col, ts_query(col, v))
@@ -0,0 +1,78 @@
+from collections import Counter
+from functools import cache
+from typing import Any, Callable, Hashable, TypeVar
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from proj_name.core.cache import TTLCache
+from proj_name.core.metrics import MetricsManager
+
+StmtT = TypeVar("StmtT")
+
+__doc__ = """
+StatementCache - built statements (with bind params instead of values) by
+    their shape, e.g. `(model, filter fields, order, paginator type)`. It
+    saves the python side building of the statement; the SQL compilation
+    is cached by SQLAlchemy itself (`compiled_cache` of the engine) by the
+    structure of the statement.
+CompiledCacheStats - hit rate of the SQLAlchemy compiled cache by the
+    `after_cursor_execute` events.
+"""
+
+
+class StatementCache:
+    def __init__(self, maxsize: int = 512):
+        self._cache: TTLCache[Hashable, Any] = TTLCache(maxsize)
+
+    def get_or_build(self, key: Hashable, build: Callable[[], StmtT]) -> StmtT:
+        stmt = self._cache.get(key)
+        if stmt is None:
+            stmt = build()
+            self._cache.set(key, stmt)
+        return stmt
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        return self._cache.stats()
+
+
+class CompiledCacheStats:
+    """Counts of `context.cache_hit` (CACHE_HIT, CACHE_MISS,
+    CACHING_DISABLED, NO_CACHE_KEY, ...) of the executed statements
+    """
+
+    def __init__(self):
+        self.counts: Counter[str] = Counter()
+        self._engine: Engine | None = None
+
+    def _on_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        if context is not None and context.compiled is not None:
+            self.counts[context.cache_hit.name] += 1
+
+    def install(self, engine: Engine | AsyncEngine):
+        if isinstance(engine, AsyncEngine):
+            engine = engine.sync_engine
+        self._engine = engine
+        event.listen(engine, "after_cursor_execute", self._on_execute)
+
+    def stats(self) -> dict[str, int | float]:
+        hits = self.counts["CACHE_HIT"]
+        total = hits + self.counts["CACHE_MISS"]
+        cache = getattr(self._engine, "_compiled_cache", None)
+        return {
+            **self.counts,
+            "size": len(cache) if cache is not None else 0,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+@cache
+def statement_cache() -> StatementCache:
+    ret = StatementCache()
+    MetricsManager.register("sql_statement_cache")(ret.stats)
+    return ret
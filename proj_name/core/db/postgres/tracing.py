@@ -0,0 +1,71 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from proj_name.core.db.postgres.pool import service_db_work
+
+
+@dataclass
+class RequestDbStats:
+    queries: int = 0
+    time: float = 0.0
+    checkouts: int = 0
+
+    @property
+    def server_timing(self) -> str:
+        """`Server-Timing` header value"""
+        return (
+            f"db;dur={self.time * 1000:.2f};"
+            f'desc="queries={self.queries} checkouts={self.checkouts}"'
+        )
+
+
+# stats of the current request (see `core.fastapi.routes.db.DbReleaseRoute`)
+request_db_stats: ContextVar[RequestDbStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def _current_stats() -> RequestDbStats | None:
+    if service_db_work.get():
+        return None
+    return request_db_stats.get()
+
+
+class QueryTracer:
+    """Counts queries, their time and pool checkouts into `request_db_stats`
+    (except `service_db_work`)
+    """
+
+    @staticmethod
+    def _before_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        # kept in the execution context: a failed query has no after event
+        context._trace_started = time.perf_counter()
+
+    @staticmethod
+    def _after_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        stats = _current_stats()
+        if stats is not None:
+            stats.queries += 1
+            stats.time += time.perf_counter() - context._trace_started
+
+    @staticmethod
+    def _on_checkout(dbapi_conn, record, proxy):
+        stats = _current_stats()
+        if stats is not None:
+            stats.checkouts += 1
+
+    @classmethod
+    def install(cls, engine: Engine | AsyncEngine):
+        if isinstance(engine, AsyncEngine):
+            engine = engine.sync_engine
+        event.listen(engine, "before_cursor_execute", cls._before_execute)
+        event.listen(engine, "after_cursor_execute", cls._after_execute)
+        event.listen(engine, "checkout", cls._on_checkout)
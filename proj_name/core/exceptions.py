@@ -35,6 +35,18 @@ class BadCreateDataException(DbException):
     status: int = 422
 
 
+class BadCursorException(DbException):
+    message: str = "Got bad pagination cursor"
+    code: str = "204"
+    status: int = 422
+
+
+class BadOrderingException(DbException):
+    message: str = "Got bad ordering key `{key}`"
+    code: str = "205"
+    status: int = 422
+
+
 # * Auth * #
 class AuthException(AppException):
     message: str = "Base Auth Exception"
@@ -64,3 +76,15 @@ class BadLoginCredsError(AuthException):
     message: str = "Got bad login creds"
     code: str = "304"
     status: int = 422
+
+
+class PasswordServiceBusyError(AuthException):
+    message: str = "Too many password checks. Try again later"
+    code: str = "305"
+    status: int = 503
+
+
+class JwtKeyError(AuthException):
+    message: str = "Bad jwt key `{kid}`: {reason}"
+    code: str = "306"
+    status: int = 500
@@ -34,3 +34,5 @@ class FilterContext:
     m: type[Table | DeclarativeBase]
     stmt: Select
     wheres: list["SQLWhereType"] = dc_field(default_factory=list)
+    # applied before the ordering of the request (e.g. `ts_rank`)
+    order_bys: list["SQLOrderByType"] = dc_field(default_factory=list)
@@ -1,6 +1,9 @@
+import json
 from functools import cache
 from typing import TYPE_CHECKING, Any
-from sqlalchemy import Column
+from pydantic_core import to_jsonable_python
+from sqlalchemy import Column, cast, func, literal, not_, or_
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH
 from sqlalchemy.sql import operators
 
 from proj_name.core.fastapi.filter.base import BaseFilterSchema
@@ -61,6 +64,101 @@ def f_jb_not_in(ctx: "FilterContext", k: "KeyType", v: Any):
     ctx.wheres.append(jb_operator(col, k.column_key).not_in(v))
 
 
+# * GIN (jsonb_path_ops) friendly * #
+# `data @> '{"key": value}'` can use a GIN index of `data` unlike `->>`
+jb_contains = operators.custom_op("@>", is_comparison=True)
+jb_has_key = operators.custom_op("?", is_comparison=True)
+
+
+def _jb_obj(k: "KeyType", v: Any):
+    return literal({k.column_key: to_jsonable_python(v)}, JSONB)
+
+
+def f_jbc_eq(ctx: "FilterContext", k: "KeyType", v: Any):
+    col: Column = getattr(ctx.m, "data")
+    ctx.wheres.append(jb_contains(col, _jb_obj(k, v)))
+
+
+def f_jbc_neq(ctx: "FilterContext", k: "KeyType", v: Any):
+    """Rows with the key only (`data ? key`), the same as `->>` ones"""
+    col: Column = getattr(ctx.m, "data")
+    ctx.wheres.append(jb_has_key(col, k.column_key))
+    ctx.wheres.append(not_(jb_contains(col, _jb_obj(k, v))))
+
+
+def f_jbc_in(ctx: "FilterContext", k: "KeyType", v: Any):
+    col: Column = getattr(ctx.m, "data")
+    ctx.wheres.append(or_(*(jb_contains(col, _jb_obj(k, vi)) for vi in v)))
+
+
+def f_jbc_not_in(ctx: "FilterContext", k: "KeyType", v: Any):
+    """Rows with the key only (`data ? key`), the same as `->>` ones"""
+    col: Column = getattr(ctx.m, "data")
+    ctx.wheres.append(jb_has_key(col, k.column_key))
+    ctx.wheres.append(
+        not_(or_(*(jb_contains(col, _jb_obj(k, vi)) for vi in v)))
+    )
+
+
+def _jb_path_exists(ctx: "FilterContext", k: "KeyType", op: str, v: Any):
+    """`jsonb_path_exists(data, '$."key" ? (@ <op> $v)', '{"v": value}')`"""
+    col: Column = getattr(ctx.m, "data")
+    path = f"$.{json.dumps(k.column_key)} ? (@ {op} $v)"
+    ctx.wheres.append(
+        func.jsonb_path_exists(
+            col,
+            cast(path, JSONPATH),
+            literal({"v": to_jsonable_python(v)}, JSONB),
+        )
+    )
+
+
+def f_jbp_lt(ctx: "FilterContext", k: "KeyType", v: Any):
+    _jb_path_exists(ctx, k, "<", v)
+
+
+def f_jbp_le(ctx: "FilterContext", k: "KeyType", v: Any):
+    _jb_path_exists(ctx, k, "<=", v)
+
+
+def f_jbp_gt(ctx: "FilterContext", k: "KeyType", v: Any):
+    _jb_path_exists(ctx, k, ">", v)
+
+
+def f_jbp_ge(ctx: "FilterContext", k: "KeyType", v: Any):
+    _jb_path_exists(ctx, k, ">=", v)
+
+
+@cache
+def jsonb_gin_map() -> dict[str, "AlchemFilterOpFunc"]:
+    """Operators of the `data` JSONB keys for the GIN index
+    (`core.db.postgres.migrations.create_jsonb_gin_index`): equality and
+    `in` by the containment, ranges by `jsonb_path_exists`, `like` ones by
+    `->>` (use `create_jsonb_expression_index` for them)
+    """
+    return {
+        "": f_jbc_eq,
+        #
+        "eq": f_jbc_eq,
+        "neq": f_jbc_neq,
+        "lt": f_jbp_lt,
+        "le": f_jbp_le,
+        "gt": f_jbp_gt,
+        "ge": f_jbp_ge,
+        #
+        "from": f_jbp_ge,
+        "till": f_jbp_le,
+        #
+        "like": f_jb_like,
+        "not_like": f_jb_not_like,
+        "ilike": f_jb_ilike,
+        "not_ilike": f_jb_not_ilike,
+        #
+        "in": f_jbc_in,
+        "not_in": f_jbc_not_in,
+    }
+
+
 class CrashliticsZipFilter(BaseFilterSchema):
 
     device_id: str | None = None
@@ -97,5 +195,4 @@ class CrashliticsZipFilter(BaseFilterSchema):
                 filter func. `filter_type` is a name of filter group (like:
                 SQLAlchemy, MongoDb, etc)
         """
-        jb_map = cls.jsonb_map()
-        return {"alch": {"device_id": jb_map}}
+        return {"alch": {"device_id": jsonb_gin_map()}}
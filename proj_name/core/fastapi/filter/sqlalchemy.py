@@ -1,89 +1,218 @@
 from functools import cache
 from typing import Any, Callable, Sequence
 from loguru import logger
-from sqlalchemy import Column, Select, Table
+from sqlalchemy import Column, Select, Table, bindparam, func
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql import operators
+from proj_name.core.db.postgres.search import ts_match, ts_rank
 from proj_name.core.fastapi.filter.base import BaseFilter, BaseFilterSchema
-from proj_name.core.fastapi.filter.common import FilterContext, KeyType
+from proj_name.core.fastapi.filter.common import (
+    FilterContext,
+    KeyType,
+    SQLWhereType,
+)
 
 # A little bit messsy, but very flexible way of setting filtering logic
 
 
 # * FUNCS * #
 AlchemFilterOpFunc = Callable[[FilterContext, KeyType, Any], None]
+AlchemFilterExprFunc = Callable[[Any, Any], SQLWhereType]
+# Precompiled filter of one schema field: appends a where by the value
+FilterPlanItem = Callable[[FilterContext, Any], None]
+# Where with a bind param of the field and a converter of the value to it
+FilterBoundItem = tuple[SQLWhereType, Callable[[Any], Any]]
+
+
+def e_eq(col: Column, v: Any) -> SQLWhereType:
+    return col == v
+
+
+def e_neq(col: Column, v: Any) -> SQLWhereType:
+    return col != v
+
+
+def e_lt(col: Column, v: Any) -> SQLWhereType:
+    return col < v
+
+
+def e_le(col: Column, v: Any) -> SQLWhereType:
+    return col <= v
+
+
+def e_gt(col: Column, v: Any) -> SQLWhereType:
+    return col > v
+
+
+def e_ge(col: Column, v: Any) -> SQLWhereType:
+    return col >= v
+
+
+def e_null(col: Column, v: bool) -> SQLWhereType:
+    return col.is_(None) if v else col.is_not(None)
+
+
+def _same(v: Any) -> Any:
+    return v
+
+
+def _like_pattern(v: str) -> str:
+    if "%" not in v:
+        v = "%" + v + "%"
+    return v
+
+
+def e_like(col: Column, v: str) -> SQLWhereType:
+    return col.like(_like_pattern(v))
+
+
+def e_not_like(col: Column, v: str) -> SQLWhereType:
+    return col.not_like(_like_pattern(v))
+
+
+def e_ilike(col: Column, v: str) -> SQLWhereType:
+    return col.ilike(_like_pattern(v))
+
+
+def e_not_ilike(col: Column, v: str) -> SQLWhereType:
+    return col.not_ilike(_like_pattern(v))
+
+
+def escape_like(v: str) -> str:
+    """Escapes LIKE wildcards (`\\` is the default escape of postgres)"""
+    return v.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _contains_pattern(v: str) -> str:
+    return "%" + escape_like(v) + "%"
+
+
+def _prefix_pattern(v: str) -> str:
+    return escape_like(v) + "%"
+
+
+def _lower_prefix_pattern(v: str) -> str:
+    return escape_like(v.lower()) + "%"
+
+
+def _lower_like(col: Any, v: Any) -> SQLWhereType:
+    return func.lower(col).like(v)
+
+
+def e_icontains(col: Column, v: str) -> SQLWhereType:
+    """`col ILIKE '%v%'` (v is escaped), can use a `pg_trgm` GIN index
+    (`core.db.postgres.migrations.create_trgm_index`)
+    """
+    return col.ilike(_contains_pattern(v))
+
+
+def e_startswith(col: Column, v: str) -> SQLWhereType:
+    """`col LIKE 'v%'`, can use a btree `text_pattern_ops` index
+    (`create_prefix_index(..., lower=False)`)
+    """
+    return col.like(_prefix_pattern(v))
+
+
+def e_istartswith(col: Column, v: str) -> SQLWhereType:
+    """`lower(col) LIKE 'v%'`, can use a btree `text_pattern_ops` index of
+    `lower(col)` (`create_prefix_index`)
+    """
+    return _lower_like(col, _lower_prefix_pattern(v))
+
+
+def e_in(col: Column, v: Sequence[Any]) -> SQLWhereType:
+    return col.in_(v)
+
+
+def e_not_in(col: Column, v: Sequence[Any]) -> SQLWhereType:
+    return col.not_in(v)
+
+
+def e_search(col: Column, v: str) -> SQLWhereType:
+    """`col @@ websearch_to_tsquery(config, v)` of the `tsvector` column
+    (see `proj_name.models.base.TsVectorMixin`)
+    """
+    return ts_match(col, v)
 
 
 def f_eq(ctx: FilterContext, k: KeyType, v: Any):
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col == v)
+    ctx.wheres.append(e_eq(getattr(ctx.m, k.column_key), v))
 
 
 def f_neq(ctx: FilterContext, k: KeyType, v: Any):
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col != v)
+    ctx.wheres.append(e_neq(getattr(ctx.m, k.column_key), v))
 
 
 def f_lt(ctx: FilterContext, k: KeyType, v: Any):
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col < v)
+    ctx.wheres.append(e_lt(getattr(ctx.m, k.column_key), v))
 
 
 def f_le(ctx: FilterContext, k: KeyType, v: Any):
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col <= v)
+    ctx.wheres.append(e_le(getattr(ctx.m, k.column_key), v))
 
 
 def f_gt(ctx: FilterContext, k: KeyType, v: Any):
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col > v)
+    ctx.wheres.append(e_gt(getattr(ctx.m, k.column_key), v))
 
 
 def f_ge(ctx: FilterContext, k: KeyType, v: Any):
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col >= v)
+    ctx.wheres.append(e_ge(getattr(ctx.m, k.column_key), v))
 
 
 def f_null(ctx: FilterContext, k: KeyType, v: bool):
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col.is_(None) if v else col.is_not(None))
+    ctx.wheres.append(e_null(getattr(ctx.m, k.column_key), v))
 
 
 def f_like(ctx: FilterContext, k: KeyType, v: str):
-    if "%" not in v:
-        v = "%" + v + "%"
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col.like(v))
+    ctx.wheres.append(e_like(getattr(ctx.m, k.column_key), v))
 
 
 def f_not_like(ctx: FilterContext, k: KeyType, v: str):
-    if "%" not in v:
-        v = "%" + v + "%"
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col.not_like(v))
+    ctx.wheres.append(e_not_like(getattr(ctx.m, k.column_key), v))
 
 
 def f_ilike(ctx: FilterContext, k: KeyType, v: str):
-    if "%" not in v:
-        v = "%" + v + "%"
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col.ilike(v))
+    ctx.wheres.append(e_ilike(getattr(ctx.m, k.column_key), v))
 
 
 def f_not_ilike(ctx: FilterContext, k: KeyType, v: str):
-    if "%" not in v:
-        v = "%" + v + "%"
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col.not_ilike(v))
+    ctx.wheres.append(e_not_ilike(getattr(ctx.m, k.column_key), v))
+
+
+def f_icontains(ctx: FilterContext, k: KeyType, v: str):
+    ctx.wheres.append(e_icontains(getattr(ctx.m, k.column_key), v))
+
+
+def f_startswith(ctx: FilterContext, k: KeyType, v: str):
+    ctx.wheres.append(e_startswith(getattr(ctx.m, k.column_key), v))
+
+
+def f_istartswith(ctx: FilterContext, k: KeyType, v: str):
+    ctx.wheres.append(e_istartswith(getattr(ctx.m, k.column_key), v))
 
 
 def f_in(ctx: FilterContext, k: KeyType, v: Sequence[Any]):
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col.in_(v))
+    ctx.wheres.append(e_in(getattr(ctx.m, k.column_key), v))
 
 
 def f_not_in(ctx: FilterContext, k: KeyType, v: Sequence[Any]):
-    col: Column = getattr(ctx.m, k.column_key)
-    ctx.wheres.append(col.not_in(v))
+    ctx.wheres.append(e_not_in(getattr(ctx.m, k.column_key), v))
+
+
+def f_search(ctx: FilterContext, k: KeyType, v: str):
+    ctx.wheres.append(e_search(getattr(ctx.m, k.column_key), v))
+
+
+def f_search_rank(ctx: FilterContext, k: KeyType, v: str):
+    """`search` ordered by `ts_rank` (the most relevant first), the ordering
+    of the request is applied after it.
+
+    NOTE: It's not compatible with the cursor paginator (rank isn't a
+    column of the keyset).
+    """
+    col = getattr(ctx.m, k.column_key)
+    ctx.wheres.append(e_search(col, v))
+    ctx.order_bys.append(ts_rank(col, v).desc())
 
 
 class AlchemyBaseFilter(BaseFilter):
@@ -114,10 +243,198 @@ class AlchemyBaseFilter(BaseFilter):
             "ilike": f_ilike,
             "not_ilike": f_not_ilike,
             #
+            "icontains": f_icontains,
+            "startswith": f_startswith,
+            "istartswith": f_istartswith,
+            #
+            "search": f_search,
+            "search_rank": f_search_rank,
+            #
             "in": f_in,
             "not_in": f_not_in,
         }
 
+    @classmethod
+    @cache  # risky
+    def _get_filter2expression(cls) -> dict[str, AlchemFilterExprFunc]:
+        """Column expression versions of `_get_filter2operator` funcs"""
+        return {
+            "": e_eq,
+            #
+            "eq": e_eq,
+            "neq": e_neq,
+            "lt": e_lt,
+            "le": e_le,
+            "ge": e_ge,
+            "gt": e_gt,
+            #
+            "from": e_ge,
+            "till": e_le,
+            #
+            "null": e_null,
+            #
+            "like": e_like,
+            "not_like": e_not_like,
+            "ilike": e_ilike,
+            "not_ilike": e_not_ilike,
+            #
+            "icontains": e_icontains,
+            "startswith": e_startswith,
+            "istartswith": e_istartswith,
+            #
+            "search": e_search,
+            #
+            "in": e_in,
+            "not_in": e_not_in,
+        }
+
+    @staticmethod
+    def _op_item(func: AlchemFilterOpFunc, key: KeyType) -> FilterPlanItem:
+        def item(ctx: FilterContext, v: Any):
+            func(ctx, key, v)
+
+        return item
+
+    @staticmethod
+    def _expr_item(func: AlchemFilterExprFunc, col: Any) -> FilterPlanItem:
+        def item(ctx: FilterContext, v: Any):
+            ctx.wheres.append(func(col, v))
+
+        return item
+
+    @classmethod
+    @cache
+    def get_plan(
+        cls,
+        model: type[Table | DeclarativeBase],
+        schema: type[BaseFilterSchema],
+    ) -> dict[str, FilterPlanItem]:
+        """Compiles the fields of the filter schema into the prebuilt
+        functions (field -> column -> operator), once per `(model, schema)`.
+
+        Fields with a `func_map` function or with a column which isn't an
+        attribute of the model are resolved by the operator funcs on call.
+        """
+        op_map = cls._get_filter2operator()
+        expr_map = cls._get_filter2expression()
+        func_map = schema.func_map().get(cls.filter_type, {})
+        plan: dict[str, FilterPlanItem] = {}
+        for field in schema.model_fields:
+            key = KeyType(field)
+            col = getattr(model, key.column_key, None)
+            if key.operator in func_map.get(key.column_key, {}):
+                func = func_map[key.column_key][key.operator]
+                plan[field] = cls._op_item(func, key)
+            elif col is not None and key.operator in expr_map:
+                plan[field] = cls._expr_item(expr_map[key.operator], col)
+            elif key.operator in op_map:
+                plan[field] = cls._op_item(op_map[key.operator], key)
+            else:
+                logger.debug(
+                    "[{}] Skipped filter field={}; schema={}",
+                    cls.__name__,
+                    field,
+                    schema.__name__,
+                )
+        return plan
+
+    @classmethod
+    @cache  # risky
+    def _get_filter2bound(
+        cls,
+    ) -> dict[str, tuple[Callable[[Any, Any], SQLWhereType], Callable, bool]]:
+        """Operators which can be compiled with a bind param of the value
+
+        Returns:
+            dict[operator, tuple[operator_func, value_converter, expanding]]
+        """
+        same = _same
+        return {
+            "": (operators.eq, same, False),
+            #
+            "eq": (operators.eq, same, False),
+            "neq": (operators.ne, same, False),
+            "lt": (operators.lt, same, False),
+            "le": (operators.le, same, False),
+            "ge": (operators.ge, same, False),
+            "gt": (operators.gt, same, False),
+            #
+            "from": (operators.ge, same, False),
+            "till": (operators.le, same, False),
+            #
+            "like": (operators.like_op, _like_pattern, False),
+            "not_like": (operators.not_like_op, _like_pattern, False),
+            "ilike": (operators.ilike_op, _like_pattern, False),
+            "not_ilike": (operators.not_ilike_op, _like_pattern, False),
+            #
+            "icontains": (operators.ilike_op, _contains_pattern, False),
+            "startswith": (operators.like_op, _prefix_pattern, False),
+            "istartswith": (_lower_like, _lower_prefix_pattern, False),
+            #
+            "search": (ts_match, same, False),
+            #
+            "in": (operators.in_op, list, True),
+            "not_in": (operators.not_in_op, list, True),
+        }
+
+    @classmethod
+    @cache
+    def get_bound_plan(
+        cls,
+        model: type[Table | DeclarativeBase],
+        schema: type[BaseFilterSchema],
+    ) -> dict[str, FilterBoundItem]:
+        """Fields of the filter schema compiled into the wheres with the
+        bind params (`f_<field>`) instead of values, so a statement built of
+        them can be reused for any values of the same fields.
+
+        Fields with a `func_map` function, without a model column or with
+        the value dependent operator (`null`) aren't included.
+        """
+        bound_map = cls._get_filter2bound()
+        func_map = schema.func_map().get(cls.filter_type, {})
+        plan: dict[str, FilterBoundItem] = {}
+        for field in schema.model_fields:
+            key = KeyType(field)
+            col = getattr(model, key.column_key, None)
+            if key.operator in func_map.get(key.column_key, {}):
+                continue
+            if col is None or key.operator not in bound_map:
+                continue
+            op, converter, expanding = bound_map[key.operator]
+            param = bindparam(f"f_{field}", expanding=expanding)
+            plan[field] = (op(col, param), converter)
+        return plan
+
+    def shape(
+        self, model: type[Table | DeclarativeBase], filters: BaseFilterSchema
+    ) -> tuple[tuple[str, ...], dict[str, Any]] | None:
+        """
+        Returns:
+            tuple[fields, params] - active fields of the filter (the shape of
+                the filtered statement) and the values of their bind params;
+                `None` if some of the active fields can't be bound
+        """
+        plan = self.get_bound_plan(model, type(filters))
+        values = filters.to_filter()
+        params = {}
+        for field, value in values.items():
+            if field not in plan:
+                return None
+            params[f"f_{field}"] = plan[field][1](value)
+        return tuple(sorted(values)), params
+
+    def filter_shape(
+        self,
+        model: type[Table | DeclarativeBase],
+        stmt: Select,
+        schema: type[BaseFilterSchema],
+        fields: tuple[str, ...],
+    ) -> Select:
+        """`filter` with the bind params of the fields (see `shape`)"""
+        plan = self.get_bound_plan(model, schema)
+        return stmt.where(*(plan[fi][0] for fi in fields))
+
     def filter(
         self,
         model: type[Table | DeclarativeBase],
@@ -128,21 +445,14 @@ class AlchemyBaseFilter(BaseFilter):
     ):
         # TODO: No model - any labeled fields filter
         ctx = FilterContext(model, stmt)
-        op_map = self._get_filter2operator()
-        func_map = filters.func_map().get(self.filter_type, {})
+        plan = self.get_plan(model, type(filters))
         for field, value in filters.to_filter().items():
-            key = KeyType(field)
-            if (field, self.filter_type) in func_map:
-                logger.debug(
-                    "[{}] Cool! Func filter: field={}; filter={}",
-                    self.__class__.__name__,
-                    field,
-                    filters,
-                )
-                func_map[key.column_key][key.operator](ctx, key, value)
-            elif key.operator in op_map:
-                op_map[key.operator](ctx, key, value)
+            item = plan.get(field)
+            if item is not None:
+                item(ctx, value)
         stmt = stmt.where(*ctx.wheres)
+        if ctx.order_bys:
+            stmt = stmt.order_by(*ctx.order_bys)
         return stmt
 
 
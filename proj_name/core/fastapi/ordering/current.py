@@ -11,16 +11,15 @@ from proj_name.core.fastapi.ordering.sqlalchemy import (
 @cache
 def OrderingDepends(order_meta: AlchOrderingMeta):
 
-    order_fields = []
-    for oi in order_meta.ordering_fields():
-        order_fields.append("-" + oi)
-        order_fields.append("+" + oi)
-    order_fields = Literal[tuple(order_fields)]
+    order_fields = Literal[tuple(order_meta.order_index())]
 
     def order_schema(
         order_by: list[order_fields] = Query(  # noqa # type:ignore
             default_factory=order_meta.default_order,
-            description="`-` - descending; `+` - ascending",
+            description=(
+                "`-` - descending; `+` - ascending; `:nulls_first` /"
+                " `:nulls_last` suffix - NULLs position"
+            ),
         )
     ) -> AlchOrderConsturctor:
         return AlchOrderConsturctor(order_by, order_meta)
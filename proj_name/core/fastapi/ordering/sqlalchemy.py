@@ -1,8 +1,9 @@
 # pyright: reportIncompatibleMethodOverride=false
-from functools import cache
-from typing import TYPE_CHECKING
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Literal, Mapping, NamedTuple
 from sqlalchemy import Column, Select, UnaryExpression
 
+from proj_name.core.exceptions import BadOrderingException
 from proj_name.core.fastapi.ordering.base import (
     BaseOrderConsturctor,
     BaseOrderingMeta,
@@ -11,6 +12,34 @@ from proj_name.core.fastapi.ordering.base import (
 if TYPE_CHECKING:
     from proj_name.core.db.postgres.crud import CrudBase
 
+NULLS_SUFFIXES: dict[str, Literal["first", "last"]] = {
+    ":nulls_first": "first",
+    ":nulls_last": "last",
+}
+
+
+class OrderKey(NamedTuple):
+    field: str
+    column: Column
+    desc: bool
+    nulls: Literal["first", "last"] | None
+    expression: UnaryExpression
+
+    @classmethod
+    def create(
+        cls,
+        field: str,
+        column: Column,
+        desc: bool,
+        nulls: Literal["first", "last"] | None = None,
+    ) -> "OrderKey":
+        expr = column.desc() if desc else column.asc()
+        if nulls == "first":
+            expr = expr.nulls_first()
+        elif nulls == "last":
+            expr = expr.nulls_last()
+        return cls(field, column, desc, nulls, expr)
+
 
 class AlchOrderingMeta(BaseOrderingMeta):
     def ordering_fields(self) -> list[str]:
@@ -19,13 +48,55 @@ class AlchOrderingMeta(BaseOrderingMeta):
     def default_order(self) -> list[str]:
         return [f"-{self.ordering_fields()[0]}"]
 
-    def order_map(self) -> dict[str, UnaryExpression]:
+    def order_index(self) -> Mapping[str, OrderKey]:
+        """order key (`-field`, `+field`, `-field:nulls_last`, ...) to
+        OrderKey mapper
+        """
         raise NotImplementedError()
 
+    def order_map(self) -> Mapping[str, UnaryExpression]:
+        return {k: v.expression for k, v in self.order_index().items()}
+
+    def column_map(self) -> Mapping[str, Column]:
+        """field_name to column mapper (used for keyset pagination)"""
+        raise NotImplementedError()
+
+    def tie_break_fields(self) -> list[str]:
+        """Unique fields appended to the order to make it stable"""
+        return []
+
 
 class AlchCrudedOrderingMeta(AlchOrderingMeta):
+    """Ordering of the crud model. The index of the order keys is built once
+    (on the crud creation) and is immutable.
+
+    NULLS FIRST / LAST variants (`-field:nulls_last`) are added for the
+    nullable columns only.
+    """
+
     def __init__(self, crud: "CrudBase"):
         self._crud = crud
+        columns: dict[str, Column] = {}
+        index: dict[str, OrderKey] = {}
+        fields = self.ordering_fields()
+        for fi in (*fields, *self.tie_break_fields()):
+            columns[fi] = getattr(crud.model, fi)
+        for fi in fields:
+            col = columns[fi]
+            nullable = getattr(col.expression, "nullable", True)
+            for sign, desc in (("-", True), ("+", False)):
+                index[sign + fi] = OrderKey.create(fi, col, desc)
+                if not nullable:
+                    continue
+                for suffix, nulls in NULLS_SUFFIXES.items():
+                    index[sign + fi + suffix] = OrderKey.create(
+                        fi, col, desc, nulls
+                    )
+        self._column_map = MappingProxyType(columns)
+        self._order_index = MappingProxyType(index)
+        self._order_map = MappingProxyType(
+            {k: v.expression for k, v in index.items()}
+        )
 
     def ordering_fields(self) -> list[str]:
         return self._crud.ordering_fields()
@@ -33,21 +104,59 @@ class AlchCrudedOrderingMeta(AlchOrderingMeta):
     def default_order(self) -> list[str]:
         return self._crud.default_order()
 
-    @cache
-    def order_map(self) -> dict[str, UnaryExpression]:
-        ret: dict[str, UnaryExpression] = {}
-        for ori in self.ordering_fields():
-            col: Column = getattr(self._crud.model, ori)
-            ret["-" + ori] = col.desc()
-            ret["+" + ori] = col.asc()
-        return ret
+    def order_index(self) -> Mapping[str, OrderKey]:
+        return self._order_index
+
+    def order_map(self) -> Mapping[str, UnaryExpression]:
+        return self._order_map
+
+    def column_map(self) -> Mapping[str, Column]:
+        return self._column_map
+
+    def tie_break_fields(self) -> list[str]:
+        return self._crud.get_pks_fields()
 
 
 class AlchOrderConsturctor(BaseOrderConsturctor[AlchOrderingMeta]):
+    def __init__(self, cur_order: list[str], order_meta: AlchOrderingMeta):
+        """
+        Raises:
+            BadOrderingException - unknown or repeated field order key
+        """
+        super().__init__(cur_order, order_meta)
+        index = order_meta.order_index()
+        keys: list[OrderKey] = []
+        used: set[str] = set()
+        for coi in self.cur_order:
+            key = index.get(coi)
+            if key is None or key.field in used:
+                raise BadOrderingException(key=coi)
+            used.add(key.field)
+            keys.append(key)
+        # tie-breakers in the direction of the last order key
+        last_desc = keys[-1].desc if keys else True
+        column_map = order_meta.column_map()
+        for fi in order_meta.tie_break_fields():
+            if fi not in used:
+                keys.append(OrderKey.create(fi, column_map[fi], last_desc))
+        self.keys: tuple[OrderKey, ...] = tuple(keys)
 
     def order(self, stmt: Select, *args, **kwargs) -> Select:
-        orders = []
-        order_map = self.order_meta.order_map()
-        for coi in self.cur_order:
-            orders.append(order_map[coi])
-        return stmt.order_by(*orders)
+        return stmt.order_by(*(ki.expression for ki in self.keys))
+
+    def keyset(self) -> list[tuple[str, Column, bool]]:
+        """
+        Returns:
+            list[tuple[field_name, column, is_desc]] - current order with
+                tie-breaker fields appended (in the direction of the last
+                order key)
+        Raises:
+            BadOrderingException - NULLS ordering (keyset needs NOT NULL
+                keys)
+        """
+        ret = []
+        for ki in self.keys:
+            if ki.nulls is not None:
+                raise BadOrderingException(key=ki.field)
+            ret.append((ki.field, ki.column, ki.desc))
+        return ret
@@ -1,4 +1,11 @@
-from pydantic import BaseModel, ConfigDict, Field
+import base64
+import json
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from pydantic_core import to_jsonable_python
+
+from proj_name.core.exceptions import BadCursorException
 
 
 class PageLimitParams(BaseModel):
@@ -13,9 +20,47 @@ class OffsetLimitParams(BaseModel):
     limit: int = Field(ge=1)
 
 
+class CursorLimitParams(BaseModel):
+    model_config = ConfigDict(frozen=True, validate_default=False)
+    cursor: str | None = None
+    limit: int = Field(ge=1)
+
+
+class CursorData(BaseModel):
+    """Opaque keyset cursor.
+
+    `v` - values of the order keys of the boundary row;
+    `d` - direction: `n` (rows after the boundary) or `p` (rows before it)
+    """
+
+    model_config = ConfigDict(frozen=True)
+    v: list[Any]
+    d: Literal["n", "p"] = "n"
+
+    @property
+    def backward(self) -> bool:
+        return self.d == "p"
+
+    def encode(self) -> str:
+        raw = json.dumps(
+            to_jsonable_python(self.model_dump()), separators=(",", ":")
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "CursorData":
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            return cls.model_validate_json(raw)
+        except (ValueError, ValidationError) as e:
+            raise BadCursorException(cursor=cursor) from e
+
+
 class BasePaginator:
     def __init__(
-        self, page_limit: int, cur_params: PageLimitParams | None = None
+        self,
+        page_limit: int,
+        cur_params: PageLimitParams | CursorLimitParams | None = None,
     ):
         self.page_limit = page_limit
         self.cur_params = cur_params
@@ -23,7 +68,7 @@ class BasePaginator:
     def page2offset(self, params: PageLimitParams) -> OffsetLimitParams:
         limit = min(self.page_limit, params.limit)
         offset = (params.page - 1) * limit
-        return OffsetLimitParams(offset, limit)
+        return OffsetLimitParams(offset=offset, limit=limit)
 
     def paginate(self, *args, **kwargs):
         """Paginate query function"""
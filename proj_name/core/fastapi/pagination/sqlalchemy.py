@@ -1,14 +1,34 @@
 from functools import cache
-from sqlalchemy import Select
+from typing import TYPE_CHECKING, Any, Sequence
+
+from fastapi import Query, Response
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Column, Integer, Select, and_, bindparam, or_, tuple_
 from typing_extensions import Self
-from fastapi import Query
+
+from proj_name.core.exceptions import BadCursorException
 from proj_name.core.fastapi.pagination.base import (
     BasePaginator,
+    CursorData,
+    CursorLimitParams,
     PageLimitParams,
 )
 
+if TYPE_CHECKING:
+    from proj_name.core.fastapi.ordering.sqlalchemy import AlchOrderConsturctor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+OFFSET_PARAM = "p_offset"
+LIMIT_PARAM = "p_limit"
+
 
 class AlchemyBasePaginator(BasePaginator):
+    # True if `paginate` filters rows (not only slices them)
+    narrows_rows: bool = False
+    # True if the page can be selected by a cached statement shape (see
+    # `order_paginate_bound`)
+    bindable: bool = True
 
     def from_query(self):
         def query_func(
@@ -27,7 +47,177 @@ class AlchemyBasePaginator(BasePaginator):
         rparams = self.page2offset(self.cur_params)
         return stmt.offset(rparams.offset).limit(rparams.limit)
 
+    def is_first_page(self) -> bool:
+        return self.cur_params is None or self.cur_params.page == 1
+
+    def order_paginate(
+        self, stmt: Select, ordering: "AlchOrderConsturctor"
+    ) -> Select:
+        return self.paginate(ordering.order(stmt))
+
+    def order_paginate_bound(
+        self, stmt: Select, ordering: "AlchOrderConsturctor"
+    ) -> Select:
+        """`order_paginate` with the bind params of offset and limit (the
+        values are returned by `bound_params`)
+        """
+        stmt = ordering.order(stmt)
+        if self.cur_params is None:
+            return stmt
+        return stmt.offset(bindparam(OFFSET_PARAM, type_=Integer)).limit(
+            bindparam(LIMIT_PARAM, type_=Integer)
+        )
+
+    def bound_params(self) -> dict[str, Any]:
+        if self.cur_params is None:
+            return {}
+        rparams = self.page2offset(self.cur_params)
+        return {OFFSET_PARAM: rparams.offset, LIMIT_PARAM: rparams.limit}
+
+    def process_result(
+        self, objs: Sequence[Any], response: Response
+    ) -> Sequence[Any]:
+        """Post processing of the fetched page (headers, trimming, etc)"""
+        return objs
+
+
+class AlchemyCursorPaginator(AlchemyBasePaginator):
+    """Keyset (cursor) paginator.
+
+    Instead of `OFFSET` it filters rows by the order keys of the boundary
+    row (`WHERE (k1, k2) < (:v1, :v2)`), so the cost of a page doesn't
+    depend on its depth. Cursors of the neighbour pages are returned in the
+    `X-Next-Cursor` / `X-Prev-Cursor` headers.
+
+    NOTE: order keys should be NOT NULL columns.
+    """
+
+    cur_params: CursorLimitParams | None
+    narrows_rows: bool = True
+    bindable: bool = False
+
+    def __init__(
+        self, page_limit: int, cur_params: CursorLimitParams | None = None
+    ):
+        super().__init__(page_limit, cur_params)
+        self._keyset: list[tuple[str, Column, bool]] = []
+        self._cursor: CursorData | None = None
+
+    def from_query(self):
+        def query_func(
+            cursor: str | None = Query(
+                None, description="`X-Next-Cursor` or `X-Prev-Cursor` value"
+            ),
+            limit: int = Query(self.page_limit, ge=1),
+        ) -> Self:
+            return self.__class__(
+                self.page_limit, CursorLimitParams(cursor=cursor, limit=limit)
+            )
+
+        return query_func
+
+    @property
+    def limit(self) -> int | None:
+        if self.cur_params is None:
+            return None
+        return min(self.page_limit, self.cur_params.limit)
+
+    def is_first_page(self) -> bool:
+        return self.cur_params is None or not self.cur_params.cursor
+
+    @property
+    def backward(self) -> bool:
+        return self._cursor is not None and self._cursor.backward
+
+    def _cursor_values(self) -> list[Any]:
+        values = self._cursor.v
+        if len(values) != len(self._keyset):
+            raise BadCursorException(cursor=self.cur_params.cursor)
+        ret = []
+        for (_, col, _), vi in zip(self._keyset, values):
+            try:
+                python_type = col.type.python_type
+            except NotImplementedError:
+                ret.append(vi)
+                continue
+            try:
+                ret.append(TypeAdapter(python_type).validate_python(vi))
+            except ValidationError as e:
+                raise BadCursorException(cursor=self.cur_params.cursor) from e
+        return ret
+
+    def _keyset_where(self):
+        values = self._cursor_values()
+        # `after` the boundary row in the direction of the scan
+        lesses = [desc != self.backward for _, _, desc in self._keyset]
+        cols = [col for _, col, _ in self._keyset]
+        if all(lesses):
+            return tuple_(*cols) < tuple_(*values)
+        if not any(lesses):
+            return tuple_(*cols) > tuple_(*values)
+        # mixed directions can't be compared as a row
+        ors = []
+        for i, (col, vi) in enumerate(zip(cols, values)):
+            eqs = [cj == vj for cj, vj in zip(cols[:i], values[:i])]
+            ors.append(and_(*eqs, col < vi if lesses[i] else col > vi))
+        return or_(*ors)
+
+    def paginate(self, stmt: Select) -> Select:
+        if self._cursor is not None:
+            stmt = stmt.where(self._keyset_where())
+        if self.limit is not None:
+            # one extra row to find out if there is a next page
+            stmt = stmt.limit(self.limit + 1)
+        return stmt
+
+    def order_paginate(
+        self, stmt: Select, ordering: "AlchOrderConsturctor"
+    ) -> Select:
+        self._keyset = ordering.keyset()
+        if self.cur_params is not None and self.cur_params.cursor:
+            self._cursor = CursorData.decode(self.cur_params.cursor)
+        stmt = stmt.order_by(
+            *[
+                col.desc() if desc != self.backward else col.asc()
+                for _, col, desc in self._keyset
+            ]
+        )
+        return self.paginate(stmt)
+
+    def _make_cursor(self, obj: Any, d: str) -> str:
+        return CursorData(
+            v=[getattr(obj, name) for name, _, _ in self._keyset], d=d
+        ).encode()
+
+    def process_result(
+        self, objs: Sequence[Any], response: Response
+    ) -> Sequence[Any]:
+        if self.limit is None:
+            return objs
+        has_more = len(objs) > self.limit
+        objs = list(objs[: self.limit])
+        if self.backward:
+            objs.reverse()
+        if not objs:
+            return objs
+        if has_more or self.backward:
+            response.headers[NEXT_CURSOR_HEADER] = self._make_cursor(
+                objs[-1], "n"
+            )
+        if (has_more and self.backward) or (
+            self._cursor is not None and not self.backward
+        ):
+            response.headers[PREV_CURSOR_HEADER] = self._make_cursor(
+                objs[0], "p"
+            )
+        return objs
+
 
 @cache
 def paginator1000() -> AlchemyBasePaginator:
     return AlchemyBasePaginator(1000)
+
+
+@cache
+def cursor_paginator1000() -> AlchemyCursorPaginator:
+    return AlchemyCursorPaginator(1000)
@@ -0,0 +1,68 @@
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from loguru import logger
+
+from proj_name.config import get_settings
+from proj_name.core.db.postgres.base import (
+    release_request_sessions,
+    request_sessions,
+)
+from proj_name.core.db.postgres.pool import current_route
+from proj_name.core.db.postgres.tracing import RequestDbStats, request_db_stats
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+
+def _log_stats(label: str, stats: RequestDbStats):
+    warn = get_settings().db.request_queries_warn
+    if (warn and stats.queries >= warn) or stats.checkouts > 1:
+        logger.warning("[Db] {}: {}", label, stats)
+    else:
+        logger.debug("[Db] {}: {}", label, stats)
+
+
+class DbReleaseRoute(APIRoute):
+    """Route which returns the connections of the request sessions
+    (`db_session`, `db_read_session`) to the pool right after the response
+    is built (the endpoint is called and its result is serialized), not
+    after the dependencies exit (i.e. the response is sent). Also labels
+    the connection hold metrics with the route.
+
+    DB work of the request (queries, their time and pool checkouts) is
+    added to the `Server-Timing` header and logged; too many queries
+    (N+1) and more than one checkout of the request are logged as warnings.
+
+    NOTE: the endpoint must commit its changes, the sessions are closed.
+    A streaming response body can't use the request sessions.
+
+    Example:
+    ```
+    router = APIRouter(route_class=DbReleaseRoute)
+    ```
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+        label = f"{','.join(sorted(self.methods))} {self.path_format}"
+
+        async def route_handler(request: Request) -> Response:
+            route_token = current_route.set(label)
+            sessions_token = request_sessions.set([])
+            stats = RequestDbStats()
+            stats_token = request_db_stats.set(stats)
+            try:
+                try:
+                    response = await handler(request)
+                finally:
+                    await release_request_sessions()
+            finally:
+                request_db_stats.reset(stats_token)
+                request_sessions.reset(sessions_token)
+                current_route.reset(route_token)
+            response.headers.append(SERVER_TIMING_HEADER, stats.server_timing)
+            _log_stats(label, stats)
+            return response
+
+        return route_handler
@@ -1,23 +1,46 @@
+import csv
 import datetime
+import io
+import json
 import uuid
+from typing import Any, AsyncIterator, Literal
+
 from fastapi import Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import Select, func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from proj_name.core.db.postgres.base import SessionMaker
+from proj_name.core.db.postgres.count import (
+    TOTAL_COUNT_HEADER,
+    BaseCountStrategy,
+    CountResult,
+    exact_count,
+)
 from proj_name.core.db.postgres.crud import CrudBase, ModelCreateT, ModelT
+from proj_name.core.db.postgres.statements import StatementCache
 from proj_name.core.fastapi.filter.base import BaseFilterSchema
 from proj_name.core.fastapi.filter.sqlalchemy import (
     AlchemyBaseFilter,
     get_AlchemyFilter,
 )
 from proj_name.core.fastapi.ordering.sqlalchemy import AlchOrderConsturctor
-from proj_name.core.fastapi.pagination.sqlalchemy import AlchemyBasePaginator
+from proj_name.core.fastapi.pagination.sqlalchemy import (
+    AlchemyBasePaginator,
+    AlchemyCursorPaginator,
+)
 
-TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_SQL_LABEL = "x_total_count"
 BOUND_DATE_FROM_HEADER = "X-Date-From"
 BOUND_DATE_TILL_HEADER = "X-Date-Till"
 
+ExportFormat = Literal["ndjson", "csv"]
+EXPORT_MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
 
 class BaseHeaderDate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -55,21 +78,52 @@ async def get_bound_dates(
     """
     bd_stmt = crud.date_bounds()
     bd_stmt = filter_class.filter(crud._model, bd_stmt, filter_schema)
+    # aggregates only, the ordering of the filter (search rank) isn't needed
+    bd_stmt = bd_stmt.order_by(None)
 
     res = (await session.execute(bd_stmt)).first()
     return BaseHeaderDate.model_validate(res)
 
 
-async def get_count(session: AsyncSession, stmt: Select) -> int:
-    count_stmt = select(func.count()).select_from(stmt.subquery("count_sq"))
-    return (await session.execute(count_stmt)).scalar_one()
+def fuse_meta_columns(
+    stmt: Select,
+    crud: CrudBase[ModelT, ModelCreateT],
+    paginator: AlchemyBasePaginator,
+    add_total_count: bool,
+    add_bound_date: bool,
+) -> Select:
+    """Adds total count and date bounds columns to the page select.
+
+    Window functions (`count(*) OVER ()`) are computed before `LIMIT`, so
+    they are used for offset pagination. Paginators which narrow the rows
+    by themselves (keyset) get a joined one-row aggregate subquery instead.
+    """
+    columns = []
+    if paginator.narrows_rows:
+        sq = stmt.subquery("meta_sq")
+        if add_total_count:
+            columns.append(func.count().label(TOTAL_COUNT_SQL_LABEL))
+        if add_bound_date:
+            col = sq.c[crud.get_boundate_field().key]
+            columns.append(func.min(col).label(crud.MIN_DATE_SQL_LABEL))
+            columns.append(func.max(col).label(crud.MAX_DATE_SQL_LABEL))
+        meta = select(*columns).select_from(sq).subquery("meta")
+        return stmt.join(meta, true()).add_columns(*meta.c)
+    else:
+        if add_total_count:
+            columns.append(func.count().over().label(TOTAL_COUNT_SQL_LABEL))
+        if add_bound_date:
+            col = crud.get_boundate_field()
+            columns.append(func.min(col).over().label(crud.MIN_DATE_SQL_LABEL))
+            columns.append(func.max(col).over().label(crud.MAX_DATE_SQL_LABEL))
+    return stmt.add_columns(*columns)
 
 
 async def model_get(
     response: Response,
     session: AsyncSession,
     crud: CrudBase[ModelT, ModelCreateT],
-    paginator: AlchemyBasePaginator,
+    paginator: AlchemyBasePaginator | AlchemyCursorPaginator,
     ordering: AlchOrderConsturctor,
     filter_schema: BaseFilterSchema,
     /,
@@ -78,22 +132,208 @@ async def model_get(
     *,
     select_stmt: Select | None = None,
     filter_class: AlchemyBaseFilter = get_AlchemyFilter(),
+    fused: bool = False,
+    count_strategy: BaseCountStrategy = exact_count(),
+    stmt_cache: StatementCache | None = None,
 ) -> list[ModelT]:
-    stmt = select_stmt or crud._select_model
+    """
+    Args:
+        fused: fetch total count and date bounds in the same round trip as
+            the page (see `fuse_meta_columns`). Falls back to the separate
+            queries only for an empty non-first page.
+        count_strategy: how `X-Total-Count` is calculated (see
+            `core.db.postgres.count`). Only exact count can be fused.
+        stmt_cache: reuse the page statement built for the same shape
+            (model, filter fields, order, paginator) with the bind params
+            of the current values. Used only without `select_stmt`, with
+            an offset paginator and bindable filter fields (see
+            `AlchemyBaseFilter.shape`).
+    """
+    base_stmt = select_stmt or crud._select_model
+    add_bound_date_header = add_bound_date_header and crud.bond_date_enabled
+    fused_count = add_total_count_header and count_strategy.fusable
+    fused = fused and (fused_count or add_bound_date_header)
+
+    shape = None
+    if stmt_cache is not None and select_stmt is None and paginator.bindable:
+        shape = filter_class.shape(crud._model, filter_schema)
+    if shape is None:
+        params = {}
+        stmt = filter_class.filter(crud._model, base_stmt, filter_schema)
+        count_stmt = stmt
+    else:
+        fields, params = shape
+        key = (crud._model, type(filter_schema), type(filter_class))
+        key += (fields,)
+        stmt = stmt_cache.get_or_build(
+            key,
+            lambda: filter_class.filter_shape(
+                crud._model, base_stmt, type(filter_schema), fields
+            ),
+        )
+        count_stmt = stmt.params(params)
+        params.update(paginator.bound_params())
+
+    def page_stmt(fuse: bool) -> Select:
+        ret = stmt
+        if fuse:
+            ret = fuse_meta_columns(
+                ret, crud, paginator, fused_count, add_bound_date_header
+            )
+        if shape is None:
+            return paginator.order_paginate(ret, ordering)
+        return paginator.order_paginate_bound(ret, ordering)
+
+    def cached_page_stmt(fuse: bool) -> Select:
+        if shape is None:
+            return page_stmt(fuse)
+        page_key = (
+            *key,
+            (fuse, fused_count, add_bound_date_header),
+            tuple(ordering.cur_order),
+            type(paginator),
+            paginator.cur_params is None,
+        )
+        return stmt_cache.get_or_build(page_key, lambda: page_stmt(fuse))
+
+    if fused:
+        rows = (await session.execute(cached_page_stmt(True), params)).all()
+        ret_objs = [ri[0] for ri in rows]
+        if rows or paginator.is_first_page():
+            if fused_count:
+                response.headers[TOTAL_COUNT_HEADER] = str(
+                    rows[0]._mapping[TOTAL_COUNT_SQL_LABEL] if rows else 0
+                )
+            elif add_total_count_header:
+                count = await count_strategy.count(
+                    session, count_stmt, crud, filter_schema
+                )
+                response.headers.update(count.headers)
+            if add_bound_date_header and rows:
+                response.headers.update(
+                    BaseHeaderDate.model_validate(rows[0]).headers
+                )
+            return paginator.process_result(
+                ret_objs, response
+            )  # noqa # type: ignore
 
-    stmt = filter_class.filter(crud._model, stmt, filter_schema)
     if add_total_count_header:
-        response.headers[TOTAL_COUNT_HEADER] = str(
-            await get_count(session, stmt)
+        count: CountResult = await count_strategy.count(
+            session, count_stmt, crud, filter_schema
         )
-    if add_bound_date_header and crud.bond_date_enabled:
+        response.headers.update(count.headers)
+    if add_bound_date_header:
         boarders = await get_bound_dates(
             session, crud, filter_schema, filter_class
         )
         response.headers.update(boarders.headers)
 
-    stmt = ordering.order(stmt)
-    stmt = paginator.paginate(stmt)
-    ret_objs = (await session.execute(stmt)).scalars().all()
+    if fused:
+        # empty page was already fetched
+        return paginator.process_result(
+            ret_objs, response
+        )  # noqa # type: ignore
+
+    res = await session.execute(cached_page_stmt(False), params)
+    ret_objs = res.scalars().all()
+
+    return paginator.process_result(ret_objs, response)  # noqa # type: ignore
+
 
-    return ret_objs  # noqa # type: ignore
+def get_export_format_query(
+    format: ExportFormat = Query("ndjson"),
+) -> ExportFormat:
+    return format
+
+
+def _csv_value(v: Any) -> Any:
+    if isinstance(v, (dict, list)):
+        return json.dumps(v, separators=(",", ":"))
+    return v
+
+
+async def _export_lines(
+    session_maker: async_sessionmaker[AsyncSession],
+    crud: CrudBase[ModelT, ModelCreateT],
+    stmt: Select,
+    schema: type[BaseModel],
+    export_format: ExportFormat,
+    yield_per: int | None,
+    flush_rows: int,
+) -> AsyncIterator[str]:
+    buf = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        # `exclude=True` fields are never dumped
+        fields = [k for k, f in schema.model_fields.items() if not f.exclude]
+        writer = csv.writer(buf)
+        writer.writerow(fields)
+    n = 0
+    async with session_maker() as session:
+        async for obj in crud.stream_multi(
+            session, [], yield_per=yield_per, select_stmt=stmt
+        ):
+            item = schema.model_validate(obj)
+            if writer is None:
+                buf.write(item.model_dump_json())
+                buf.write("\n")
+            else:
+                row = item.model_dump(mode="json")
+                writer.writerow([_csv_value(row[fi]) for fi in fields])
+            n += 1
+            if n % flush_rows == 0:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def model_export(
+    crud: CrudBase[ModelT, ModelCreateT],
+    ordering: AlchOrderConsturctor,
+    filter_schema: BaseFilterSchema,
+    schema: type[BaseModel],
+    /,
+    export_format: ExportFormat = "ndjson",
+    *,
+    select_stmt: Select | None = None,
+    filter_class: AlchemyBaseFilter = get_AlchemyFilter(),
+    session_maker: async_sessionmaker[AsyncSession] = SessionMaker,
+    yield_per: int | None = None,
+    flush_rows: int = 500,
+    filename: str | None = None,
+) -> StreamingResponse:
+    """Streams all the filtered and ordered rows as NDJSON or CSV (header +
+    `schema` fields; nested values are dumped as JSON) without pagination.
+
+    Rows are read from a server-side cursor (`CrudBase.stream_multi`) of a
+    separate session, which lives as long as the response body is sent, so
+    the memory is constant and the reading waits for the client (the next
+    batch is fetched only when the previous chunk is sent).
+
+    Args:
+        flush_rows: rows per one chunk of the response body
+        filename: adds `Content-Disposition: attachment`
+    """
+    stmt = select_stmt if select_stmt is not None else crud._select_model
+    stmt = filter_class.filter(crud._model, stmt, filter_schema)
+    stmt = ordering.order(stmt)
+    headers = {}
+    if filename:
+        headers["Content-Disposition"] = (
+            f'attachment; filename="{filename}.{export_format}"'
+        )
+    return StreamingResponse(
+        _export_lines(
+            session_maker,
+            crud,
+            stmt,
+            schema,
+            export_format,
+            yield_per,
+            flush_rows,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers,
+    )
@@ -0,0 +1,21 @@
+from typing import Any, Callable
+
+from proj_name.core.manager import BaseDataManager
+
+MetricsFunc = Callable[[], dict[str, Any]]
+
+
+class MetricsManager(BaseDataManager[MetricsFunc]):
+    """Registry of in-process metrics collectors
+
+    Example:
+    ```
+    MetricsManager.register("auth_token_cache")(cache.stats)
+    ```
+    """
+
+    _map: dict[str, MetricsFunc] = dict()
+
+    @classmethod
+    def collect(cls) -> dict[str, dict[str, Any]]:
+        return {code: func() for code, func in cls._map.items()}
@@ -0,0 +1,11 @@
+from itertools import islice
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+def chunked(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    """chunked([1, 2, 3], 2) -> [1, 2], [3]"""
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
@@ -1,11 +1,57 @@
+import datetime
 from functools import cache
+from typing import Any, NamedTuple, Sequence
+import uuid
 
-from sqlalchemy import Select, select
+from sqlalchemy import (
+    CTE,
+    DateTime,
+    Row,
+    Select,
+    Uuid,
+    Values,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    or_,
+    select,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 from proj_name.config import get_settings
 from proj_name.core.db.postgres.crud import CrudBase
-from proj_name.models.auth.token import Token
-from proj_name.schemas.auth.token import TokenDbCreate
+from proj_name.core.exceptions import DbException
+from proj_name.enums import BearerTokenTypeEnum
+from proj_name.models.auth.token import RevokedToken, Token
+from proj_name.models.auth.user import User
+from proj_name.schemas.auth.token import RevokedTokenDbCreate, TokenDbCreate
+
+
+class IssuedPair(NamedTuple):
+    """Result of the single statement token issuance"""
+
+    access: Row
+    refresh: Row
+    # user columns (with `password_hash`), `id` - user id
+    user: dict[str, Any]
+    # base id of the rotated pair (refresh)
+    old_base_id: uuid.UUID | None = None
+
+
+USER_COLUMNS = (
+    "id",
+    "username",
+    "password_hash",
+    "password_updated_at",
+    "updated_at",
+    "is_admin",
+    "is_active",
+)
 
 
 class TokenCrud(CrudBase[Token, TokenDbCreate]):
@@ -15,7 +61,214 @@ class TokenCrud(CrudBase[Token, TokenDbCreate]):
         """can be used for config options with inload"""
         return select(self._model).options(joinedload(self._model.user))
 
+    def _pair_values(self) -> Values:
+        """New ids of the access and refresh tokens"""
+        token_type = self._model.__table__.c.token_type.type
+        return values(
+            column("id", Uuid()), column("token_type", token_type), name="pair"
+        ).data(
+            [
+                (uuid.uuid4(), BearerTokenTypeEnum.ACCESS),
+                (uuid.uuid4(), BearerTokenTypeEnum.REFRESH),
+            ]
+        )
+
+    def stmt_issue_pair(
+        self, users: CTE, base_id: uuid.UUID, *ctes: CTE
+    ) -> Select:
+        """`INSERT` of a new pair for the user of the `users` CTE returning
+        the tokens with the user columns (prefixed with `u_`)
+        """
+        m = self._model
+        pair = self._pair_values()
+        new = (
+            insert(m)
+            .from_select(
+                ["id", "base_id", "user_id", "token_type"],
+                select(
+                    cast(pair.c.id, Uuid()),
+                    literal(base_id, Uuid()),
+                    users.c.id,
+                    cast(pair.c.token_type, m.__table__.c.token_type.type),
+                ).select_from(users, pair),
+            )
+            .returning(m.id, m.base_id, m.user_id, m.token_type)
+            .cte("new_pair")
+        )
+        stmt = select(
+            new, *(users.c[ci].label(f"u_{ci}") for ci in USER_COLUMNS)
+        ).join_from(new, users, new.c.user_id == users.c.id)
+        for ci in ctes:
+            stmt = stmt.add_cte(ci)
+        return stmt
+
+    @staticmethod
+    def _issued_pair(
+        rows: Sequence[Row], old_base_id: uuid.UUID | None = None
+    ) -> IssuedPair | None:
+        if not rows:
+            return None
+        by_type = {ri.token_type: ri for ri in rows}
+        user = {ci: getattr(rows[0], f"u_{ci}") for ci in USER_COLUMNS}
+        return IssuedPair(
+            by_type[BearerTokenTypeEnum.ACCESS],
+            by_type[BearerTokenTypeEnum.REFRESH],
+            user,
+            old_base_id,
+        )
+
+    async def issue_pair(
+        self, session: AsyncSession, /, user_id: uuid.UUID
+    ) -> IssuedPair | None:
+        """Insert of a new pair for the already verified user (login) in one
+        statement with the user columns of the same snapshot.
+
+        Returns:
+            IssuedPair | None - `None` if the user has been deleted
+        """
+        users = (
+            select(*(User.__table__.c[ci] for ci in USER_COLUMNS))
+            .where(User.id == user_id)
+            .cte("login_user")
+        )
+        stmt = self.stmt_issue_pair(users, uuid.uuid4())
+        try:
+            rows = (await session.execute(stmt)).all()
+        except SQLAlchemyError as e:
+            raise DbException() from e
+        return self._issued_pair(rows)
+
+    async def rotate_pair(
+        self,
+        session: AsyncSession,
+        /,
+        token_id: uuid.UUID,
+        username: str,
+        revoke_expires_at: datetime.datetime | None = None,
+    ) -> IssuedPair | None:
+        """Refresh in one statement: delete of the pair of the refresh token
+        + user lookup + insert of a new pair (+ revocation of the old pair
+        if `revoke_expires_at` is passed).
+
+        Returns:
+            IssuedPair | None - `None` if there is no such refresh token (or
+                its user)
+        """
+        m = self._model
+        old = (
+            delete(m)
+            .where(
+                m.base_id.in_(
+                    select(m.base_id).where(
+                        m.id == token_id,
+                        m.token_type == BearerTokenTypeEnum.REFRESH,
+                    )
+                )
+            )
+            .returning(m.base_id, m.user_id)
+            .cte("old_pair")
+        )
+        users = (
+            select(*(User.__table__.c[ci] for ci in USER_COLUMNS))
+            .where(
+                User.id.in_(select(old.c.user_id)), User.username == username
+            )
+            .cte("refresh_user")
+        )
+        ctes = []
+        if revoke_expires_at is not None:
+            ctes.append(
+                insert(RevokedToken)
+                .from_select(
+                    ["base_id", "expires_at"],
+                    select(
+                        old.c.base_id,
+                        literal(revoke_expires_at, DateTime(True)),
+                    ).distinct(),
+                )
+                .cte("revoked_pair")
+            )
+        old_base = select(old.c.base_id).limit(1).scalar_subquery()
+        stmt = self.stmt_issue_pair(users, uuid.uuid4(), *ctes).add_columns(
+            old_base.label("old_base_id")
+        )
+        try:
+            rows = (await session.execute(stmt)).all()
+        except SQLAlchemyError as e:
+            raise DbException() from e
+        return self._issued_pair(rows, rows[0].old_base_id if rows else None)
+
 
 @cache
 def get_token_crud() -> TokenCrud:
     return TokenCrud(get_settings())
+
+
+class RevokedTokenCrud(CrudBase[RevokedToken, RevokedTokenDbCreate]):
+    async def revoke_users(
+        self,
+        session: AsyncSession,
+        /,
+        expires_at: datetime.datetime,
+        user_ids: set[uuid.UUID] | None = None,
+        usernames: set[str] | None = None,
+    ) -> list[uuid.UUID]:
+        """Revokes all the token pairs of the users (in one statement)
+
+        Returns:
+            list[uuid.UUID] - revoked base ids
+        """
+        wheres = []
+        if user_ids:
+            wheres.append(Token.user_id.in_(user_ids))
+        if usernames:
+            wheres.append(
+                Token.user_id.in_(
+                    select(User.id).where(User.username.in_(usernames))
+                )
+            )
+        if not wheres:
+            return []
+        bases = (
+            select(Token.base_id, literal(expires_at, DateTime(True)))
+            .where(or_(*wheres))
+            .distinct()
+        )
+        stmt = (
+            insert(self._model)
+            .from_select(["base_id", "expires_at"], bases)
+            .returning(self._model.base_id)
+        )
+        try:
+            return list((await session.scalars(stmt)).all())
+        except SQLAlchemyError as e:
+            raise DbException() from e
+
+    async def get_since(
+        self, session: AsyncSession, /, since: datetime.datetime | None
+    ) -> list[tuple[uuid.UUID, datetime.datetime, datetime.datetime]]:
+        """Not expired revocations logged after `since` (all if `None`)
+
+        Returns:
+            list[tuple[base_id, expires_at, log_time]]
+        """
+        m = self._model
+        stmt = select(m.base_id, m.expires_at, m.log_time).where(
+            m.expires_at > func.now()
+        )
+        if since is not None:
+            stmt = stmt.where(m.log_time > since)
+        try:
+            return [tuple(ri) for ri in await session.execute(stmt)]
+        except SQLAlchemyError as e:
+            raise DbException() from e
+
+    async def purge(self, session: AsyncSession, /) -> int:
+        return await self.delete(
+            session, [self._model.expires_at <= func.now()], force=True
+        )
+
+
+@cache
+def get_revoked_token_crud() -> RevokedTokenCrud:
+    return RevokedTokenCrud(get_settings())
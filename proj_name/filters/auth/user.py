@@ -8,9 +8,15 @@ class UserFilter(BaseFilterSchema):
     username__neq: str | None = None
     username__ilike: str | None = None
     username__not_ilike: str | None = None
+    username__icontains: str | None = None
+    username__startswith: str | None = None
+    username__istartswith: str | None = None
     username__in: set[str] | None = None
     username__not_in: set[str] | None = None
 
+    search_vector__search: str | None = None
+    search_vector__search_rank: str | None = None
+
     is_admin: bool | None = None
     is_ative: bool | None = None
     is_ative__in: set[bool] | None = None  # Remove
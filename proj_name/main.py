@@ -11,6 +11,7 @@ from proj_name.core.swagger.swagger import (
     init_swagger_routes,
 )
 from proj_name.routes import router as main_router
+from proj_name.services.auth.current import auth_service
 
 
 @asynccontextmanager
@@ -18,10 +19,15 @@ async def lifespan(_: FastAPI):
     import time
 
     time.tzset()
+    revocations = auth_service().revocations
+    if revocations is not None:
+        revocations.start()
     logger.info(
         "[Server] Inited at `http://localhost:{}`", get_settings().app.port
     )
     yield
+    if revocations is not None:
+        await revocations.stop()
     logger.info("[Server] Stopped")
 
 
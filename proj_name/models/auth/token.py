@@ -1,11 +1,12 @@
 from functools import cache
 from typing import TYPE_CHECKING
+import datetime
 import uuid
-from sqlalchemy import Enum, ForeignKey, Uuid
+from sqlalchemy import DateTime, Enum, ForeignKey, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from proj_name.enums import BearerTokenTypeEnum
 from proj_name.models.auth.base import AuthBaseDbModel
-from proj_name.models.base import DbLogMixin
+from proj_name.models.base import DbLogMixin, IdBaseDbModel
 
 if TYPE_CHECKING:
     from proj_name.models.auth.user import User
@@ -34,3 +35,18 @@ class Token(DbLogMixin, AuthBaseDbModel):
 
     def __repr__(self):
         return f"Token({self.id}, {self.log_time=})"
+
+
+class RevokedToken(IdBaseDbModel, DbLogMixin, AuthBaseDbModel):
+    """Revoked token pairs for the stateless auth (`Token` rows are deleted,
+    so the other workers can't see the revocation in `auth_token`). Rows
+    are needed until the access tokens of the pair expire (`expires_at`).
+    """
+
+    base_id: Mapped[uuid.UUID] = mapped_column(Uuid(), index=True)
+    expires_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(True), index=True
+    )
+
+    def __repr__(self):
+        return f"RevokedToken({self.base_id}, {self.expires_at=})"
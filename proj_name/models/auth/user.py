@@ -2,10 +2,12 @@ import datetime
 from sqlalchemy import Boolean, DateTime, String, Text, false, func, true
 from sqlalchemy.orm import Mapped, mapped_column
 from proj_name.models.auth.base import AuthBaseDbModel
-from proj_name.models.base import DbLogMixin, UuidBaseDbModel
+from proj_name.models.base import DbLogMixin, TsVectorMixin, UuidBaseDbModel
 
 
-class User(UuidBaseDbModel, DbLogMixin, AuthBaseDbModel):
+class User(UuidBaseDbModel, DbLogMixin, TsVectorMixin, AuthBaseDbModel):
+    __tsvector_columns__ = {"username": "A"}
+
     username: Mapped[str] = mapped_column(String(64), index=True, unique=True)
     password_hash: Mapped[str] = mapped_column(Text())
 
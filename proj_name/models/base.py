@@ -1,9 +1,11 @@
 import datetime
 import re
+from typing import Any, ClassVar
 from uuid import UUID
 import uuid
 
-from sqlalchemy import BigInteger, DateTime, Uuid, func
+from sqlalchemy import BigInteger, Computed, DateTime, Index, Uuid, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -11,6 +13,14 @@ from sqlalchemy.orm import (
     mapped_column,
 )
 
+from proj_name.core.db.postgres.search import (
+    DEFAULT_TS_CONFIG,
+    SEARCH_VECTOR_COLUMN,
+    TS_CONFIG_INFO,
+    tsvector_expression,
+    tsvector_index_name,
+)
+
 REGULAR_COMP = re.compile(r"((?<=[a-z\d])[A-Z]|(?!^)[A-Z](?=[a-z]))")
 
 
@@ -62,3 +72,52 @@ class CreatedAtMixin:
     created_at: Mapped[datetime.datetime] = mapped_column(
         DateTime(True), nullable=False
     )
+
+
+class TsVectorMixin:
+    """Generated `search_vector` column (+ GIN index) of the text columns
+    for the `search_vector__search` filters.
+
+    Example:
+    ```
+    class Post(IdBaseDbModel, DbLogMixin, TsVectorMixin):
+        __tsvector_columns__ = {"title": "A", "body": "B"}
+    ```
+
+    NOTE: The column and the index are created by
+    `core.db.postgres.migrations.add_search_vector`. The mixin declares
+    `__table_args__`, so a model with its own ones should add
+    `cls.search_vector_index()` to them.
+    """
+
+    __abstract__ = True
+    # text column -> weight (`A` - the most relevant, `D` - the least)
+    __tsvector_columns__: ClassVar[dict[str, str]] = {}
+    __tsvector_config__: ClassVar[str] = DEFAULT_TS_CONFIG
+
+    @declared_attr
+    def search_vector(cls) -> Mapped[Any]:
+        return mapped_column(
+            TSVECTOR(),
+            Computed(
+                tsvector_expression(
+                    cls.__tsvector_columns__, cls.__tsvector_config__
+                ),
+                persisted=True,
+            ),
+            nullable=False,
+            deferred=True,
+            info={TS_CONFIG_INFO: cls.__tsvector_config__},
+        )
+
+    @classmethod
+    def search_vector_index(cls) -> Index:
+        return Index(
+            tsvector_index_name(cls.__tablename__),
+            SEARCH_VECTOR_COLUMN,
+            postgresql_using="gin",
+        )
+
+    @declared_attr.directive
+    def __table_args__(cls) -> tuple:
+        return (cls.search_vector_index(),)
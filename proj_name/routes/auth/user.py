@@ -1,11 +1,13 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from proj_name.config import get_settings
-from proj_name.core.crypto.passwords.base import PwdContext
-from proj_name.core.db.postgres.base import db_session
+from proj_name.core.crypto.jwt.keys import JwtKeySet
+from proj_name.core.db.postgres.base import db_read_session, db_session
+from proj_name.core.db.postgres.statements import statement_cache
 from proj_name.core.fastapi.filter.depends import FilterDepends
 from proj_name.core.fastapi.ordering.current import OrderingDepends
 from proj_name.core.fastapi.ordering.sqlalchemy import AlchOrderConsturctor
@@ -13,13 +15,19 @@ from proj_name.core.fastapi.pagination.sqlalchemy import (
     AlchemyBasePaginator,
     paginator1000,
 )
-from proj_name.core.fastapi.routes.utils import get_uuid_ids_query, model_get
+from proj_name.core.fastapi.routes.db import DbReleaseRoute
+from proj_name.core.fastapi.routes.utils import (
+    ExportFormat,
+    get_export_format_query,
+    get_uuid_ids_query,
+    model_export,
+    model_get,
+)
 from proj_name.cruds.auth.user import UserCrud, get_user_crud
 from proj_name.filters.auth.user import UserFilter
 from proj_name.schemas.auth.token import RefreshToken, TokenPair
 from proj_name.schemas.auth.types import UserNameStr
 from proj_name.schemas.auth.user import (
-    UserCreate,
     UserFullRead,
     UserLogin,
     UserMeUpdate,
@@ -31,11 +39,13 @@ from proj_name.schemas.auth.user import (
 from proj_name.services.auth.base import AlchemyTokenAuthService
 from proj_name.services.auth.current import (
     auth_service,
+    bulk_create_users,
     get_active_superuser_dep,
     get_active_user_dep,
+    jwt_keys,
 )
 
-router = APIRouter(prefix="", tags=["User & Auth"])
+router = APIRouter(prefix="", tags=["User & Auth"], route_class=DbReleaseRoute)
 
 
 def user_router() -> APIRouter:
@@ -46,7 +56,7 @@ def user_router() -> APIRouter:
 async def get_users(
     response: Response,
     user: UserSession = Depends(get_active_superuser_dep),
-    session: AsyncSession = Depends(db_session),
+    session: AsyncSession = Depends(db_read_session),
     crud: UserCrud = Depends(get_user_crud),
     paginator: AlchemyBasePaginator = Depends(paginator1000().from_query()),
     ordering: AlchOrderConsturctor = OrderingDepends(
@@ -55,10 +65,37 @@ async def get_users(
     filter_schema: UserFilter = FilterDepends(UserFilter),
 ) -> list[UserFullRead]:
     return await model_get(
-        response, session, crud, paginator, ordering, filter_schema
+        response,
+        session,
+        crud,
+        paginator,
+        ordering,
+        filter_schema,
+        fused=True,
+        stmt_cache=statement_cache(),
     )  # type: ignore
 
 
+@router.get("/users/export", response_class=StreamingResponse)
+async def export_users(
+    user: UserSession = Depends(get_active_superuser_dep),
+    crud: UserCrud = Depends(get_user_crud),
+    ordering: AlchOrderConsturctor = OrderingDepends(
+        get_user_crud().get_ordering_meta()
+    ),
+    filter_schema: UserFilter = FilterDepends(UserFilter),
+    export_format: ExportFormat = Depends(get_export_format_query),
+) -> StreamingResponse:
+    return model_export(
+        crud,
+        ordering,
+        filter_schema,
+        UserFullRead,
+        export_format,
+        filename="users",
+    )
+
+
 @router.post("/users")
 async def post_users(
     data: list[UserRawCreate],
@@ -66,16 +103,7 @@ async def post_users(
     session: AsyncSession = Depends(db_session),
     crud: UserCrud = Depends(get_user_crud),
 ) -> int:
-    ret = await crud.bulk_create(
-        session,
-        [
-            UserCreate(
-                password_hash=PwdContext.hash(ui.password),
-                **ui.model_dump(exclude={"password"}),
-            )
-            for ui in data
-        ],
-    )
+    ret = await bulk_create_users(session, data)
     await session.commit()
     return ret
 
@@ -87,10 +115,15 @@ async def patch_user(
     user: UserSession = Depends(get_active_superuser_dep),
     session: AsyncSession = Depends(db_session),
     crud: UserCrud = Depends(get_user_crud),
+    auth_manager: AlchemyTokenAuthService = Depends(auth_service),
 ) -> int:
-    return await crud.patch(
-        session, [crud.model.username == username], data.to_patch(), force=True
+    ret = await crud.patch(
+        session, [crud.model.username == username], await data.to_patch()
     )
+    base_ids = await auth_manager.revoke_user(session, usernames={username})
+    await session.commit()
+    auth_manager.invalidate_user(usernames={username}, base_ids=base_ids)
+    return ret
 
 
 @router.delete("/users")
@@ -99,8 +132,12 @@ async def delete_users(
     ids: set[int] = Depends(get_uuid_ids_query),
     session: AsyncSession = Depends(db_session),
     crud: UserCrud = Depends(get_user_crud),
+    auth_manager: AlchemyTokenAuthService = Depends(auth_service),
 ) -> int:
-    return await crud.delete(session, [crud.model.id.in_(ids)], force=True)
+    base_ids = await auth_manager.revoke_user(session, user_ids=ids)
+    ret = await crud.delete(session, [crud.model.id.in_(ids)], force=True)
+    auth_manager.invalidate_user(user_ids=ids, base_ids=base_ids)
+    return ret
 
 
 @router.get("/user/me")
@@ -120,13 +157,18 @@ async def patch_user_me(
     user_ses: UserSession = Depends(get_active_user_dep),
     session: AsyncSession = Depends(db_session),
     crud: UserCrud = Depends(get_user_crud),
+    auth_manager: AlchemyTokenAuthService = Depends(auth_service),
 ) -> int:
-    return await crud.patch(
+    ret = await crud.patch(
         session,
         [crud.model.username == user_ses.user.username],
-        data.to_patch(),
-        force=True,
-    )  # noqa # type: ignore
+        await data.to_patch(),
+    )
+    usernames = {user_ses.user.username}
+    base_ids = await auth_manager.revoke_user(session, usernames=usernames)
+    await session.commit()
+    auth_manager.invalidate_user(usernames=usernames, base_ids=base_ids)
+    return ret  # noqa # type: ignore
 
 
 @router.post("/user/register", deprecated=True)
@@ -138,7 +180,7 @@ async def post_user_register(
 ) -> UserFullRead:
     # NOTE: Remove this route if it isn't needed
     return await crud.create(
-        session, data.to_db_schema(), force=True
+        session, await data.to_db_schema(), force=True
     )  # noqa # type: ignore
 
 
@@ -174,6 +216,17 @@ async def post_auth_refresh(
     return ret
 
 
+@router.get("/auth/jwks")
+async def get_auth_jwks(
+    response: Response, keys: JwtKeySet = Depends(jwt_keys)
+) -> dict[str, list[dict]]:
+    """Public keys (JWKS) for the verification of the tokens by the other
+    services (empty for the symmetric algorithms)
+    """
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return keys.jwks()
+
+
 if get_settings().app.show_swagger:
 
     @router.post("/auth/login-form", include_in_schema=False)
@@ -0,0 +1,21 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from proj_name.core.fastapi.routes.db import DbReleaseRoute
+from proj_name.core.metrics import MetricsManager
+from proj_name.schemas.auth.user import UserSession
+from proj_name.services.auth.current import get_active_superuser_dep
+
+router = APIRouter(tags=["Metrics"], route_class=DbReleaseRoute)
+
+
+def metrics_router() -> APIRouter:
+    return router
+
+
+@router.get("/metrics")
+async def get_metrics(
+    user: UserSession = Depends(get_active_superuser_dep),
+) -> dict[str, dict[str, Any]]:
+    return MetricsManager.collect()
@@ -20,6 +20,11 @@ class TokenDbRead(OrmModel):
     token_type: BearerTokenTypeEnum
 
 
+class RevokedTokenDbCreate(OrmModel):
+    base_id: uuid.UUID
+    expires_at: datetime.datetime
+
+
 # https://en.wikipedia.org/wiki/JSON_Web_Token
 class BaseJwtToken(OrmModel):
     iss: str  # proj_name
@@ -36,6 +41,9 @@ class UserTokenExtra(OrmModel):
 
 class JwtTokenSchema(BaseJwtToken, UserTokenExtra):
     ttype: BearerTokenTypeEnum
+    # stateless auth claims (tokens issued before them have `None`)
+    bid: uuid.UUID | None = None  # base_id of the token pair
+    uid: uuid.UUID | None = None  # user_id
 
     def token_id(self) -> uuid.UUID:
         return self.jti
@@ -4,7 +4,7 @@ from pydantic import Field, model_validator
 from proj_name.schemas.auth.token import JwtTokenSchema
 from proj_name.schemas.auth.types import PasswordStr, UserNameStr
 from proj_name.schemas.base import OrmModel
-from proj_name.core.crypto.passwords.base import PwdContext
+from proj_name.core.crypto.passwords.base import get_pwd_context
 
 
 class UserRegister(OrmModel):
@@ -18,9 +18,9 @@ class UserRegister(OrmModel):
             raise ValueError("password1 != password2")
         return self
 
-    def to_db_schema(self) -> "UserCreate":
+    async def to_db_schema(self) -> "UserCreate":
         return UserCreate(
-            password_hash=PwdContext.hash(self.password1),
+            password_hash=await get_pwd_context().hash(self.password1),
             **self.model_dump(exclude={"password1", "password2"}),
         )
 
@@ -80,7 +80,7 @@ class UserUpdate(OrmModel):
             raise ValueError("password1 != password2")
         return self
 
-    def to_patch(self) -> dict:
+    async def to_patch(self) -> dict:
         ret = self.model_dump(
             mode="python", exclude_unset=True, exclude_none=True
         )
@@ -89,7 +89,7 @@ class UserUpdate(OrmModel):
             and self.password2
             and self.password1 == self.password2
         ):
-            ret["password_hash"] = PwdContext.hash(self.password1)
+            ret["password_hash"] = await get_pwd_context().hash(self.password1)
         return ret
 
 
@@ -97,8 +97,8 @@ class UserMeUpdate(OrmModel):
     password1: PasswordStr
     password2: PasswordStr
 
-    def to_patch(self) -> dict:
-        return UserUpdate.model_validate(self).to_patch()
+    async def to_patch(self) -> dict:
+        return await UserUpdate.model_validate(self).to_patch()
 
 
 class UserSession(OrmModel):
@@ -1,20 +1,23 @@
-from typing import Generic, Protocol, TypeVar
+import datetime
+from typing import Generic, Iterable, Protocol, TypeVar
 import uuid
 
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from proj_name.core.crypto.passwords.base import PwdContext
+from proj_name.core.crypto.passwords.base import get_pwd_context
 from proj_name.core.exceptions import (
     BadLoginCredsError,
     BadTokenError,
     TokenValidationError,
 )
-from proj_name.cruds.auth.token import get_token_crud
+from proj_name.cruds.auth.token import get_revoked_token_crud, get_token_crud
 from proj_name.cruds.auth.user import get_user_crud
 from proj_name.enums import BearerTokenTypeEnum
 from proj_name.schemas.auth.token import TokenPair
 from proj_name.schemas.auth.user import UserFullRead, UserLogin, UserSession
+from proj_name.services.auth.cache import TokenAuthCache
+from proj_name.services.auth.revocation import RevocationList
 
 
 class AuthLogicTokenProtocol(Protocol):
@@ -34,9 +37,23 @@ class AuthLogic:
     def validate(self, *args, **kwargs):
         raise NotImplementedError()
 
+    def stateless_session(self, *args, **kwargs) -> UserSession | None:
+        """User session of the token claims only (`None` - not enough
+        claims)
+        """
+        return None
+
+    def revocation_ttl(self) -> float:
+        """Seconds while a revoked access token could be still valid"""
+        raise NotImplementedError()
+
     async def create_tokens(self, *args, **kwargs):
         raise NotImplementedError()
 
+    def pair_tokens(self, *args, **kwargs):
+        """Tokens of the already inserted rows"""
+        raise NotImplementedError()
+
 
 AuthLogicT = TypeVar("AuthLogicT", bound=AuthLogic)
 
@@ -63,21 +80,122 @@ class AuthService(Generic[AuthLogicT]):
 
 
 class AlchemyTokenAuthService(AuthService[AuthLogicT]):
+    def __init__(
+        self,
+        auth_logic: AuthLogicT,
+        token_cache: TokenAuthCache | None = None,
+        revocations: RevocationList | None = None,
+        single_statement: bool = True,
+    ):
+        """
+        Args:
+            revocations: enables the stateless auth - access tokens with a
+                valid signature are trusted unless their pair is revoked
+                (no db lookup while the list is fresh)
+            single_statement: login by the user lookup and one CTE insert
+                statement (`TokenCrud.issue_pair`), refresh by one CTE
+                statement (`TokenCrud.rotate_pair`) instead of the separate
+                lookups, delete and insert
+        """
+        super().__init__(auth_logic)
+        self.token_cache = token_cache
+        self.revocations = revocations
+        self.single_statement = single_statement
 
-    async def auth(
-        self, session: AsyncSession, token: str | bytes, *args, **kwargs
-    ) -> UserSession:
-        logger.debug("[{}] Got token {}", self.__class__.__name__, token)
-        token_data = self.auth_logic.parse_token(token)
+    def invalidate_base(self, base_id: uuid.UUID):
+        if self.token_cache is not None:
+            self.token_cache.invalidate_base(base_id)
 
-        if token_data.token_type() is not BearerTokenTypeEnum.ACCESS:
+    def invalidate_user(
+        self,
+        user_ids: set[uuid.UUID] | None = None,
+        usernames: set[str] | None = None,
+        base_ids: Iterable[uuid.UUID] = (),
+    ):
+        """Must be called after any user changes (password, flags, delete)
+        are committed, otherwise a concurrent auth could cache the old row
+        again.
+
+        Args:
+            base_ids: revoked pairs of the users (`revoke_user`), they are
+                added to the local revocation list
+        """
+        if self.token_cache is not None:
+            self.token_cache.invalidate_user(user_ids, usernames)
+        base_ids = list(base_ids)
+        if self.revocations is not None and base_ids:
+            self.revocations.add(
+                base_ids, self._revocation_expires_at().timestamp()
+            )
+
+    def _revocation_expires_at(self) -> datetime.datetime:
+        return datetime.datetime.now(datetime.timezone.utc) + (
+            datetime.timedelta(seconds=self.auth_logic.revocation_ttl())
+        )
+
+    async def revoke_bases(
+        self, session: AsyncSession, base_ids: Iterable[uuid.UUID]
+    ):
+        """Records the revocation of the token pairs for the stateless auth
+        (it's committed with the session)
+        """
+        base_ids = list(base_ids)
+        for bi in base_ids:
+            self.invalidate_base(bi)
+        if self.revocations is None or not base_ids:
+            return
+        expires_at = self._revocation_expires_at()
+        await get_revoked_token_crud().bulk_create(
+            session,
+            [{"base_id": bi, "expires_at": expires_at} for bi in base_ids],
+        )
+        self.revocations.add(base_ids, expires_at.timestamp())
+
+    async def revoke_user(
+        self,
+        session: AsyncSession,
+        user_ids: set[uuid.UUID] | None = None,
+        usernames: set[str] | None = None,
+    ) -> list[uuid.UUID]:
+        """Records the revocation of all the users tokens for the stateless
+        auth (it's committed with the session). Must be called with any user
+        changes (before the delete of the user) and followed by
+        `invalidate_user` with the returned base ids after the commit.
+
+        Returns:
+            list[uuid.UUID] - revoked base ids
+        """
+        if self.revocations is None:
+            return []
+        return await get_revoked_token_crud().revoke_users(
+            session, self._revocation_expires_at(), user_ids, usernames
+        )
+
+    def _auth_stateless(
+        self, token_data: AuthLogicTokenProtocol, token: str | bytes
+    ) -> UserSession | None:
+        """
+        Returns:
+            UserSession | None - `None` if the token can't be trusted without
+                the db lookup (old token, stale revocation list)
+        """
+        if self.revocations is None or not self.revocations.fresh:
+            return None
+        ses = self.auth_logic.stateless_session(token_data, token)
+        if ses is None:
+            return None
+        if self.revocations.is_revoked(ses.token.bid):
             logger.debug(
-                "[{}] No access token type ({})",
+                "[{}] Token pair {} is revoked",
                 self.__class__.__name__,
-                token,
+                ses.token.bid,
             )
             raise BadTokenError(token=token)
-        token_id = token_data.token_id()
+        return ses
+
+    async def _get_db_token_user(
+        self, session: AsyncSession, token: str | bytes, token_id: uuid.UUID
+    ) -> tuple[uuid.UUID, UserFullRead]:
         db_token = await get_token_crud().get_one_or_none(session, id=token_id)
         if db_token is None:
             logger.debug(
@@ -94,20 +212,74 @@ class AlchemyTokenAuthService(AuthService[AuthLogicT]):
                 token,
             )
             raise BadTokenError(token=token)
+        return db_token.base_id, UserFullRead.model_validate(db_token.user)
+
+    async def _get_token_user_routed(
+        self,
+        session: AsyncSession,
+        read_session: AsyncSession | None,
+        token: str | bytes,
+        token_id: uuid.UUID,
+    ) -> tuple[uuid.UUID, UserFullRead]:
+        if read_session is None or read_session is session:
+            return await self._get_db_token_user(session, token, token_id)
         try:
-            return self.auth_logic.validate(
-                token_data, UserFullRead.model_validate(db_token.user), token
+            return await self._get_db_token_user(read_session, token, token_id)
+        except BadTokenError:
+            return await self._get_db_token_user(session, token, token_id)
+
+    async def auth(
+        self,
+        session: AsyncSession,
+        token: str | bytes,
+        *args,
+        read_session: AsyncSession | None = None,
+        **kwargs,
+    ) -> UserSession:
+        """
+        Args:
+            read_session: session (of a replica) for the token lookup; a
+                token not found there is looked up in the primary `session`
+                (it could be not replicated yet)
+        """
+        logger.debug("[{}] Got token {}", self.__class__.__name__, token)
+        token_data = self.auth_logic.parse_token(token)
+
+        if token_data.token_type() is not BearerTokenTypeEnum.ACCESS:
+            logger.debug(
+                "[{}] No access token type ({})",
+                self.__class__.__name__,
+                token,
+            )
+            raise BadTokenError(token=token)
+        ses = self._auth_stateless(token_data, token)
+        if ses is not None:
+            return ses
+        token_id = token_data.token_id()
+        cached = None
+        if self.token_cache is not None:
+            cached = self.token_cache.get(token_id)
+        if cached is None:
+            base_id, user = await self._get_token_user_routed(
+                session, read_session, token, token_id
             )
+            if self.token_cache is not None:
+                self.token_cache.add(token_id, base_id, user)
+        else:
+            base_id, user = cached
+        try:
+            return self.auth_logic.validate(token_data, user, token)
         except TokenValidationError as e:
             logger.debug(e)
-            await get_token_crud().delete(
-                session, base_id=db_token.base_id, force=True
-            )
+            await self.revoke_bases(session, [base_id])
+            await get_token_crud().delete(session, base_id=base_id, force=True)
             raise BadTokenError() from e
 
     async def login(
         self, session: AsyncSession, data: UserLogin, *args, **kwargs
     ) -> TokenPair:
+        if self.single_statement:
+            return await self._login_single(session, data, *args, **kwargs)
         user = await get_user_crud().get_one_or_none(
             session, username=data.username
         )
@@ -118,7 +290,9 @@ class AlchemyTokenAuthService(AuthService[AuthLogicT]):
                 data.username,
             )
             raise BadLoginCredsError()
-        if not PwdContext.verify(data.password, user.password_hash):
+        if not await get_pwd_context().verify(
+            data.password, user.password_hash
+        ):
             logger.debug(
                 "[{}] Trying to login to user `{}` with wrong password",
                 self.__class__.__name__,
@@ -130,6 +304,50 @@ class AlchemyTokenAuthService(AuthService[AuthLogicT]):
         )
         return await self.extra_login(session, res, *args, **kwargs)
 
+    async def _login_single(
+        self, session: AsyncSession, data: UserLogin, *args, **kwargs
+    ) -> TokenPair:
+        """Read-only user lookup, the password check, then the insert of the
+        pair (`TokenCrud.issue_pair`).
+
+        It's one round trip more than the insert with the lookup in one
+        statement, but a wrong password (e.g. brute force) doesn't write
+        anything (no inserted and rolled back rows, WAL, dead tuples).
+        """
+        user = await get_user_crud().get_one_or_none(
+            session, username=data.username
+        )
+        if user is None:
+            logger.debug(
+                "[{}] Trying to login via unregistered user `{}`",
+                self.__class__.__name__,
+                data.username,
+            )
+            raise BadLoginCredsError()
+        if not await get_pwd_context().verify(
+            data.password, user.password_hash
+        ):
+            logger.debug(
+                "[{}] Trying to login to user `{}` with wrong password",
+                self.__class__.__name__,
+                data.username,
+            )
+            raise BadLoginCredsError()
+        issued = await get_token_crud().issue_pair(session, user_id=user.id)
+        if issued is None:
+            logger.debug(
+                "[{}] User `{}` was deleted on login",
+                self.__class__.__name__,
+                data.username,
+            )
+            raise BadLoginCredsError()
+        res: TokenPair = self.auth_logic.pair_tokens(
+            issued.access,
+            issued.refresh,
+            UserFullRead.model_validate(issued.user),
+        )
+        return await self.extra_login(session, res, *args, **kwargs)
+
     async def logout(
         self, session: AsyncSession, token: str | bytes, *args, **kwargs
     ):
@@ -152,6 +370,7 @@ class AlchemyTokenAuthService(AuthService[AuthLogicT]):
                 token_id,
             )
             raise BadTokenError(token=token)
+        await self.revoke_bases(session, [db_token.base_id])
         ret = await crud.delete(session, base_id=db_token.base_id, force=True)
         logger.debug("[{}] {} tokens deleted", self.__class__.__name__, ret)
 
@@ -175,6 +394,10 @@ class AlchemyTokenAuthService(AuthService[AuthLogicT]):
             )
             raise BadTokenError(token=token)
         token_id = token_data.token_id()
+        if self.single_statement:
+            return await self._refresh_single(
+                session, token, token_id, token_data.sub, *args, **kwargs
+            )
         crud = get_token_crud()
         db_token = await crud.get_one_or_none(session, id=token_id)
 
@@ -193,6 +416,7 @@ class AlchemyTokenAuthService(AuthService[AuthLogicT]):
             )
             raise BadTokenError(token=token)
 
+        await self.revoke_bases(session, [db_token.base_id])
         await crud.delete(session, base_id=db_token.base_id, force=False)
 
         user = await get_user_crud().get_one_or_none(
@@ -202,3 +426,35 @@ class AlchemyTokenAuthService(AuthService[AuthLogicT]):
             session, UserFullRead.model_validate(user)
         )
         return await self.extra_login(session, res, *args, **kwargs)
+
+    async def _refresh_single(
+        self,
+        session: AsyncSession,
+        token: str,
+        token_id: uuid.UUID,
+        username: str,
+        *args,
+        **kwargs,
+    ) -> TokenPair:
+        expires_at = None
+        if self.revocations is not None:
+            expires_at = self._revocation_expires_at()
+        issued = await get_token_crud().rotate_pair(
+            session, token_id, username, expires_at
+        )
+        if issued is None:
+            logger.debug(
+                "[{}] Token refresh {}, not found in db",
+                self.__class__.__name__,
+                token_id,
+            )
+            raise BadTokenError(token=token)
+        self.invalidate_base(issued.old_base_id)
+        if expires_at is not None:
+            self.revocations.add([issued.old_base_id], expires_at.timestamp())
+        res: TokenPair = self.auth_logic.pair_tokens(
+            issued.access,
+            issued.refresh,
+            UserFullRead.model_validate(issued.user),
+        )
+        return await self.extra_login(session, res, *args, **kwargs)
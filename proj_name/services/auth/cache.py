@@ -0,0 +1,48 @@
+import uuid
+from typing import NamedTuple
+
+from proj_name.core.cache import TTLCache
+from proj_name.schemas.auth.user import UserFullRead
+
+
+class CachedToken(NamedTuple):
+    base_id: uuid.UUID
+    user: UserFullRead
+
+
+class TokenAuthCache:
+    """In-process cache of validated access tokens (`token_id` to the user
+    snapshot).
+
+    NOTE: Invalidation works within one process only, so the ttl is the
+    upper bound of staleness for the other workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache[uuid.UUID, CachedToken] = TTLCache(maxsize, ttl)
+
+    def get(self, token_id: uuid.UUID) -> CachedToken | None:
+        return self._cache.get(token_id)
+
+    def add(self, token_id: uuid.UUID, base_id: uuid.UUID, user: UserFullRead):
+        self._cache.set(token_id, CachedToken(base_id, user))
+
+    def invalidate_base(self, base_id: uuid.UUID) -> int:
+        return self._cache.pop_if(lambda _, v: v.base_id == base_id)
+
+    def invalidate_user(
+        self,
+        user_ids: set[uuid.UUID] | None = None,
+        usernames: set[str] | None = None,
+    ) -> int:
+        user_ids = user_ids or set()
+        usernames = usernames or set()
+        return self._cache.pop_if(
+            lambda _, v: v.user.id in user_ids or v.user.username in usernames
+        )
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        return self._cache.stats()
@@ -1,5 +1,6 @@
+import asyncio
 from functools import cache
-from typing import Annotated
+from typing import Annotated, Any, Callable, Sequence
 
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
@@ -7,51 +8,149 @@ from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from proj_name.config import get_settings
-from proj_name.core.crypto.passwords.base import PwdContext
-from proj_name.core.db.postgres.base import db_session
+from proj_name.core.crypto.passwords.base import (
+    get_bulk_pwd_context,
+    get_pwd_context,
+)
+from proj_name.core.crypto.jwt.keys import JwtKeySet
+from proj_name.core.db.postgres.base import SessionMaker, db_session
 from proj_name.core.exceptions import BadTokenError
+from proj_name.core.metrics import MetricsManager
+from proj_name.core.utils import chunked
 from proj_name.cruds.auth.user import get_user_crud
 from proj_name.models.auth.user import User
 from proj_name.schemas.auth.user import UserCreate, UserRawCreate, UserSession
 from proj_name.services.auth.base import AlchemyTokenAuthService
+from proj_name.services.auth.cache import TokenAuthCache
 from proj_name.services.auth.jwt.base import create_expires_map
+from proj_name.services.auth.revocation import RevocationList
 from proj_name.services.auth.jwt.sqlalch import AlchemyJwtAuthLogic
 
 
+@cache
+def jwt_keys() -> JwtKeySet:
+    settings = get_settings()
+    if settings.auth.jwt_keys_dir is None:
+        return JwtKeySet.from_secret(
+            settings.app.secret,
+            settings.auth.jwt_algorithm,
+            settings.auth.jwt_kid,
+        )
+    return JwtKeySet.from_dir(
+        settings.auth.jwt_keys_dir,
+        settings.auth.jwt_algorithm,
+        settings.auth.jwt_kid,
+    )
+
+
 @cache
 def auth_service() -> AlchemyTokenAuthService:
     settings = get_settings()
-    return AlchemyTokenAuthService(
-        AlchemyJwtAuthLogic(
-            iss=settings.app.app_name,
-            aud=settings.app.app_name,
-            secret=settings.app.secret,
-            expires_map=create_expires_map(
-                settings.auth.jwt_access_dt, settings.auth.jwt_refresh_dt
-            ),
+    token_cache = None
+    if settings.auth.token_cache_ttl and settings.auth.token_cache_size:
+        token_cache = TokenAuthCache(
+            settings.auth.token_cache_size, settings.auth.token_cache_ttl
+        )
+        MetricsManager.register("auth_token_cache")(token_cache.stats)
+    revocations = None
+    if settings.auth.stateless:
+        revocations = RevocationList(
+            SessionMaker,
+            settings.auth.revocation_poll_interval,
+            settings.auth.revocation_max_staleness,
         )
+        MetricsManager.register("auth_revocations")(revocations.stats)
+    auth_logic = AlchemyJwtAuthLogic(
+        iss=settings.app.app_name,
+        aud=settings.app.app_name,
+        secret=settings.app.secret,
+        expires_map=create_expires_map(
+            settings.auth.jwt_access_dt, settings.auth.jwt_refresh_dt
+        ),
+        keys=jwt_keys(),
+        decoded_cache_size=settings.auth.jwt_decoded_cache_size,
     )
+    if auth_logic.decoded_cache is not None:
+        MetricsManager.register("jwt_decoded_cache")(
+            auth_logic.decoded_cache.stats
+        )
+    return AlchemyTokenAuthService(auth_logic, token_cache, revocations)
 
 
 async def create_user(session: AsyncSession, data: UserRawCreate) -> User:
     obj_in = UserCreate(
-        password_hash=PwdContext.hash(data.password),
+        password_hash=await get_pwd_context().hash(data.password),
         **data.model_dump(exclude={"password"}),
     )
     return await get_user_crud().create(session, obj_in)
 
 
-async def get_active_user(session: AsyncSession, token: str) -> UserSession:
-    user = await auth_service().auth(session, token)
+def log_bulk_progress(done: int, total: int):
+    logger.info("[Auth] Bulk users import: {}/{}", done, total)
+
+
+async def bulk_create_users(
+    session: AsyncSession,
+    datas: Sequence[UserRawCreate],
+    chunk_size: int | None = None,
+    progress: Callable[[int, int], Any] | None = log_bulk_progress,
+) -> int:
+    """Hashes passwords in the process pool and inserts users by chunks
+    (`chunk_size` is used for the inserts too, they are split only by the
+    bind params limit of the crud).
+
+    Hashing of the next chunk runs while the current one is being inserted.
+    NOTE: It doesn't commit the session.
+    """
+    chunk_size = chunk_size or get_settings().auth.bulk_chunk_size
+    pwd_context = get_bulk_pwd_context()
+    crud = get_user_crud()
+    chunks = list(chunked(datas, chunk_size))
+
+    def hash_chunk(chunk: Sequence[UserRawCreate]) -> asyncio.Task:
+        return asyncio.create_task(
+            pwd_context.hash_many(ui.password for ui in chunk)
+        )
+
+    ret = 0
+    next_hashes = hash_chunk(chunks[0]) if chunks else None
+    try:
+        for i, chunk in enumerate(chunks):
+            hashes = await next_hashes
+            next_hashes = (
+                hash_chunk(chunks[i + 1]) if i + 1 < len(chunks) else None
+            )
+            ret += await crud.bulk_create(
+                session,
+                [
+                    UserCreate(
+                        password_hash=hi, **ui.model_dump(exclude={"password"})
+                    )
+                    for ui, hi in zip(chunk, hashes)
+                ],
+                chunk_size=chunk_size,
+            )
+            if progress is not None:
+                progress(i * chunk_size + len(chunk), len(datas))
+    finally:
+        if next_hashes is not None and not next_hashes.done():
+            next_hashes.cancel()
+    return ret
+
+
+async def get_active_user(
+    session: AsyncSession, token: str, read_session: AsyncSession | None = None
+) -> UserSession:
+    user = await auth_service().auth(session, token, read_session=read_session)
     if not user.user.is_active:
         raise BadTokenError()
     return user
 
 
 async def get_active_superuser(
-    session: AsyncSession, token: str
+    session: AsyncSession, token: str, read_session: AsyncSession | None = None
 ) -> UserSession:
-    user = await get_active_user(session, token)
+    user = await get_active_user(session, token, read_session)
     if not user.user.is_admin:
         raise BadTokenError()
     return user
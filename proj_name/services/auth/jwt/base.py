@@ -1,7 +1,11 @@
 import datetime
 from functools import cache
+import hashlib
+import time
 import jwt
 from loguru import logger
+from proj_name.core.cache import TTLCache
+from proj_name.core.crypto.jwt.keys import JwtKey, JwtKeySet
 from proj_name.core.exceptions import TokenParseError, TokenValidationError
 from proj_name.enums import BearerTokenTypeEnum
 from proj_name.schemas.auth.token import JwtTokenSchema
@@ -34,27 +38,67 @@ class JwtAuthLogic(AuthLogic):
         secret: str,
         expires_map: dict,
         algorithm: str = "HS256",
+        keys: JwtKeySet | None = None,
+        decoded_cache_size: int = 0,
     ):
+        """
+        Args:
+            keys: signing / verification keys (`secret` and `algorithm` are
+                used if it isn't passed)
+            decoded_cache_size: size of the LRU of the decoded tokens (by
+                sha256 of the raw token, until its `exp`); 0 - disabled
+        """
         self.iss = iss
         self.aud = aud
         self.secret = secret
-        self.algorithm = algorithm
         self.expires_map = expires_map
+        self.keys = keys or JwtKeySet.from_secret(secret, algorithm)
+        self.algorithm = self.keys.current.algorithm
+        self.decoded_cache: TTLCache[bytes, JwtTokenSchema] | None = None
+        if decoded_cache_size:
+            self.decoded_cache = TTLCache(decoded_cache_size)
+
+    def _token_key(self, token: str | bytes) -> JwtKey:
+        if len(self.keys) == 1:
+            # a wrong kid fails on the signature check anyway
+            return self.keys.current
+        key = self.keys.get(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise jwt.InvalidKeyError("Unknown kid")
+        return key
 
     def parse_token(
         self, token: str | bytes, *args, **kwargs
     ) -> JwtTokenSchema:
+        """Signature check and validation happen once per token if the
+        decoded cache is enabled (tokens are immutable and their `exp` is
+        the ttl of the entry)
+        """
+        if self.decoded_cache is None:
+            return self._decode_token(token)
+        raw = token.encode() if isinstance(token, str) else token
+        key = hashlib.sha256(raw).digest()
+        ret = self.decoded_cache.get(key)
+        if ret is None:
+            ret = self._decode_token(token)
+            self.decoded_cache.set(
+                key, ret, ttl=ret.exp.timestamp() - time.time()
+            )
+        return ret
+
+    def _decode_token(self, token: str | bytes) -> JwtTokenSchema:
         try:
+            key = self._token_key(token)
             data = jwt.decode(
                 token,
-                self.secret,
-                algorithms=[self.algorithm],
+                key.verifying_key,
+                algorithms=[key.algorithm],
                 audience=self.aud,
                 issuer=self.iss,
                 verify=True,
                 # leeway=get_leeway(),
             )
-            logger.debug(f"{data=}")
+            logger.debug("data={}", data)
             return JwtTokenSchema.model_validate(data)
         except Exception as e:
             logger.debug("Token parse error. {}", e)
@@ -71,3 +115,24 @@ class JwtAuthLogic(AuthLogic):
         if user_session.password_updated_at > token.iat:
             raise TokenValidationError()
         return UserSession(token=token, raw_token=raw_token, user=user_session)
+
+    def stateless_session(
+        self, token: JwtTokenSchema, raw_token: str, *args, **kwargs
+    ) -> UserSession | None:
+        """The user of the claims is active (deactivation and password
+        changes revoke the tokens), `updated_at` is the issue time.
+        """
+        if token.bid is None or token.uid is None:
+            return None
+        user = UserFullRead(
+            id=token.uid,
+            username=token.sub,
+            password_updated_at=token.iat,
+            updated_at=token.iat,
+            is_admin=token.is_admin,
+            is_active=True,
+        )
+        return UserSession(token=token, raw_token=raw_token, user=user)
+
+    def revocation_ttl(self) -> float:
+        return self.expires_map[BearerTokenTypeEnum.ACCESS] * 60
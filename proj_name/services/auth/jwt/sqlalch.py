@@ -33,11 +33,17 @@ class AlchemyJwtAuthLogic(JwtAuthLogic):
             iat=now,
             jti=token.id,
             ttype=token.token_type,
+            bid=token.base_id,
+            uid=token.user_id,
             **meta.model_dump(),
         )
 
+        key = self.keys.current
         return jwt.encode(
-            jwt_token.to_payload(), self.secret, algorithm=self.algorithm
+            jwt_token.to_payload(),
+            key.signing_key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid},
         )
 
     async def create_tokens(
@@ -63,17 +69,26 @@ class AlchemyJwtAuthLogic(JwtAuthLogic):
             ],
         )
 
+        return self.pair_tokens(access_db_token, refresh_db_token, user)
+
+    def pair_tokens(
+        self, access: Token, refresh: Token, user: UserFullRead
+    ) -> TokenPair:
+        """JWTs of the inserted token rows (models or rows with the same
+        columns)
+        """
+        meta = UserTokenExtra(is_admin=user.is_admin)
         return TokenPair(
             access_token=self._create_token(
-                access_db_token,
-                UserTokenExtra(is_admin=user.is_admin),
-                self.expires_map[access_db_token.token_type],
+                access,
+                meta,
+                self.expires_map[access.token_type],
                 username=user.username,
             ),
             refresh_token=self._create_token(
-                refresh_db_token,
-                UserTokenExtra(is_admin=user.is_admin),
-                self.expires_map[refresh_db_token.token_type],
+                refresh,
+                meta,
+                self.expires_map[refresh.token_type],
                 username=user.username,
             ),
         )
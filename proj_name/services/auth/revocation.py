@@ -0,0 +1,124 @@
+import asyncio
+import datetime
+import time
+from typing import Iterable
+import uuid
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from proj_name.core.exceptions import DbException
+from proj_name.cruds.auth.token import get_revoked_token_crud
+
+
+class RevocationList:
+    """In-process set of the revoked token pairs (`base_id`s) for the
+    stateless auth, kept in sync with the `auth_revoked_token` table by the
+    periodic incremental poll on `log_time`.
+
+    `log_time` is the start of the revoking transaction, so a transaction
+    committed after the poll could have an older `log_time`; the polls
+    overlap by `overlap` seconds to catch it.
+
+    Tokens are trusted only while the list is `fresh` (the last successful
+    poll is younger than `max_staleness`), otherwise the auth falls back to
+    the db lookup.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        poll_interval: float = 5,
+        max_staleness: float = 30,
+        overlap: float = 60,
+        purge_interval: float = 3600,
+    ):
+        self.session_maker = session_maker
+        self.poll_interval = poll_interval
+        self.max_staleness = max_staleness
+        self.overlap = datetime.timedelta(seconds=overlap)
+        self.purge_interval = purge_interval
+        # base_id -> expires_at (timestamp)
+        self._revoked: dict[uuid.UUID, float] = {}
+        self._since: datetime.datetime | None = None
+        self._polled_at = float("-inf")
+        self._purged_at = time.monotonic()
+        self._task: asyncio.Task | None = None
+        self.polls = 0
+        self.poll_errors = 0
+        self.hits = 0
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() - self._polled_at <= self.max_staleness
+
+    def is_revoked(self, base_id: uuid.UUID) -> bool:
+        expires_at = self._revoked.get(base_id)
+        if expires_at is None:
+            return False
+        self.hits += 1
+        return True
+
+    def add(self, base_ids: Iterable[uuid.UUID], expires_at: float):
+        """Local revocation (before the next poll brings it)"""
+        for bi in base_ids:
+            self._revoked[bi] = expires_at
+
+    def _prune(self):
+        now = time.time()
+        expired = [k for k, v in self._revoked.items() if v <= now]
+        for ki in expired:
+            del self._revoked[ki]
+
+    async def poll(self):
+        crud = get_revoked_token_crud()
+        since = None if self._since is None else self._since - self.overlap
+        async with self.session_maker() as session:
+            rows = await crud.get_since(session, since)
+        for base_id, expires_at, log_time in rows:
+            self._revoked[base_id] = expires_at.timestamp()
+            if self._since is None or log_time > self._since:
+                self._since = log_time
+        self._prune()
+        self.polls += 1
+        self._polled_at = time.monotonic()
+
+    async def purge(self) -> int:
+        """Removes the expired revocations from the table"""
+        async with self.session_maker() as session:
+            return await get_revoked_token_crud().purge(session)
+
+    async def run(self):
+        while True:
+            try:
+                await self.poll()
+                if time.monotonic() - self._purged_at > self.purge_interval:
+                    self._purged_at = time.monotonic()
+                    await self.purge()
+            except (DbException, OSError) as e:
+                self.poll_errors += 1
+                logger.warning("[RevocationList] Poll failed: {}", e)
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict[str, int | float | bool]:
+        return {
+            "size": len(self._revoked),
+            "fresh": self.fresh,
+            "polls": self.polls,
+            "poll_errors": self.poll_errors,
+            "hits": self.hits,
+        }
@@ -1,61 +1,26 @@
 from loguru import logger
 import pytest
 import pytest_asyncio
-from sqlalchemy.ext.asyncio import (
-    AsyncSession,
-    async_sessionmaker,
-    create_async_engine,
-)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from proj_name.config import (
-    AppSettings,
-    AuthSettings,
-    DbSettings,
-    LoggingSettings,
-    PostgresSettings,
-    Settings,
+from proj_name.config import Settings
+from proj_name.core.exceptions import (
+    BadLoginCredsError,
+    BadTokenError,
+    TokenParseError,
 )
-from proj_name.core.exceptions import BadTokenError, TokenParseError
+from proj_name.cruds.auth.token import get_token_crud
 from proj_name.cruds.auth.user import get_user_crud
 from proj_name.models.auth.user import User
 from proj_name.schemas.auth.token import TokenPair
 from proj_name.schemas.auth.user import UserFullRead, UserLogin, UserRawCreate
 from proj_name.services.auth.base import AlchemyTokenAuthService
+from proj_name.services.auth.cache import TokenAuthCache
 from proj_name.services.auth.current import create_user
 from proj_name.services.auth.jwt.base import create_expires_map
 from proj_name.services.auth.jwt.sqlalch import AlchemyJwtAuthLogic
 
 
-@pytest.fixture(scope="session")
-def settings_for_test() -> Settings:
-    settings = Settings(
-        _env_file=None,
-        log=LoggingSettings(level="DEBUG"),
-        postgres=PostgresSettings(
-            # db="test_proj_name"
-        ),
-        db=DbSettings(),
-        app=AppSettings(secret="1" * 32),
-        auth=AuthSettings(jwt_access_dt=5, jwt_refresh_dt=10),
-    )
-    settings.postgres.user = "postgres"
-    return settings
-
-
-@pytest_asyncio.fixture(scope="session")
-async def db_SessionMaker(settings_for_test: Settings) -> async_sessionmaker[AsyncSession]:  # type: ignore
-    DbEngine = create_async_engine(
-        settings_for_test.db_url, echo=settings_for_test.log.level == "TRACE"
-    )
-    return async_sessionmaker(DbEngine, expire_on_commit=False)
-
-
-@pytest_asyncio.fixture(scope="function")
-async def db_session(settings_for_test: Settings, db_SessionMaker) -> AsyncSession:  # type: ignore
-    async with db_SessionMaker() as session:
-        yield session  # type: ignore
-
-
 @pytest_asyncio.fixture(scope="session")
 async def active_user_raw() -> UserRawCreate:
     return UserRawCreate(
@@ -285,3 +250,79 @@ async def test_not_found_token_for_active_user(
     except (BadTokenError, TokenParseError):
         got = True
     assert got
+
+
+@pytest.mark.asyncio
+async def test_token_cache_invalidation(
+    db_session: AsyncSession,
+    db_SessionMaker: async_sessionmaker[AsyncSession],
+    active_user_raw: UserRawCreate,
+    auth_test_service: AlchemyTokenAuthService,
+    active_user: User,
+):
+    service = AlchemyTokenAuthService(
+        auth_test_service.auth_logic, TokenAuthCache(10, 60)
+    )
+    async with db_SessionMaker() as session:
+        tokens = await service.login(
+            session,
+            UserLogin(
+                username=active_user_raw.username,
+                password=active_user_raw.password,
+            ),
+        )
+        await session.commit()
+
+    await service.auth(db_session, tokens.access_token)
+    await service.auth(db_session, tokens.access_token)
+    assert service.token_cache.stats()["hits"] == 1
+
+    await service.logout(db_session, tokens.access_token)
+    assert len(service.token_cache._cache) == 0
+    with pytest.raises(BadTokenError):
+        await service.auth(db_session, tokens.access_token)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("single_statement", [True, False])
+async def test_refresh_rotation(
+    db_SessionMaker: async_sessionmaker[AsyncSession],
+    active_user_raw: UserRawCreate,
+    auth_test_service: AlchemyTokenAuthService,
+    active_user: User,
+    single_statement: bool,
+):
+    service = AlchemyTokenAuthService(
+        auth_test_service.auth_logic, single_statement=single_statement
+    )
+    async with db_SessionMaker() as session:
+        with pytest.raises(BadLoginCredsError):
+            await service.login(
+                session,
+                UserLogin(username=active_user_raw.username, password="bad"),
+            )
+        # nothing is written on a wrong password
+        assert (
+            await get_token_crud().get_one_or_none(
+                session, user_id=active_user.id
+            )
+            is None
+        )
+        tokens = await service.login(
+            session,
+            UserLogin(
+                username=active_user_raw.username,
+                password=active_user_raw.password,
+            ),
+        )
+        await session.commit()
+        new_tokens = await service.refresh(session, tokens.refresh_token)
+        await session.commit()
+
+        ses = await service.auth(session, new_tokens.access_token)
+        assert ses.user == UserFullRead.model_validate(active_user)
+        with pytest.raises(BadTokenError):
+            await service.auth(session, tokens.access_token)
+        with pytest.raises(BadTokenError):
+            await service.refresh(session, tokens.refresh_token)
+        await service.logout(session, new_tokens.access_token)
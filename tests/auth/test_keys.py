@@ -0,0 +1,104 @@
+import uuid
+
+import jwt
+import pytest
+from jwt.algorithms import has_crypto
+
+from proj_name.core.crypto.jwt.keys import (
+    JwtKey,
+    JwtKeySet,
+    generate_private_pem,
+)
+from proj_name.core.exceptions import JwtKeyError, TokenParseError
+from proj_name.enums import BearerTokenTypeEnum
+from proj_name.models.auth.token import Token
+from proj_name.schemas.auth.token import UserTokenExtra
+from proj_name.services.auth.jwt.base import create_expires_map
+from proj_name.services.auth.jwt.sqlalch import AlchemyJwtAuthLogic
+
+SECRET = "test-secret-0123456789-0123456789"
+
+
+def make_logic(keys: JwtKeySet | None = None) -> AlchemyJwtAuthLogic:
+    return AlchemyJwtAuthLogic(
+        iss="test",
+        aud="test",
+        secret=SECRET,
+        expires_map=create_expires_map(5, 10),
+        keys=keys,
+    )
+
+
+def make_token(logic: AlchemyJwtAuthLogic) -> str:
+    db_token = Token(
+        id=uuid.uuid4(),
+        base_id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        token_type=BearerTokenTypeEnum.ACCESS,
+    )
+    return logic._create_token(db_token, UserTokenExtra(), 5, username="keys")
+
+
+def test_secret_keys():
+    logic = make_logic()
+    token = make_token(logic)
+    assert jwt.get_unverified_header(token)["kid"] == "default"
+    assert logic.parse_token(token).sub == "keys"
+    assert logic.keys.jwks() == {"keys": []}
+    with pytest.raises(JwtKeyError):
+        JwtKeySet.from_secret(SECRET, "RS256")
+
+
+@pytest.mark.skipif(has_crypto, reason="`cryptography` is installed")
+def test_asymmetric_keys_without_crypto():
+    with pytest.raises(JwtKeyError):
+        generate_private_pem("ES256")
+
+
+@pytest.mark.skipif(not has_crypto, reason="requires `cryptography`")
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256", "EdDSA"])
+def test_asymmetric_keys_rotation(algorithm: str):
+    old = JwtKey.from_private_pem(
+        "old", generate_private_pem(algorithm), algorithm
+    )
+    old_token = make_token(make_logic(JwtKeySet([old], "old")))
+
+    new = JwtKey.from_private_pem(
+        "new", generate_private_pem(algorithm), algorithm
+    )
+    # the old key is retired: only its public part is kept
+    retired = JwtKey("old", algorithm, None, old.verifying_key)
+    logic = make_logic(JwtKeySet([retired, new], "new"))
+    token = make_token(logic)
+    assert jwt.get_unverified_header(token)["kid"] == "new"
+    assert logic.parse_token(token).sub == "keys"
+    assert logic.parse_token(old_token).sub == "keys"
+    assert {ki["kid"] for ki in logic.keys.jwks()["keys"]} == {"old", "new"}
+
+    # not known kid
+    with pytest.raises(TokenParseError):
+        make_logic(JwtKeySet([new], "new")).parse_token(old_token)
+    with pytest.raises(JwtKeyError):
+        JwtKeySet([retired], "old")
+
+
+def test_decoded_cache():
+    logic = AlchemyJwtAuthLogic(
+        iss="test",
+        aud="test",
+        secret=SECRET,
+        expires_map=create_expires_map(5, 10),
+        decoded_cache_size=2,
+    )
+    token = make_token(logic)
+    data = logic.parse_token(token)
+    assert logic.parse_token(token) is data
+    assert logic.parse_token(token.encode()) is data
+    stats = logic.decoded_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+
+    # bad tokens aren't cached
+    for _ in range(2):
+        with pytest.raises(TokenParseError):
+            logic.parse_token(token[:-2])
+    assert logic.decoded_cache.stats()["size"] == 1
@@ -0,0 +1,88 @@
+import time
+import uuid
+
+import pytest
+
+from proj_name.core.exceptions import BadTokenError
+from proj_name.enums import BearerTokenTypeEnum
+from proj_name.models.auth.token import Token
+from proj_name.schemas.auth.token import UserTokenExtra
+from proj_name.services.auth.base import AlchemyTokenAuthService
+from proj_name.services.auth.jwt.base import create_expires_map
+from proj_name.services.auth.jwt.sqlalch import AlchemyJwtAuthLogic
+from proj_name.services.auth.revocation import RevocationList
+
+
+def make_service() -> AlchemyTokenAuthService:
+    logic = AlchemyJwtAuthLogic(
+        iss="test",
+        aud="test",
+        secret="test-secret-0123456789-0123456789",
+        expires_map=create_expires_map(5, 10),
+    )
+    # the session maker isn't used without polls
+    revocations = RevocationList(None, max_staleness=30)  # type: ignore
+    return AlchemyTokenAuthService(logic, revocations=revocations)
+
+
+def make_token(service: AlchemyTokenAuthService) -> tuple[Token, str]:
+    db_token = Token(
+        id=uuid.uuid4(),
+        base_id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        token_type=BearerTokenTypeEnum.ACCESS,
+    )
+    raw = service.auth_logic._create_token(
+        db_token, UserTokenExtra(is_admin=True), 5, username="stateless"
+    )
+    return db_token, raw
+
+
+@pytest.mark.asyncio
+async def test_stateless_auth():
+    service = make_service()
+    db_token, raw = make_token(service)
+    token_data = service.auth_logic.parse_token(raw)
+    assert token_data.bid == db_token.base_id
+
+    # never polled - can't be trusted
+    assert not service.revocations.fresh
+    assert service._auth_stateless(token_data, raw) is None
+
+    service.revocations._polled_at = time.monotonic()
+    # no db session is needed
+    ses = await service.auth(None, raw)  # type: ignore
+    assert ses.user.id == db_token.user_id
+    assert ses.user.username == "stateless"
+    assert ses.user.is_admin and ses.user.is_active
+
+    service.revocations.add([db_token.base_id], time.time() + 60)
+    with pytest.raises(BadTokenError):
+        await service.auth(None, raw)  # type: ignore
+    assert service.revocations.stats()["hits"] == 1
+
+
+def test_revocation_list_prune():
+    revocations = RevocationList(None)  # type: ignore
+    base_id = uuid.uuid4()
+    revocations.add([base_id, uuid.uuid4()], time.time() - 1)
+    revocations._prune()
+    assert not revocations.is_revoked(base_id)
+    assert revocations.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_after_commit():
+    service = make_service()
+    db_token, raw = make_token(service)
+    token_data = service.auth_logic.parse_token(raw)
+    service.revocations._polled_at = time.monotonic()
+    assert service._auth_stateless(token_data, raw) is not None
+
+    service.invalidate_user(user_ids={db_token.user_id})
+    assert service._auth_stateless(token_data, raw) is not None
+    service.invalidate_user(
+        user_ids={db_token.user_id}, base_ids=[db_token.base_id]
+    )
+    with pytest.raises(BadTokenError):
+        service._auth_stateless(token_data, raw)
@@ -0,0 +1,72 @@
+"""Bulk update by primary key: naive loop vs executemany vs
+`UPDATE ... FROM (VALUES ...)`.
+
+Usage: `python -m tests.bench.bench_bulk_update [sizes...]`
+(needs a running database, see `make up`)
+"""
+
+import asyncio
+import sys
+import time
+
+from sqlalchemy import update
+
+from proj_name.core.db.postgres.base import SessionMaker
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.schemas.auth.user import UserCreate
+
+PREFIX = "bench_bupd_"
+
+
+async def naive(session, rows: list[dict]):
+    model = get_user_crud().model
+    for ri in rows:
+        await session.execute(
+            update(model)
+            .where(model.id == ri["id"])
+            .values(is_admin=ri["is_admin"])
+        )
+
+
+async def executemany(session, rows: list[dict]):
+    await get_user_crud().bulk_update(
+        session, rows, values_threshold=len(rows) + 1
+    )
+
+
+async def update_values(session, rows: list[dict]):
+    await get_user_crud().bulk_update(session, rows, values_threshold=0)
+
+
+async def run(size: int):
+    crud = get_user_crud()
+    datas = [
+        UserCreate(username=f"{PREFIX}{i}", password_hash="x")
+        for i in range(size)
+    ]
+    async with SessionMaker() as session:
+        users = await crud.bulk_create_with_return(session, datas)
+        await session.commit()
+        rows = [{"id": ui.id, "is_admin": True} for ui in users]
+        try:
+            for func in (naive, executemany, update_values):
+                started = time.perf_counter()
+                await func(session, rows)
+                dt = time.perf_counter() - started
+                await session.rollback()
+                print(f"size={size} {func.__name__}: {size / dt:.1f} rows/s")
+        finally:
+            await crud.delete(
+                session, [crud.model.username.startswith(PREFIX)], force=True
+            )
+            await session.commit()
+
+
+async def amain(sizes: list[int]):
+    for size in sizes:
+        await run(size)
+
+
+if __name__ == "__main__":
+    sizes = [int(ai) for ai in sys.argv[1:]]
+    asyncio.run(amain(sizes or [100, 1_000, 10_000]))
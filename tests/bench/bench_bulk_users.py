@@ -0,0 +1,72 @@
+"""Bulk users import: serial hashing vs the process pool pipeline.
+
+Usage: `python -m tests.bench.bench_bulk_users [--hash-only] [sizes...]`
+(without `--hash-only` needs a running database, see `make up`)
+
+Serial hashing is measured on a sample of 100 passwords and extrapolated.
+"""
+
+import asyncio
+import sys
+import time
+
+from proj_name.core.crypto.passwords.base import (
+    PwdContext,
+    get_bulk_pwd_context,
+)
+from proj_name.core.db.postgres.base import SessionMaker
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.schemas.auth.user import UserRawCreate
+from proj_name.services.auth.current import bulk_create_users
+
+PREFIX = "bench_bu_"
+SAMPLE = 100
+
+
+def serial_rate() -> float:
+    started = time.perf_counter()
+    for i in range(SAMPLE):
+        PwdContext.hash(f"password{i}")
+    return SAMPLE / (time.perf_counter() - started)
+
+
+async def parallel_hash_rate(size: int) -> float:
+    started = time.perf_counter()
+    await get_bulk_pwd_context().hash_many(f"password{i}" for i in range(size))
+    return size / (time.perf_counter() - started)
+
+
+async def import_rate(size: int) -> float:
+    crud = get_user_crud()
+    datas = [
+        UserRawCreate(username=f"{PREFIX}{i}", password=f"password{i}")
+        for i in range(size)
+    ]
+    async with SessionMaker() as session:
+        started = time.perf_counter()
+        await bulk_create_users(session, datas, progress=None)
+        dt = time.perf_counter() - started
+        await session.rollback()
+        await crud.delete(
+            session, [crud.model.username.startswith(PREFIX)], force=True
+        )
+    return size / dt
+
+
+async def amain(sizes: list[int], hash_only: bool):
+    rate = serial_rate()
+    print(f"serial hashing: {rate:.1f} users/s")
+    for size in sizes:
+        print(f"size={size} serial (extrapolated): {size / rate:.1f}s")
+        if hash_only:
+            prate = await parallel_hash_rate(size)
+            print(f"size={size} parallel hashing: {prate:.1f} users/s")
+        else:
+            irate = await import_rate(size)
+            print(f"size={size} bulk_create_users: {irate:.1f} users/s")
+
+
+if __name__ == "__main__":
+    hash_only = "--hash-only" in sys.argv
+    sizes = [int(ai) for ai in sys.argv[1:] if ai.isdigit()]
+    asyncio.run(amain(sizes or [1_000, 10_000, 100_000], hash_only))
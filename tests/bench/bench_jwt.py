@@ -0,0 +1,104 @@
+"""JWT throughput per algorithm: `_create_token` / `parse_token` with the
+parsed key objects vs `jwt.decode` with the PEM (parsed on each call) and
+`parse_token` of a reused token with the decoded tokens cache.
+
+Usage: `python -m tests.bench.bench_jwt [iterations]`
+(asymmetric algorithms need `cryptography`, see `uv sync --group crypto`)
+"""
+
+import sys
+import timeit
+import uuid
+
+import jwt
+from jwt.algorithms import has_crypto
+from loguru import logger
+
+from proj_name.core.crypto.jwt.keys import (
+    JwtKey,
+    JwtKeySet,
+    generate_private_pem,
+)
+from proj_name.enums import BearerTokenTypeEnum
+from proj_name.models.auth.token import Token
+from proj_name.schemas.auth.token import UserTokenExtra
+from proj_name.services.auth.jwt.base import create_expires_map
+from proj_name.services.auth.jwt.sqlalch import AlchemyJwtAuthLogic
+
+SECRET = "31eca474397470ce766adf655fcdcd7417323d48dc9299e78ad043a8f456ed83"
+ASYMMETRIC = ["RS256", "ES256", "EdDSA"]
+DB_TOKEN = Token(
+    id=uuid.uuid4(),
+    base_id=uuid.uuid4(),
+    user_id=uuid.uuid4(),
+    token_type=BearerTokenTypeEnum.ACCESS,
+)
+
+
+def make_logic(
+    keys: JwtKeySet, decoded_cache_size: int = 0
+) -> AlchemyJwtAuthLogic:
+    return AlchemyJwtAuthLogic(
+        iss="bench",
+        aud="bench",
+        secret=SECRET,
+        expires_map=create_expires_map(30, 60),
+        keys=keys,
+        decoded_cache_size=decoded_cache_size,
+    )
+
+
+def public_pem(key: JwtKey) -> bytes:
+    from cryptography.hazmat.primitives import serialization
+
+    return key.verifying_key.public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+
+
+def bench(name: str, keys: JwtKeySet, number: int, pem: bytes | None):
+    logic = make_logic(keys)
+    cached_logic = make_logic(keys, decoded_cache_size=1024)
+
+    def create() -> str:
+        return logic._create_token(
+            DB_TOKEN, UserTokenExtra(), 30, username="bench"
+        )
+
+    token = create()
+
+    def parse():
+        logic.parse_token(token)
+
+    def parse_cached():
+        cached_logic.parse_token(token)
+
+    def decode_pem():
+        jwt.decode(
+            token,
+            pem,
+            algorithms=[keys.current.algorithm],
+            audience="bench",
+            issuer="bench",
+        )
+
+    funcs = [create, parse, parse_cached]
+    if pem is not None:
+        funcs.append(decode_pem)
+    for fi in funcs:
+        dt = timeit.timeit(fi, number=number)
+        print(f"{name:<6} {fi.__name__:<10} {number / dt:10.0f} ops/s")
+    print(f"{name:<6} token size {len(token)} bytes")
+
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    logger.remove()
+    bench("HS256", JwtKeySet.from_secret(SECRET), number, None)
+    if not has_crypto:
+        print("`cryptography` isn't installed: asymmetric are skipped")
+    for ai in ASYMMETRIC if has_crypto else []:
+        pem = generate_private_pem(ai)
+        key = JwtKey.from_private_pem("bench", pem, ai)
+        bench(ai, JwtKeySet([key], "bench"), number, public_pem(key))
@@ -0,0 +1,100 @@
+"""Login / refresh: the CTE statements vs the separate queries.
+
+Usage: `python -m tests.bench.bench_login [logins] [refreshes]`
+(needs a running migrated database, see `make up` and `make migrate`)
+
+Login rate is bounded by bcrypt, the statements per operation show the
+saved round trips (`BEGIN` / `COMMIT` included).
+"""
+
+import asyncio
+import sys
+import time
+
+from loguru import logger
+from sqlalchemy import event
+
+from proj_name.core.db.postgres.base import DbEngine, SessionMaker
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.schemas.auth.user import UserLogin, UserRawCreate
+from proj_name.services.auth.base import AlchemyTokenAuthService
+from proj_name.services.auth.current import auth_service, create_user
+
+USER = UserRawCreate(username="bench_login", password="bench_login")
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(
+            DbEngine.sync_engine, "before_cursor_execute", self.on_execute
+        )
+        # asyncpg begins the transaction without a cursor
+        event.listen(DbEngine.sync_engine, "begin", self.on_execute)
+        event.listen(DbEngine.sync_engine, "commit", self.on_execute)
+
+    def on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+async def run(
+    service: AlchemyTokenAuthService,
+    counter: StatementCounter,
+    logins: int,
+    refreshes: int,
+):
+    login = UserLogin(username=USER.username, password=USER.password)
+    name = "single" if service.single_statement else "separate"
+    counter.count = 0
+    started = time.perf_counter()
+    for _ in range(logins):
+        async with SessionMaker() as session:
+            tokens = await service.login(session, login)
+            await session.commit()
+    dt = time.perf_counter() - started
+    print(
+        f"{name:<8} login:   {logins / dt:8.1f}/s"
+        f" {counter.count / logins:.1f} statements/op"
+    )
+    counter.count = 0
+    started = time.perf_counter()
+    for _ in range(refreshes):
+        async with SessionMaker() as session:
+            tokens = await service.refresh(session, tokens.refresh_token)
+            await session.commit()
+    dt = time.perf_counter() - started
+    print(
+        f"{name:<8} refresh: {refreshes / dt:8.1f}/s"
+        f" {counter.count / refreshes:.1f} statements/op"
+    )
+    async with SessionMaker() as session:
+        await service.logout(
+            session, (await service.login(session, login)).access_token
+        )
+
+
+async def amain(logins: int, refreshes: int):
+    logger.remove()
+    async with SessionMaker() as session:
+        # leftovers of an interrupted run
+        await get_user_crud().delete(session, username=USER.username)
+        user = await create_user(session, USER)
+        await session.commit()
+    counter = StatementCounter()
+    base = auth_service()
+    try:
+        for single_statement in (False, True):
+            service = AlchemyTokenAuthService(
+                base.auth_logic, single_statement=single_statement
+            )
+            await run(service, counter, logins, refreshes)
+    finally:
+        async with SessionMaker() as session:
+            await get_user_crud().delete(session, id=user.id, force=True)
+
+
+if __name__ == "__main__":
+    args = [int(ai) for ai in sys.argv[1:] if ai.isdigit()]
+    logins = args[0] if args else 50
+    refreshes = args[1] if len(args) > 1 else 1000
+    asyncio.run(amain(logins, refreshes))
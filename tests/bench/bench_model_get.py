@@ -0,0 +1,79 @@
+"""Compare `model_get` three-query path with the fused one.
+
+Usage: `python -m tests.bench.bench_model_get [rows] [repeats]`
+(needs a running database, see `make up`)
+"""
+
+import asyncio
+import sys
+import time
+
+from fastapi import Response
+
+from proj_name.core.crypto.passwords.base import PwdContext
+from proj_name.core.db.postgres.base import SessionMaker
+from proj_name.core.fastapi.ordering.sqlalchemy import AlchOrderConsturctor
+from proj_name.core.fastapi.pagination.base import PageLimitParams
+from proj_name.core.fastapi.pagination.sqlalchemy import AlchemyBasePaginator
+from proj_name.core.fastapi.routes.utils import model_get
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.filters.auth.user import UserFilter
+from proj_name.schemas.auth.user import UserCreate
+
+PREFIX = "bench_mg_"
+
+
+async def seed(rows: int):
+    crud = get_user_crud()
+    password_hash = PwdContext.hash("bench")
+    async with SessionMaker() as session:
+        await crud.delete(
+            session, [crud.model.username.startswith(PREFIX)], force=True
+        )
+        for start in range(0, rows, 1000):
+            await crud.bulk_create(
+                session,
+                [
+                    UserCreate(
+                        username=f"{PREFIX}{i}", password_hash=password_hash
+                    )
+                    for i in range(start, min(start + 1000, rows))
+                ],
+            )
+        await session.commit()
+
+
+async def run(fused: bool, repeats: int) -> float:
+    crud = get_user_crud()
+    filter_schema = UserFilter(username__ilike=PREFIX)
+    ordering = AlchOrderConsturctor(["-log_time"], crud.get_ordering_meta())
+    started = time.perf_counter()
+    for i in range(repeats):
+        paginator = AlchemyBasePaginator(
+            100, PageLimitParams(page=i % 10 + 1, limit=100)
+        )
+        async with SessionMaker() as session:
+            await model_get(
+                Response(),
+                session,
+                crud,
+                paginator,
+                ordering,
+                filter_schema,
+                fused=fused,
+            )
+    return (time.perf_counter() - started) / repeats
+
+
+async def amain(rows: int, repeats: int):
+    await seed(rows)
+    await run(False, 10)  # warm up
+    for fused in (False, True):
+        dt = await run(fused, repeats)
+        print(f"fused={fused!s:<5} rows={rows} avg={dt * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(amain(rows, repeats))
@@ -0,0 +1,105 @@
+"""Search filters of users: sequential scan vs the search indexes.
+
+Usage: `python -m tests.bench.bench_user_search [size] [repeat]`
+(needs a running migrated database, see `make up` and `make migrate`)
+
+Seeds `size` (1 000 000 by default) users, runs `ANALYZE` and measures the
+`EXPLAIN ANALYZE` execution time of the `icontains` (trigram GIN index),
+`startswith` / `istartswith` (btree `text_pattern_ops` index) filters with
+and without the index scans. The users are removed afterwards.
+"""
+
+import asyncio
+import random
+import string
+import sys
+from typing import Any
+
+from sqlalchemy import select, text
+
+from proj_name.core.db.postgres.base import SessionMaker
+from proj_name.core.db.postgres.explain import explain
+from proj_name.core.fastapi.filter.sqlalchemy import get_AlchemyFilter
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.filters.auth.user import UserFilter
+from proj_name.models.auth.user import User
+
+PREFIX = "bench_us_"
+CASES = {
+    "ilike": UserFilter(username__ilike="qxz"),
+    "icontains": UserFilter(username__icontains="qxz"),
+    "startswith": UserFilter(username__startswith=f"{PREFIX}qx"),
+    "istartswith": UserFilter(username__istartswith=f"{PREFIX.upper()}QX"),
+}
+
+
+def random_name(rnd: random.Random) -> str:
+    return PREFIX + "".join(rnd.choices(string.ascii_lowercase, k=12))
+
+
+def scan_nodes(plan: dict[str, Any]) -> list[str]:
+    ret = [plan["Node Type"]]
+    for pi in plan.get("Plans", ()):
+        ret.extend(scan_nodes(pi))
+    return ret
+
+
+async def seed(size: int):
+    crud = get_user_crud()
+    rnd = random.Random(0)
+    async with SessionMaker() as session:
+        await crud.bulk_copy(
+            session,
+            (
+                {"username": random_name(rnd), "password_hash": "-"}
+                for _ in range(size)
+            ),
+        )
+        await session.commit()
+        await session.execute(text(f"ANALYZE {User.__tablename__}"))
+        await session.commit()
+
+
+async def cleanup():
+    crud = get_user_crud()
+    async with SessionMaker() as session:
+        await crud.delete(
+            session, [crud.model.username.startswith(PREFIX)], force=True
+        )
+        await session.commit()
+
+
+async def measure(name: str, filters: UserFilter, indexed: bool, repeat: int):
+    stmt = get_AlchemyFilter().filter(User, select(User.id), filters)
+    async with SessionMaker() as session:
+        if not indexed:
+            await session.execute(text("SET LOCAL enable_indexscan = off"))
+            await session.execute(text("SET LOCAL enable_bitmapscan = off"))
+        times = []
+        for _ in range(repeat):
+            plan = await explain(session, stmt, analyze=True)
+            times.append(plan["Execution Time"])
+        await session.rollback()
+    nodes = ", ".join(scan_nodes(plan["Plan"]))
+    mode = "index" if indexed else "seqscan"
+    print(
+        f"{name:<12} {mode:<8} best={min(times):9.2f}ms"
+        f" rows={plan['Plan']['Actual Rows']} [{nodes}]"
+    )
+
+
+async def amain(size: int, repeat: int):
+    await seed(size)
+    try:
+        for name, filters in CASES.items():
+            for indexed in (False, True):
+                await measure(name, filters, indexed, repeat)
+    finally:
+        await cleanup()
+
+
+if __name__ == "__main__":
+    args = [int(ai) for ai in sys.argv[1:] if ai.isdigit()]
+    size = args[0] if args else 1_000_000
+    repeat = args[1] if len(args) > 1 else 5
+    asyncio.run(amain(size, repeat))
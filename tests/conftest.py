@@ -0,0 +1,46 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from proj_name.config import (
+    AppSettings,
+    AuthSettings,
+    DbSettings,
+    LoggingSettings,
+    PostgresSettings,
+    Settings,
+)
+
+
+@pytest.fixture(scope="session")
+def settings_for_test() -> Settings:
+    settings = Settings(
+        _env_file=None,
+        log=LoggingSettings(level="DEBUG"),
+        postgres=PostgresSettings(
+            # db="test_proj_name"
+        ),
+        db=DbSettings(),
+        app=AppSettings(secret="1" * 32),
+        auth=AuthSettings(jwt_access_dt=5, jwt_refresh_dt=10),
+    )
+    settings.postgres.user = "postgres"
+    return settings
+
+
+@pytest_asyncio.fixture(scope="session")
+async def db_SessionMaker(settings_for_test: Settings) -> async_sessionmaker[AsyncSession]:  # type: ignore
+    DbEngine = create_async_engine(
+        settings_for_test.db_url, echo=settings_for_test.log.level == "TRACE"
+    )
+    return async_sessionmaker(DbEngine, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def db_session(settings_for_test: Settings, db_SessionMaker) -> AsyncSession:  # type: ignore
+    async with db_SessionMaker() as session:
+        yield session  # type: ignore
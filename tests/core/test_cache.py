@@ -0,0 +1,34 @@
+import time
+
+from proj_name.core.cache import TTLCache
+
+
+def test_lru_eviction():
+    cache: TTLCache[str, int] = TTLCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_ttl_expiration():
+    cache: TTLCache[str, int] = TTLCache(10, ttl=0.01)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_pop_if():
+    cache: TTLCache[str, int] = TTLCache(10)
+    for i in range(5):
+        cache.set(str(i), i)
+    assert cache.pop_if(lambda k, v: v % 2 == 0) == 3
+    assert len(cache) == 2
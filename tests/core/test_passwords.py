@@ -0,0 +1,24 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from proj_name.core.crypto.passwords.base import AsyncPwdContext
+from proj_name.core.exceptions import PasswordServiceBusyError
+
+
+@pytest.mark.asyncio
+async def test_hash_verify():
+    ctx = AsyncPwdContext(ThreadPoolExecutor(2), 2, 0)
+    hashes = await ctx.hash_many(["a1", "b2"])
+    assert await ctx.verify("a1", hashes[0])
+    assert not await ctx.verify("a1", hashes[1])
+    assert ctx.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_busy_rejection():
+    ctx = AsyncPwdContext(ThreadPoolExecutor(1), 1, 0)
+    with pytest.raises(PasswordServiceBusyError):
+        await asyncio.gather(ctx.hash("a1"), ctx.hash("b2"))
+    assert ctx.stats()["rejected"] == 1
@@ -0,0 +1,13 @@
+from proj_name.config import DbSettings, Settings
+
+
+def test_engine_kwargs(settings_for_test: Settings):
+    kwargs = settings_for_test.engine_kwargs
+    assert kwargs["pool_size"] == settings_for_test.db.pool_size
+    server_settings = kwargs["connect_args"]["server_settings"]
+    assert server_settings["jit"] == "off"
+    assert "statement_timeout" not in server_settings
+
+    db = DbSettings(statement_timeout=5000, jit=True)
+    assert db.server_settings["statement_timeout"] == "5000"
+    assert db.server_settings["jit"] == "on"
@@ -0,0 +1,185 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from proj_name.core.crypto.passwords.base import get_pwd_context
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.schemas.auth.user import UserCreate, UserRawCreate
+from proj_name.services.auth.current import bulk_create_users
+
+PREFIX = "test_bulk_"
+
+
+@pytest.mark.asyncio
+async def test_bulk_copy(db_session: AsyncSession):
+    crud = get_user_crud()
+    datas = [
+        UserCreate(username=f"{PREFIX}{i}", password_hash="x")
+        for i in range(25)
+    ]
+    try:
+        assert await crud.bulk_copy(db_session, datas, chunk_size=10) == 25
+        users = await crud.get_multi(
+            db_session, [crud.model.username.startswith(PREFIX)]
+        )
+        assert len(users) == 25
+        assert all(ui.is_active and not ui.is_admin for ui in users)
+
+        again = [{"id": ui.id, "username": ui.username} for ui in users[:5]]
+        again = [
+            {**di, "password_hash": "y", "is_admin": True} for di in again
+        ]
+        ret = await crud.bulk_copy(db_session, again, on_conflict="nothing")
+        assert ret == 0
+
+        ret = await crud.bulk_copy(db_session, again, on_conflict="update")
+        assert ret == 5
+        db_session.expire_all()
+        users = await crud.get_multi(
+            db_session, [crud.model.username.startswith(PREFIX)]
+        )
+        updated = {di["id"] for di in again}
+        for ui in users:
+            assert ui.is_admin is (ui.id in updated)
+            assert ui.password_hash == ("y" if ui.id in updated else "x")
+            assert ui.is_active
+    finally:
+        await db_session.rollback()
+
+
+def test_stmt_bulk_upsert():
+    crud = get_user_crud()
+    stmt = crud.stmt_bulk_upsert(
+        postgresql.insert(crud.model), ["id", "username", "is_admin"]
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.endswith(
+        "ON CONFLICT (id) DO UPDATE SET username = excluded.username,"
+        " is_admin = excluded.is_admin"
+    )
+    sql = str(
+        crud.stmt_bulk_upsert(postgresql.insert(crud.model)).compile(
+            dialect=postgresql.dialect()
+        )
+    )
+    assert "password_hash = excluded.password_hash" in sql
+    assert "search_vector = " not in sql
+
+
+def test_bulk_chunks_by_params():
+    crud = get_user_crud()
+    datas = (
+        {"username": f"{PREFIX}{i}", "password_hash": "x"} for i in range(7)
+    )
+    sizes = [len(ci) for ci in crud._bulk_chunks(datas, chunk_size=3)]
+    assert sizes == [3, 3, 1]
+
+    # username, password_hash + `id` of the python default
+    crud.bulk_max_params = 6
+    try:
+        datas = [{"username": "a", "password_hash": "x"}] * 5
+        sizes = [len(ci) for ci in crud._bulk_chunks(datas, chunk_size=3)]
+        assert sizes == [2, 1, 2]
+        crud.bulk_max_params = 5
+        sizes = [len(ci) for ci in crud._bulk_chunks(datas, chunk_size=3)]
+        assert sizes == [1] * 5
+    finally:
+        del crud.bulk_max_params
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pipelined", [False, True])
+async def test_bulk_create_chunked(db_session: AsyncSession, pipelined: bool):
+    crud = get_user_crud()
+    datas = (
+        UserCreate(username=f"{PREFIX}{i}", password_hash="x")
+        for i in range(25)
+    )
+    try:
+        ret = await crud.bulk_create(
+            db_session, datas, chunk_size=10, pipelined=pipelined
+        )
+        assert ret == 25
+        users = await crud.get_multi(
+            db_session, [crud.model.username.startswith(PREFIX)]
+        )
+        assert len(users) == 25
+    finally:
+        await db_session.rollback()
+
+
+def test_bulk_update_values_stmt():
+    crud = get_user_crud()
+    rows = [{"id": i, "is_admin": True} for i in range(3)]
+    stmt = crud.stmt_bulk_update_values(("id", "is_admin"), rows)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "FROM (VALUES" in sql
+    assert "auth_user.id = v.id" in sql
+
+
+def test_bulk_update_pks_stmt():
+    crud = get_user_crud()
+    stmt = crud.stmt_bulk_update_pks(("id", "is_admin"))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql == (
+        "UPDATE auth_user SET is_admin=%(is_admin)s"
+        " WHERE auth_user.id = %(b_id)s::UUID"
+    )
+    assert crud.bulk_update_params([{"id": 1, "is_admin": True}]) == [
+        {"b_id": 1, "is_admin": True}
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("values_threshold", [1, 1000])
+async def test_bulk_update(db_session: AsyncSession, values_threshold: int):
+    crud = get_user_crud()
+    datas = [
+        UserCreate(username=f"{PREFIX}{i}", password_hash="x")
+        for i in range(10)
+    ]
+    try:
+        users = await crud.bulk_create_with_return(db_session, datas)
+        rows = [{"id": ui.id, "is_admin": True} for ui in users[:6]]
+        ret = await crud.bulk_update(
+            db_session, rows, values_threshold=values_threshold
+        )
+        assert ret == 6
+        admins = await crud.get_multi(
+            db_session, [crud.model.username.startswith(PREFIX)], is_admin=True
+        )
+        assert {ui.id for ui in admins} == {ri["id"] for ri in rows}
+    finally:
+        await db_session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_users(db_session: AsyncSession):
+    crud = get_user_crud()
+    datas = [
+        UserRawCreate(username=f"{PREFIX}u{i}", password=f"password{i}")
+        for i in range(5)
+    ]
+    progress = []
+    try:
+        ret = await bulk_create_users(
+            db_session,
+            datas,
+            chunk_size=2,
+            progress=lambda done, total: progress.append(done),
+        )
+        assert ret == 5
+        assert progress == [2, 4, 5]
+        users = await crud.get_multi(
+            db_session, [crud.model.username.startswith(f"{PREFIX}u")]
+        )
+        assert len(users) == 5
+        by_name = {ui.username: ui for ui in users}
+        for di in datas:
+            user = by_name[di.username]
+            assert user.password_hash != di.password
+            assert await get_pwd_context().verify(
+                di.password, user.password_hash
+            )
+    finally:
+        await db_session.rollback()
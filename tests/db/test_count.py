@@ -0,0 +1,117 @@
+import time
+
+import pytest
+from sqlalchemy import bindparam, select
+
+from proj_name.core.db.postgres.count import (
+    CachedCount,
+    CappedCount,
+    EstimateCount,
+    normalize_filter,
+    statement_key,
+)
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.filters.auth.user import UserFilter
+from proj_name.models.auth.user import User
+
+
+class ScalarSession:
+    """Returns the queued scalars of the executed statements"""
+
+    def __init__(self, *values):
+        self.values = list(values)
+        self.stmts = []
+
+    async def execute(self, stmt, *args, **kwargs):
+        self.stmts.append(stmt)
+        return self
+
+    def scalar_one(self):
+        return self.values.pop(0)
+
+    scalar_one_or_none = scalar_one
+
+
+def test_normalize_filter():
+    assert normalize_filter(
+        UserFilter(username__in={"b", "a"}, is_admin=True)
+    ) == normalize_filter(UserFilter(is_admin=True, username__in={"a", "b"}))
+    assert normalize_filter(UserFilter(username="a")) != normalize_filter(
+        UserFilter(username="b")
+    )
+
+
+def test_statement_key():
+    stmt = select(User).where(User.username == "a")
+    assert statement_key(stmt) == statement_key(
+        select(User).where(User.username == "a")
+    )
+    assert statement_key(stmt) != statement_key(
+        select(User).where(User.username == "b")
+    )
+    assert statement_key(stmt) != statement_key(
+        stmt.where(User.is_admin.is_(True))
+    )
+
+    # values of the bound statement shape (`AlchemyBaseFilter.shape`)
+    bound = select(User).where(User.username == bindparam("f_username"))
+    assert statement_key(bound.params(f_username="a")) == statement_key(
+        bound.params(f_username="a")
+    )
+    assert statement_key(bound.params(f_username="a")) != statement_key(
+        bound.params(f_username="b")
+    )
+
+
+@pytest.mark.asyncio
+async def test_capped_count():
+    crud = get_user_crud()
+    strategy = CappedCount(cap=10)
+    res = await strategy.count(ScalarSession(11), select(User), crud, None)
+    assert res.total == 11 and not res.exact
+    assert res.headers["X-Total-Count-Exact"] == "false"
+    session = ScalarSession(7)
+    res = await strategy.count(session, select(User), crud, None)
+    assert res.total == 7 and res.exact
+    assert session.stmts[0].compile().params == {"param_1": 11}
+
+
+@pytest.mark.asyncio
+async def test_estimate_count():
+    crud = get_user_crud()
+    strategy = EstimateCount(exact_below=100)
+    res = await strategy.count(ScalarSession(5000), select(User), crud, None)
+    assert res.total == 5000 and not res.exact
+
+    # small estimate is recounted
+    res = await strategy.count(ScalarSession(10, 12), select(User), crud, None)
+    assert res.total == 12 and res.exact
+
+    # never analyzed table - filtered statement plan
+    plan = [{"Plan": {"Plan Rows": 300}}]
+    res = await strategy.count(
+        ScalarSession(-1, plan), select(User), crud, None
+    )
+    assert res.total == 300 and not res.exact
+
+
+@pytest.mark.asyncio
+async def test_cached_count():
+    crud = get_user_crud()
+    strategy = CachedCount(CappedCount(), ttl=0.05)
+    filter_schema = UserFilter(username="a")
+    stmt = select(User).where(User.username == "a")
+    session = ScalarSession(1, 2, 3)
+    res = await strategy.count(session, stmt, crud, filter_schema)
+    assert res.total == 1
+    res = await strategy.count(session, stmt, crud, filter_schema)
+    assert res.total == 1 and strategy.cache.hits == 1
+
+    # the same filter over another statement
+    other = stmt.where(User.is_admin.is_(True))
+    res = await strategy.count(session, other, crud, filter_schema)
+    assert res.total == 2
+
+    time.sleep(0.06)
+    res = await strategy.count(session, stmt, crud, filter_schema)
+    assert res.total == 3
@@ -0,0 +1,111 @@
+import csv
+import datetime
+import io
+import json
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from proj_name.core.fastapi.ordering.sqlalchemy import AlchOrderConsturctor
+from proj_name.core.fastapi.routes.utils import _export_lines, model_export
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.filters.auth.user import UserFilter
+from proj_name.schemas.auth.user import UserCreate, UserFullRead
+
+PREFIX = "test_export_"
+
+
+async def read_body(response) -> str:
+    return "".join([ci async for ci in response.body_iterator])
+
+
+class MemoryCrud:
+    def __init__(self, objs: list):
+        self.objs = objs
+
+    async def stream_multi(self, session, filters, **kwargs):
+        for oi in self.objs:
+            yield oi
+
+
+@asynccontextmanager
+async def memory_session():
+    yield None
+
+
+@pytest.mark.asyncio
+async def test_export_lines_csv_skips_excluded():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    objs = [
+        UserFullRead(
+            id=uuid.uuid4(),
+            username=f"{PREFIX}{i}",
+            password_updated_at=now,
+            updated_at=now,
+            is_admin=False,
+            is_active=True,
+        )
+        for i in range(3)
+    ]
+    body = "".join(
+        [
+            ci
+            async for ci in _export_lines(
+                memory_session,
+                MemoryCrud(objs),
+                None,
+                UserFullRead,
+                "csv",
+                None,
+                2,
+            )
+        ]
+    )
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert "password_updated_at" not in rows[0]
+    assert [ri["username"] for ri in rows] == [oi.username for oi in objs]
+
+
+@pytest.mark.asyncio
+async def test_model_export(db_SessionMaker: async_sessionmaker[AsyncSession]):
+    crud = get_user_crud()
+    datas = [
+        UserCreate(username=f"{PREFIX}{i:02}", password_hash="x")
+        for i in range(12)
+    ]
+    ordering = AlchOrderConsturctor(["-username"], crud.get_ordering_meta())
+    filter_schema = UserFilter(username__ilike=f"{PREFIX}%")
+    async with db_SessionMaker() as session:
+        await crud.bulk_create(session, datas)
+        await session.commit()
+        try:
+            response = model_export(
+                crud,
+                ordering,
+                filter_schema,
+                UserFullRead,
+                session_maker=db_SessionMaker,
+                flush_rows=5,
+            )
+            assert response.media_type == "application/x-ndjson"
+            lines = (await read_body(response)).splitlines()
+            usernames = [json.loads(li)["username"] for li in lines]
+            assert usernames == [di.username for di in reversed(datas)]
+
+            response = model_export(
+                crud,
+                ordering,
+                filter_schema,
+                UserFullRead,
+                "csv",
+                session_maker=db_SessionMaker,
+            )
+            rows = list(csv.DictReader(io.StringIO(await read_body(response))))
+            assert len(rows) == len(datas)
+            assert rows[0]["username"] == datas[-1].username
+        finally:
+            await crud.delete(
+                session, [crud.model.username.startswith(PREFIX)], force=True
+            )
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from proj_name.core.db.postgres.replicas import ReplicaRouter
+
+
+def make_router(lags: list[float]) -> ReplicaRouter:
+    router = ReplicaRouter(
+        [f"replica{i}" for i in range(len(lags))],  # type: ignore
+        max_lag=5,
+        check_interval=60,
+    )
+    router._lags = list(lags)
+    router._checked_at = [time.monotonic()] * len(lags)
+    return router
+
+
+@pytest.mark.asyncio
+async def test_replica_router():
+    router = make_router([0, 10, 1])
+    picks = [await router.pick() for _ in range(4)]
+    assert picks == ["replica0", "replica2", "replica0", "replica2"]
+
+    router.pin("client")
+    assert await router.pick("client") is None
+    assert await router.pick("other") is not None
+
+    router = make_router([10, 10])
+    assert await router.pick() is None
+    assert await make_router([]).pick() is None
+
+
+class HangingSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def execute(self, stmt):
+        await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_replica_lag_check_timeout():
+    router = ReplicaRouter(
+        [HangingSession], max_lag=5, check_timeout=0.01  # type: ignore
+    )
+    started = time.monotonic()
+    assert await router.pick() is None
+    assert time.monotonic() - started < 1
+    assert router._lags == [float("inf")]
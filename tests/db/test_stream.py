@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.schemas.auth.user import UserCreate
+
+PREFIX = "test_stream_"
+
+
+@pytest.mark.asyncio
+async def test_stream_multi(db_session: AsyncSession):
+    crud = get_user_crud()
+    datas = [
+        UserCreate(username=f"{PREFIX}{i:02}", password_hash="x")
+        for i in range(25)
+    ]
+    try:
+        await crud.bulk_create(db_session, datas)
+        usernames = [
+            ui.username
+            async for ui in crud.stream_multi(
+                db_session,
+                [crud.model.username.startswith(PREFIX)],
+                order_by=[crud.model.username],
+                yield_per=10,
+            )
+        ]
+        assert usernames == [di.username for di in datas]
+    finally:
+        await db_session.rollback()
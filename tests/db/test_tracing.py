@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from proj_name.core.db.postgres.pool import HoldTimeStats, service_db_work
+from proj_name.core.db.postgres.tracing import (
+    QueryTracer,
+    RequestDbStats,
+    request_db_stats,
+)
+
+
+def test_query_tracer():
+    engine = create_engine("sqlite://")
+    QueryTracer.install(engine)
+    hold_stats = HoldTimeStats()
+    hold_stats.install(engine)
+    stats = RequestDbStats()
+    stats_token = request_db_stats.set(stats)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+            conn.execute(text("SELECT 1"))
+        assert stats.queries == 1 and stats.checkouts == 1
+
+        token = service_db_work.set(True)
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        finally:
+            service_db_work.reset(token)
+        assert stats.queries == 1 and stats.checkouts == 1
+        assert hold_stats.stats()["-"]["count"] == 1
+    finally:
+        request_db_stats.reset(stats_token)
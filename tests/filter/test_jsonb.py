@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import Integer, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from proj_name.core.db.postgres.explain import explain
+from proj_name.core.db.postgres.migrations import (
+    jsonb_gin_index,
+    jsonb_gin_index_name,
+)
+from proj_name.core.fastapi.filter.jsonb import CrashliticsZipFilter
+from proj_name.core.fastapi.filter.sqlalchemy import get_AlchemyFilter
+
+TABLE = "test_jsonb_gin"
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class CrashZip(Base):
+    __tablename__ = TABLE
+    __table_args__ = (jsonb_gin_index(TABLE),)
+    id: Mapped[int] = mapped_column(Integer(), primary_key=True)
+    data: Mapped[dict] = mapped_column(JSONB())
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_jsonb_gin_filters():
+    filter_class = get_AlchemyFilter()
+    stmt = filter_class.filter(
+        CrashZip,
+        select(CrashZip),
+        CrashliticsZipFilter(device_id="d1", device_id__in={"d2"}),
+    )
+    sql = compile_sql(stmt)
+    assert sql.count(f"{TABLE}.data @> ") == 2
+    assert "->>" not in sql
+
+
+def test_jsonb_gin_negative_filters():
+    filter_class = get_AlchemyFilter()
+    for fs in (
+        CrashliticsZipFilter(device_id__neq="d1"),
+        CrashliticsZipFilter(device_id__not_in={"d1", "d2"}),
+    ):
+        compiled = filter_class.filter(CrashZip, select(CrashZip), fs).compile(
+            dialect=postgresql.dialect()
+        )
+        sql = str(compiled)
+        # rows without the key are excluded as by `data ->> key != v`
+        assert f"({TABLE}.data ? %(data_1)s) AND NOT (" in sql
+        assert compiled.params["data_1"] == "device_id"
+
+
+@pytest.mark.asyncio
+async def test_jsonb_gin_index_usage(db_session: AsyncSession):
+    conn = await db_session.connection()
+    try:
+        await conn.run_sync(Base.metadata.create_all)
+        await db_session.execute(
+            text(
+                f"INSERT INTO {TABLE} (id, data) SELECT i,"
+                " jsonb_build_object('device_id', 'd' || i)"
+                " FROM generate_series(1, 5000) i"
+            )
+        )
+        await db_session.execute(text(f"ANALYZE {TABLE}"))
+        stmt = get_AlchemyFilter().filter(
+            CrashZip, select(CrashZip), CrashliticsZipFilter(device_id="d42")
+        )
+        plan = await explain(db_session, stmt)
+        assert jsonb_gin_index_name(TABLE) in str(plan)
+        assert "Seq Scan" not in str(plan)
+    finally:
+        await db_session.rollback()
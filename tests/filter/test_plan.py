@@ -0,0 +1,149 @@
+from functools import cache
+
+import pytest
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from proj_name.core.db.postgres.statements import StatementCache
+from proj_name.core.fastapi.filter.common import FilterContext, KeyType
+from proj_name.core.fastapi.filter.sqlalchemy import (
+    AlchemyBaseFilter,
+    get_AlchemyFilter,
+)
+from proj_name.core.fastapi.ordering.sqlalchemy import AlchOrderConsturctor
+from proj_name.core.fastapi.pagination.base import PageLimitParams
+from proj_name.core.fastapi.pagination.sqlalchemy import AlchemyBasePaginator
+from proj_name.core.fastapi.routes.utils import model_get
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.filters.auth.user import UserFilter
+from proj_name.models.auth.user import User
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def f_upper(ctx: FilterContext, k: KeyType, v: str):
+    ctx.wheres.append(getattr(ctx.m, k.column_key) == v.upper())
+
+
+class UpperUserFilter(UserFilter):
+    @classmethod
+    @cache
+    def func_map(cls):
+        return {"alch": {"username": {"": f_upper}}}
+
+
+def test_filter_plan():
+    filter_class = get_AlchemyFilter()
+    plan = filter_class.get_plan(User, UserFilter)
+    assert plan is filter_class.get_plan(User, UserFilter)
+    assert {"username", "username__ilike", "log_time__from"} <= set(plan)
+
+    stmt = filter_class.filter(
+        User,
+        select(User),
+        UserFilter(username__ilike="adm", is_admin=True, username__in={"a"}),
+    )
+    sql = compile_sql(stmt)
+    assert "auth_user.username ILIKE" in sql
+    assert "auth_user.is_admin =" in sql
+    assert "auth_user.username IN" in sql
+
+
+def test_filter_plan_func_map():
+    stmt = get_AlchemyFilter().filter(
+        User, select(User), UpperUserFilter(username="adm")
+    )
+    assert stmt.compile().params == {"username_1": "ADM"}
+
+
+def literal_sql(stmt) -> str:
+    return str(
+        stmt.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+
+def test_filter_shape():
+    filter_class = get_AlchemyFilter()
+    crud = get_user_crud()
+    ordering = AlchOrderConsturctor(["-username"], crud.get_ordering_meta())
+    paginator = AlchemyBasePaginator(100, PageLimitParams(page=3, limit=10))
+    filter_schema = UserFilter(username__ilike="adm", username__in={"a"})
+
+    fields, params = filter_class.shape(User, filter_schema)
+    assert fields == ("username__ilike", "username__in")
+    stmt = filter_class.filter_shape(User, select(User), UserFilter, fields)
+    stmt = paginator.order_paginate_bound(stmt, ordering)
+    params.update(paginator.bound_params())
+
+    expected = paginator.order_paginate(
+        filter_class.filter(User, select(User), filter_schema), ordering
+    )
+    assert literal_sql(stmt.params(params)) == literal_sql(expected)
+
+    assert filter_class.shape(User, UserFilter(username__in=set())) is not None
+    assert filter_class.shape(User, UpperUserFilter(username="a")) is None
+
+
+def test_statement_cache():
+    stmt_cache = StatementCache(maxsize=2)
+    built = []
+
+    def build():
+        built.append(1)
+        return select(User)
+
+    assert stmt_cache.get_or_build("a", build) is stmt_cache.get_or_build(
+        "a", build
+    )
+    assert len(built) == 1
+    assert stmt_cache.stats()["hits"] == 1
+
+
+class ActiveOnlyFilter(AlchemyBaseFilter):
+    def filter_shape(self, model, stmt, schema, fields):
+        stmt = super().filter_shape(model, stmt, schema, fields)
+        return stmt.where(model.is_active.is_(True))
+
+
+class RecordingSession:
+    def __init__(self):
+        self.stmts = []
+
+    async def execute(self, stmt, *args, **kwargs):
+        self.stmts.append(stmt)
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+@pytest.mark.asyncio
+async def test_model_get_statement_cache_by_filter_class():
+    crud = get_user_crud()
+    stmt_cache = StatementCache(maxsize=8)
+    session = RecordingSession()
+    for filter_class in (get_AlchemyFilter(), ActiveOnlyFilter()):
+        await model_get(
+            Response(),
+            session,  # type: ignore
+            crud,
+            AlchemyBasePaginator(100, PageLimitParams(page=1, limit=10)),
+            AlchOrderConsturctor(["-username"], crud.get_ordering_meta()),
+            UserFilter(username="a"),
+            False,
+            False,
+            filter_class=filter_class,
+            stmt_cache=stmt_cache,
+        )
+    plain, active = (compile_sql(si) for si in session.stmts)
+    assert "is_active IS true" not in plain
+    assert "is_active IS true" in active
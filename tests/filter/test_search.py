@@ -0,0 +1,130 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from proj_name.core.db.postgres.count import count_statement
+from proj_name.core.fastapi.filter.sqlalchemy import (
+    escape_like,
+    get_AlchemyFilter,
+)
+from proj_name.core.fastapi.routes.utils import get_bound_dates
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.filters.auth.user import UserFilter
+from proj_name.models.auth.user import User
+
+
+def compile_sql(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+def test_escape_like():
+    assert escape_like("a_b%c") == "a\\_b\\%c"
+    assert escape_like("a\\b") == "a\\\\b"
+
+
+def test_search_filters():
+    filter_class = get_AlchemyFilter()
+    compiled = compile_sql(
+        filter_class.filter(
+            User,
+            select(User),
+            UserFilter(username__icontains="a_d", username__istartswith="AD"),
+        )
+    )
+    sql = str(compiled)
+    assert "auth_user.username ILIKE" in sql
+    assert "lower(auth_user.username) LIKE" in sql
+    assert sorted(compiled.params.values()) == ["%a\\_d%", "ad%"]
+
+
+def test_search_filters_bound():
+    filter_class = get_AlchemyFilter()
+    crud = get_user_crud()
+    for fs in (
+        UserFilter(username__icontains="x%"),
+        UserFilter(username__istartswith="X"),
+    ):
+        shape = filter_class.shape(crud.model, fs)
+        assert shape is not None
+        _, params = shape
+        stmt = filter_class.filter_shape(
+            crud.model, select(User), UserFilter, shape[0]
+        )
+        sql = str(compile_sql(stmt))
+        assert "LIKE" in sql
+        assert set(params.values()) <= {"%x\\%%", "x%"}
+
+
+def test_fulltext_search_filter():
+    compiled = compile_sql(
+        get_AlchemyFilter().filter(
+            User, select(User), UserFilter(search_vector__search="adm -x")
+        )
+    )
+    sql = str(compiled)
+    assert (
+        "auth_user.search_vector @@ websearch_to_tsquery('simple'::regconfig,"
+        in sql
+    )
+    assert "ORDER BY" not in sql
+    assert list(compiled.params.values()) == ["adm -x"]
+
+
+def test_fulltext_search_rank():
+    sql = str(
+        compile_sql(
+            get_AlchemyFilter().filter(
+                User,
+                select(User),
+                UserFilter(search_vector__search_rank="adm"),
+            )
+        )
+    )
+    assert "@@" in sql
+    assert "ORDER BY ts_rank(auth_user.search_vector" in sql
+    # ranked search can't be cached by its shape
+    assert (
+        get_AlchemyFilter().shape(
+            User, UserFilter(search_vector__search_rank="adm")
+        )
+        is None
+    )
+
+
+class RecordingSession:
+    def __init__(self):
+        self.stmts = []
+
+    async def execute(self, stmt, *args, **kwargs):
+        self.stmts.append(stmt)
+        return self
+
+    def first(self):
+        return {"x_min_date": None, "x_max_date": None}
+
+
+@pytest.mark.asyncio
+async def test_fulltext_search_rank_meta_not_ordered():
+    crud = get_user_crud()
+    filter_schema = UserFilter(search_vector__search_rank="adm")
+    session = RecordingSession()
+    await get_bound_dates(session, crud, filter_schema)
+    stmt = get_AlchemyFilter().filter(User, select(User), filter_schema)
+    for si in (session.stmts[0], count_statement(stmt)):
+        sql = str(compile_sql(si))
+        assert "@@" in sql
+        assert "ORDER BY" not in sql
+        assert "ts_rank" not in sql
+
+
+def test_search_vector_column():
+    col = User.__table__.c.search_vector
+    assert col.computed is not None
+    # the same as `add_search_vector` migration
+    assert not col.nullable
+    assert "to_tsvector('simple'::regconfig, coalesce(username, ''))" in str(
+        col.computed.sqltext
+    )
+    assert "search_vector" not in str(select(User))
+    index_names = {ii.name for ii in User.__table__.indexes}
+    assert "ix_auth_user_search_vector_gin" in index_names
@@ -0,0 +1,138 @@
+import datetime
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import Column, Integer, MetaData, String, Table, select
+from sqlalchemy.dialects import postgresql
+
+from proj_name.core.exceptions import BadCursorException, BadOrderingException
+from proj_name.core.fastapi.ordering.sqlalchemy import (
+    AlchCrudedOrderingMeta,
+    AlchOrderConsturctor,
+)
+from proj_name.core.fastapi.pagination.base import (
+    CursorData,
+    CursorLimitParams,
+)
+from proj_name.core.fastapi.pagination.sqlalchemy import (
+    NEXT_CURSOR_HEADER,
+    PREV_CURSOR_HEADER,
+    AlchemyCursorPaginator,
+)
+from proj_name.cruds.auth.user import get_user_crud
+from proj_name.models.auth.user import User
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_cursor_roundtrip():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    uid = uuid.uuid4()
+    cursor = CursorData(v=[now, uid], d="p")
+    ret = CursorData.decode(cursor.encode())
+    assert ret.backward
+    assert TypeAdapter(datetime.datetime).validate_python(ret.v[0]) == now
+    assert ret.v[1] == str(uid)
+
+
+def test_bad_cursor():
+    with pytest.raises(BadCursorException):
+        CursorData.decode("not a cursor")
+
+
+def test_keyset_where_same_direction():
+    crud = get_user_crud()
+    uid = uuid.uuid4()
+    paginator = AlchemyCursorPaginator(
+        10,
+        CursorLimitParams(
+            cursor=CursorData(v=["admin", str(uid)]).encode(), limit=5
+        ),
+    )
+    ordering = AlchOrderConsturctor(["-username"], crud.get_ordering_meta())
+    sql = compile_sql(paginator.order_paginate(select(User), ordering))
+    assert "(auth_user.username, auth_user.id) < (" in sql
+    assert "ORDER BY auth_user.username DESC, auth_user.id DESC" in sql
+    assert "LIMIT" in sql
+
+
+def test_keyset_where_mixed_direction_backward():
+    crud = get_user_crud()
+    paginator = AlchemyCursorPaginator(
+        10,
+        CursorLimitParams(
+            cursor=CursorData(
+                v=["admin", "2025-01-01T00:00:00Z", str(uuid.uuid4())], d="p"
+            ).encode(),
+            limit=5,
+        ),
+    )
+    ordering = AlchOrderConsturctor(
+        ["+username", "-log_time"], crud.get_ordering_meta()
+    )
+    sql = compile_sql(paginator.order_paginate(select(User), ordering))
+    assert "auth_user.username < " in sql
+    assert "auth_user.log_time > " in sql
+    assert "auth_user.id > " in sql
+    assert (
+        "ORDER BY auth_user.username DESC, auth_user.log_time ASC,"
+        " auth_user.id ASC" in sql
+    )
+
+
+def test_process_result_headers():
+    crud = get_user_crud()
+    paginator = AlchemyCursorPaginator(10, CursorLimitParams(limit=2))
+    ordering = AlchOrderConsturctor(["-username"], crud.get_ordering_meta())
+    paginator.order_paginate(select(User), ordering)
+    users = [User(id=uuid.uuid4(), username=f"u{i}") for i in range(3)]
+    response = Response()
+    ret = paginator.process_result(users, response)
+    assert ret == users[:2]
+    assert PREV_CURSOR_HEADER not in response.headers
+    cursor = CursorData.decode(response.headers[NEXT_CURSOR_HEADER])
+    assert cursor.v == ["u1", str(users[1].id)]
+
+
+def test_ordering_validation():
+    crud = get_user_crud()
+    meta = crud.get_ordering_meta()
+    with pytest.raises(BadOrderingException):
+        AlchOrderConsturctor(["-password_hash"], meta)
+    with pytest.raises(BadOrderingException):
+        AlchOrderConsturctor(["-username", "+username"], meta)
+    with pytest.raises(TypeError):
+        meta.order_index()["-id"] = None  # type: ignore
+
+    ordering = AlchOrderConsturctor(["+username"], meta)
+    sql = compile_sql(ordering.order(select(User)))
+    assert "ORDER BY auth_user.username ASC, auth_user.id ASC" in sql
+
+
+def test_ordering_nulls():
+    table = Table(
+        "t",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("name", String, nullable=True),
+    )
+    crud = SimpleNamespace(
+        model=table.c,
+        ordering_fields=lambda: ["name"],
+        default_order=lambda: ["-name"],
+        get_pks_fields=lambda: ["id"],
+    )
+    meta = AlchCrudedOrderingMeta(crud)  # type: ignore
+    assert "+name:nulls_last" in meta.order_index()
+    assert "+id:nulls_last" not in meta.order_index()
+
+    ordering = AlchOrderConsturctor(["+name:nulls_last"], meta)
+    sql = compile_sql(ordering.order(select(table)))
+    assert "ORDER BY t.name ASC NULLS LAST, t.id ASC" in sql
+    with pytest.raises(BadOrderingException):
+        ordering.keyset()
@@ -0,0 +1,159 @@
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from pydantic import BaseModel, field_serializer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from proj_name.core.db.postgres.base import (
+    ReadRouter,
+    db_read_session,
+    db_session,
+    track_request_session,
+)
+from proj_name.core.db.postgres.replicas import HAS_WRITES_KEY, PIN_KEY
+from proj_name.core.db.postgres.pool import current_route
+from proj_name.core.fastapi.routes.db import (
+    SERVER_TIMING_HEADER,
+    DbReleaseRoute,
+)
+
+
+class ClosingSession:
+    def __init__(self, log: list[str]):
+        self.log = log
+        self.info = {}
+
+    async def close(self):
+        self.log.append(f"close {current_route.get()}")
+
+
+async def call(app: FastAPI, path: str, method: str = "GET") -> list[dict]:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "headers": [],
+        "query_string": b"",
+        "server": ("test", 80),
+        "client": ("test", 1),
+    }
+    await app(scope, receive, send)
+    return sent
+
+
+@pytest.mark.asyncio
+async def test_db_release_route():
+    log: list[str] = []
+
+    async def session_dep():
+        track_request_session(ClosingSession(log))  # type: ignore
+        yield
+        log.append("dep exit")
+
+    async def endpoint(_=Depends(session_dep)) -> int:
+        log.append("endpoint")
+        return 1
+
+    app = FastAPI()
+    router = APIRouter(route_class=DbReleaseRoute)
+    router.add_api_route("/items", endpoint, methods=["GET"])
+    app.include_router(router)
+    sent = await call(app, "/items")
+    assert sent[-1]["body"] == b"1"
+    assert log == ["endpoint", "close GET /items", "dep exit"]
+
+
+@pytest.mark.asyncio
+async def test_db_release_route_pins_writes():
+    log: list[str] = []
+    session = ClosingSession(log)
+    session.info[PIN_KEY] = "writer"
+
+    async def session_dep():
+        track_request_session(session)  # type: ignore
+        yield
+        # after the response is sent
+        log.append(f"dep exit pinned={'writer' in ReadRouter._pinned}")
+
+    async def endpoint(_=Depends(session_dep)) -> int:
+        session.info[HAS_WRITES_KEY] = True
+        return 1
+
+    app = FastAPI()
+    router = APIRouter(route_class=DbReleaseRoute)
+    router.add_api_route("/write", endpoint, methods=["POST"])
+    app.include_router(router)
+    try:
+        await call(app, "/write", "POST")
+        assert log == ["close POST /write", "dep exit pinned=True"]
+        assert HAS_WRITES_KEY not in session.info
+    finally:
+        ReadRouter._pinned.pop("writer")
+
+
+@pytest.mark.asyncio
+async def test_db_release_route_sync_and_serialized():
+    log: list[str] = []
+
+    class Item(BaseModel):
+        id: int
+
+        @field_serializer("id")
+        def serialize_id(self, v: int) -> int:
+            log.append("serialize")
+            return v
+
+    async def session_dep():
+        track_request_session(ClosingSession(log))  # type: ignore
+        yield
+
+    def endpoint(_=Depends(session_dep)) -> Item:
+        log.append("endpoint")
+        return Item(id=1)
+
+    app = FastAPI()
+    router = APIRouter(route_class=DbReleaseRoute)
+    router.add_api_route("/item", endpoint, methods=["GET"])
+    app.include_router(router)
+    sent = await call(app, "/item")
+    assert sent[-1]["body"] == b'{"id":1}'
+    assert log == ["endpoint", "serialize", "close GET /item"]
+
+
+@pytest.mark.asyncio
+async def test_shared_request_session():
+    sessions = []
+
+    async def user_dep(session: AsyncSession = Depends(db_session)):
+        sessions.append(session)
+
+    async def endpoint(
+        _=Depends(user_dep),
+        session: AsyncSession = Depends(db_session),
+        read_session: AsyncSession = Depends(db_read_session),
+    ) -> int:
+        sessions.extend([session, read_session])
+        return 1
+
+    app = FastAPI()
+    router = APIRouter(route_class=DbReleaseRoute)
+    router.add_api_route("/shared", endpoint, methods=["GET"])
+    app.include_router(router)
+    sent = await call(app, "/shared")
+
+    assert len(sessions) == 3 and len(set(map(id, sessions))) == 1
+    headers = dict(sent[0]["headers"])
+    assert headers[SERVER_TIMING_HEADER.lower().encode()] == (
+        b'db;dur=0.00;desc="queries=0 checkouts=0"'
+    )